@@ -0,0 +1,21 @@
+from fastapi import Request
+from app.config import get_settings
+from app.services.admission import charge_to
+from app.services.path_generator import PathGeneratorService
+from app.services.job_queue import JobQueue
+
+def get_path_service(request: Request) -> PathGeneratorService:
+    """Process-wide PathGeneratorService created in the app lifespan"""
+    return request.app.state.path_service
+
+def get_job_queue(request: Request) -> JobQueue:
+    """Process-wide generation job queue created in the app lifespan"""
+    return request.app.state.job_queue
+
+async def identify_client(request: Request):
+    """Charge this request's LLM work to the caller (async so the context
+    variable is set in the request's own task)"""
+    client = request.headers.get(get_settings().admission_client_header)
+    if not client and request.client:
+        client = request.client.host
+    charge_to(client or "anonymous")
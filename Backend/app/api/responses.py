@@ -0,0 +1,15 @@
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+class ModelResponse(Response):
+    """JSON response serialized straight from an already-validated model.
+    
+    Returning a Response skips FastAPI's response_model round trip (dump,
+    validate again, serialize), which costs more than a cache hit itself on
+    long paths. Keep response_model on the route for the OpenAPI schema.
+    """
+    
+    media_type = "application/json"
+    
+    def render(self, content: BaseModel) -> bytes:
+        return content.model_dump_json().encode()
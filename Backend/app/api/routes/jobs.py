@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, HTTPException
+from app.api.dependencies import get_job_queue
+from app.api.responses import ModelResponse
+from app.models.job import Job
+from app.services.job_queue import JobQueue
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+@router.get("/{job_id}", response_model=Job)
+async def get_job(
+    job_id: str,
+    job_queue: JobQueue = Depends(get_job_queue)
+):
+    """Get the status (and result, once finished) of a generation job"""
+    job = await job_queue.get(job_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return ModelResponse(job)
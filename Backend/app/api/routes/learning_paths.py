@@ -1,23 +1,121 @@
-from fastapi import APIRouter, HTTPException, Query
-from app.models.learning_path import UserInput, LearningPathResponse
-from app.services.path_generator import PathGeneratorService
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from app.api.dependencies import get_job_queue, get_path_service, identify_client
+from app.api.responses import ModelResponse
+from app.models.job import Job
+from app.config import get_settings
+from app.models.learning_path import (
+    BatchGenerateRequest,
+    BatchGenerateResponse,
+    LearningPathResponse,
+    ResizeRequest,
+    UserInput,
+    WeekUpdateRequest,
+)
+from app.services.admission import AdmissionRejected
+from app.services.job_queue import JobQueue, JobQueueFull
+from app.services.path_generator import PathEditConflict, PathGeneratorService, PathNotFound
+from app.utils.streaming import iter_lines, stream_json_page, stream_ndjson
 from typing import Optional
 
-router = APIRouter(prefix="/learning-paths", tags=["Learning Paths"])
-path_service = PathGeneratorService()
+settings = get_settings()
+
+router = APIRouter(prefix="/learning-paths", tags=["Learning Paths"], dependencies=[Depends(identify_client)])
 
 @router.post("/generate", response_model=LearningPathResponse)
-async def generate_learning_path(user_input: UserInput):
+async def generate_learning_path(
+    user_input: UserInput,
+    path_service: PathGeneratorService = Depends(get_path_service)
+):
     """Generate a personalized learning path"""
     result = await path_service.generate_learning_path(user_input)
     
     if not result.success:
         raise HTTPException(status_code=500, detail=result.message)
     
-    return result
+    return ModelResponse(result)
+
+@router.post("/generate/batch", response_model=BatchGenerateResponse)
+async def generate_learning_paths_batch(
+    batch: BatchGenerateRequest,
+    path_service: PathGeneratorService = Depends(get_path_service)
+):
+    """Generate learning paths for a whole class; results follow the input order"""
+    if len(batch.inputs) > settings.batch_generate_max_inputs:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.batch_generate_max_inputs} inputs per batch"
+        )
+    return ModelResponse(await path_service.generate_batch(batch.inputs))
+
+@router.post("/generate/stream")
+async def stream_learning_path(
+    user_input: UserInput,
+    path_service: PathGeneratorService = Depends(get_path_service)
+):
+    """Generate a learning path as Server-Sent Events, one event per week"""
+    # Admission is decided here: once the stream starts the status is 200
+    try:
+        events = await path_service.stream_learning_path(user_input)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/jobs", response_model=Job, status_code=202)
+async def create_generation_job(
+    user_input: UserInput,
+    job_queue: JobQueue = Depends(get_job_queue)
+):
+    """Queue a learning path generation; poll GET /jobs/{id} for the result"""
+    try:
+        return ModelResponse(await job_queue.submit(user_input), status_code=202)
+    except JobQueueFull as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+# Declared before /{path_id} so "export" isn't taken for an id
+@router.get("/export")
+async def export_learning_paths(
+    target_goal: Optional[str] = Query(None, description="Only paths for this exact goal"),
+    path_service: PathGeneratorService = Depends(get_path_service)
+):
+    """Download stored learning paths as NDJSON, one path per line, oldest first"""
+    return StreamingResponse(
+        stream_ndjson(path_service.vector_store.export_learning_paths(target_goal)),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="learning_paths.ndjson"'}
+    )
+
+@router.post("/import")
+async def import_learning_paths(
+    request: Request,
+    path_service: PathGeneratorService = Depends(get_path_service)
+):
+    """Load learning paths from an NDJSON body (the export format)"""
+    try:
+        return await path_service.import_learning_paths(iter_lines(request.stream()))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{path_id}")
-async def get_learning_path(path_id: str):
+async def get_learning_path(
+    path_id: str,
+    path_service: PathGeneratorService = Depends(get_path_service)
+):
     """Retrieve a saved learning path"""
     path = await path_service.vector_store.get_learning_path(path_id)
     
@@ -26,28 +124,85 @@ async def get_learning_path(path_id: str):
     
     return path
 
+@router.patch("/{path_id}/weeks/{week_number}", response_model=LearningPathResponse)
+async def regenerate_week(
+    path_id: str,
+    week_number: int,
+    update: WeekUpdateRequest,
+    path_service: PathGeneratorService = Depends(get_path_service)
+):
+    """Regenerate one week of a saved learning path, leaving the other weeks as they are"""
+    try:
+        result = await path_service.regenerate_week(path_id, week_number, update)
+    except PathNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except PathEditConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    if not result.success:
+        raise HTTPException(status_code=500, detail=result.message)
+    
+    return ModelResponse(result)
+
+@router.post("/{path_id}/resize", response_model=LearningPathResponse)
+async def resize_learning_path(
+    path_id: str,
+    resize: ResizeRequest,
+    path_service: PathGeneratorService = Depends(get_path_service)
+):
+    """Lengthen or shorten a saved learning path, generating only the weeks that change"""
+    try:
+        result = await path_service.resize_learning_path(path_id, resize.duration_weeks)
+    except PathNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except PathEditConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    if not result.success:
+        raise HTTPException(status_code=500, detail=result.message)
+    
+    return ModelResponse(result)
+
 # 👇 NEW ROUTE
 @router.get("/")
-async def list_learning_paths(limit: int = Query(10, ge=1, le=100)):
-    """List all learning paths"""
+async def list_learning_paths(
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    target_goal: Optional[str] = Query(None, description="Only paths for this exact goal"),
+    view: str = Query("summary", pattern="^(summary|full)$"),
+    path_service: PathGeneratorService = Depends(get_path_service)
+):
+    """List learning paths, newest first"""
     try:
-        paths = await path_service.vector_store.get_all_learning_paths(limit)
-        return {
-            "success": True,
-            "count": len(paths),
-            "learning_paths": paths
-        }
+        paths = await path_service.vector_store.list_learning_paths(
+            limit,
+            cursor=cursor,
+            target_goal=target_goal,
+            summary=view == "summary"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    return StreamingResponse(
+        stream_json_page(paths, "learning_paths", limit),
+        media_type="application/json"
+    )
 
 # 👇 NEW ROUTE
 @router.delete("/{path_id}")
-async def delete_learning_path(path_id: str):
+async def delete_learning_path(
+    path_id: str,
+    path_service: PathGeneratorService = Depends(get_path_service)
+):
     """Delete a learning path"""
     try:
-        deleted = await path_service.vector_store.delete_learning_path(path_id)
+        deleted = await path_service.delete_learning_path(path_id)
         if not deleted:
             raise HTTPException(status_code=404, detail="Learning path not found")
         return {"success": True, "message": "Learning path deleted"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
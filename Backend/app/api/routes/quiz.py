@@ -1,15 +1,22 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from app.api.dependencies import get_path_service, identify_client
+from app.api.responses import ModelResponse
 from app.models.quiz import QuizRequest, QuizResponse
+from app.services.admission import AdmissionRejected
 from app.services.path_generator import PathGeneratorService
 
-router = APIRouter(prefix="/quiz", tags=["Quiz"])
-path_service = PathGeneratorService()
+router = APIRouter(prefix="/quiz", tags=["Quiz"], dependencies=[Depends(identify_client)])
 
 @router.post("/generate", response_model=QuizResponse)
-async def generate_quiz(quiz_request: QuizRequest):
+async def generate_quiz(
+    quiz_request: QuizRequest,
+    path_service: PathGeneratorService = Depends(get_path_service)
+):
     """Generate a quiz for a specific week"""
     try:
         quiz = await path_service.generate_quiz(quiz_request)
-        return quiz
+        return ModelResponse(quiz)
+    except AdmissionRejected:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -12,9 +12,91 @@ class Settings(BaseSettings):
     mongodb_db_name: str = "ai_db"
     mongodb_collection_name: str = "learning_paths"
     mongodb_index_name: str = "vector_index"
+    mongodb_max_pool_size: int = 20
+    mongodb_min_pool_size: int = 0
+    
+    # In-memory fallback when MongoDB is unavailable: bounded by entries and
+    # serialized bytes (LRU), optional TTL in seconds (0 = none), optional
+    # SQLite spill file so paths survive restarts ("" = memory only)
+    memory_store_max_entries: int = 1000
+    memory_store_max_bytes: int = 64 * 1024 * 1024
+    memory_store_ttl: int = 0
+    memory_store_spill_path: str = ""
+    
+    # Semantic cache: serve a stored path for near-identical skills/goal
+    # with the same hours, weeks, learning style and goal words. Off by
+    # default: a hit serves another learner's path. Backend "memory" keeps a
+    # NumPy index in-process; "atlas" uses $vectorSearch on mongodb_index_name.
+    semantic_cache_enabled: bool = False
+    semantic_cache_backend: str = "memory"
+    semantic_cache_threshold: float = 0.92
+    embedding_dim: int = 256
+    
+    # Stored paths are served before calling the LLM; older than this many
+    # seconds they're regenerated in place (0 = never stale)
+    stored_path_max_age: int = 0
+    
+    # Quiz pre-generation: after a path is created, generate quizzes for its
+    # first N weeks in the background (0 = off)
+    quiz_pregenerate_weeks: int = 0
+    quiz_pregenerate_workers: int = 2
+    quiz_pregenerate_queue_size: int = 100
+    
+    # Async generation jobs: "memory" (per process) or "redis" (shared list;
+    # each worker holds one Redis connection while waiting for jobs)
+    job_queue_backend: str = "memory"
+    job_workers: int = 4
+    job_queue_max_depth: int = 100
+    job_result_ttl: int = 3600
+    # Redis queue: a running job's lease lasts this long and is renewed while
+    # it runs; jobs whose worker died are requeued, up to job_max_attempts runs
+    job_visibility_timeout: int = 60
+    job_max_attempts: int = 3
+    
+    # Bulk endpoints: NDJSON import inserts this many paths per insert_many;
+    # batch generation accepts up to max_inputs and generates the unique
+    # cache misses batch_generate_concurrency at a time
+    import_chunk_size: int = 500
+    batch_generate_max_inputs: int = 100
+    batch_generate_concurrency: int = 4
+    
+    # Offline cache warming (python -m scripts.warm_cache): paths generated at
+    # a time, the token budget per run (0 = unlimited) and how long warmed
+    # paths stay in Redis
+    cache_warm_concurrency: int = 4
+    cache_warm_token_budget: int = 200000
+    cache_warm_ttl: int = 86400
+    
+    # Several worker processes (uvicorn --workers N): "redis" or "sqlite"
+    # ("none" = one process). Workers announce every stored, edited or deleted
+    # path and drop their in-process copies when another worker's announcement
+    # arrives: over Redis pub/sub on shared_state_channel, or through a table
+    # in memory_store_spill_path polled every shared_state_poll_interval
+    # seconds. Without MongoDB, the fallback store is then read from the spill
+    # file rather than each worker's memory, so every worker sees every path.
+    shared_state: str = "none"
+    shared_state_channel: str = "learning_paths:changes"
+    shared_state_poll_interval: float = 0.1
     
     # Redis (Optional - only needed if you want caching)
     redis_url: str = "redis://localhost:6379"
+    redis_max_connections: int = 20
+    
+    # Redis value encoding: serializer "orjson", "json" or "msgpack"; values of
+    # at least cache_compression_min_bytes are compressed with "zlib", "zstd"
+    # or "none". Missing optional libraries fall back to json / zlib.
+    cache_serializer: str = "orjson"
+    cache_compression: str = "zlib"
+    cache_compression_min_bytes: int = 1024
+    
+    # In-process L1 cache in front of Redis (entries are ready-to-serve objects)
+    l1_cache_max_entries: int = 256
+    l1_cache_ttl: int = 300
+    
+    # Single-flight: coalesce identical generations across workers via a Redis lock
+    singleflight_distributed: bool = True
+    singleflight_lock_ttl: int = 120
+    singleflight_poll_interval: float = 0.25
     
     # App Settings
     debug: bool = True
@@ -26,6 +108,66 @@ class Settings(BaseSettings):
     # LLM Settings - Cerebras
     cerebras_model: str = "llama-3.3-70b"
     max_tokens: int = 4000
+    # Upper bound on concurrent in-flight LLM calls per worker
+    llm_max_in_flight: int = 8
+    # Follow-up calls asking for the rest of a truncated response
+    llm_max_continuations: int = 1
+    # Model routing: calls of the llm_fast_kinds (quiz, path, outline,
+    # details, weeks), or expected to write at most llm_fast_max_tokens, go
+    # to llm_fast_model ("" = everything to cerebras_model). The other model
+    # takes over while the chosen one fails more than llm_route_max_error_rate
+    # of its calls in the last minute, and gets the last retry. Rolling
+    # latency percentiles cover each model's last llm_stats_window calls.
+    llm_fast_model: str = ""
+    llm_fast_kinds: str = "quiz"
+    llm_fast_max_tokens: int = 0
+    llm_route_max_error_rate: float = 0.25
+    llm_stats_window: int = 200
+    # Per-attempt timeout (seconds) and retries with full-jitter exponential backoff
+    llm_timeout: float = 60.0
+    llm_max_retries: int = 2
+    llm_retry_base_delay: float = 0.5
+    llm_retry_max_delay: float = 8.0
+    # Hedging: an attempt still running past its model's rolling p95 (for
+    # that kind and size of call, after llm_hedge_min_samples calls) gets a
+    # duplicate; the first answer wins. At most llm_hedge_max_ratio extra calls.
+    llm_hedge_enabled: bool = False
+    llm_hedge_max_ratio: float = 0.05
+    llm_hedge_min_samples: int = 20
+    
+    # Admission control for LLM work: token budgets per minute for all
+    # callers and per client (0 = unlimited), refilling continuously with up
+    # to admission_burst_seconds of budget saved up. Over budget, a request
+    # waits up to admission_max_wait seconds, then gets 429 + Retry-After.
+    # Backend "redis" shares the budgets between workers.
+    admission_tpm: int = 0
+    admission_client_tpm: int = 0
+    admission_burst_seconds: float = 10.0
+    admission_max_wait: float = 10.0
+    admission_backend: str = "memory"
+    admission_client_header: str = "X-Client-Id"  # falls back to the client address
+    # Output-token estimates, used to reserve budget and to route calls
+    admission_tokens_per_week: int = 320
+    admission_quiz_tokens: int = 1200
+    
+    # LLM backend: "cerebras", or "fake" for offline load testing
+    llm_backend: str = "cerebras"
+    fake_llm_latency: float = 0.5  # seconds before the first token
+    fake_llm_tokens_per_second: float = 0  # 0 returns the whole response at once
+    fake_llm_error_rate: float = 0.0
+    fake_llm_truncation_rate: float = 0.0
+    fake_llm_seed: int = 0
+    
+    # Fan-out generation for long paths: outline call, then concurrent week-detail calls
+    fanout_min_weeks: int = 8  # 0 disables fan-out
+    fanout_weeks_per_call: int = 4
+    fanout_max_concurrency: int = 4
+    fanout_outline_max_tokens: int = 2000
+    fanout_detail_max_tokens: int = 3000
+    
+    # Partial regeneration (PATCH a week, resize a path): neighbouring weeks
+    # sent to the LLM as context on each side of the rewritten ones
+    regenerate_context_weeks: int = 1
     
     @property
     def cors_origins_list(self) -> List[str]:
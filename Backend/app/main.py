@@ -1,14 +1,43 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
 from app.config import get_settings
-from app.api.routes import learning_paths, quiz
+from app.api.middleware import LatencyMiddleware
+from app.api.routes import jobs, learning_paths, quiz
+from app.services.admission import AdmissionRejected
+from app.services.job_queue import create_job_queue
+from app.services.path_generator import PathGeneratorService
+from app.utils.metrics import REGISTRY
 
 settings = get_settings()
 
+try:
+    import orjson  # ORJSONResponse needs it when rendering
+    DefaultResponse = ORJSONResponse
+except ImportError:
+    DefaultResponse = JSONResponse
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One service (and one set of connection pools) shared by every route
+    app.state.path_service = PathGeneratorService()
+    # Connect in the background so startup never waits on unreachable backends
+    connect_task = asyncio.create_task(app.state.path_service.connect())
+    app.state.job_queue = create_job_queue(app.state.path_service)
+    await app.state.job_queue.start()
+    yield
+    connect_task.cancel()
+    await app.state.job_queue.close()
+    await app.state.path_service.close()
+
 app = FastAPI(
     title="Smart Learning Path Generator API",
     description="Dynamic learning roadmap generator powered by AI",
-    version=settings.api_version
+    version=settings.api_version,
+    lifespan=lifespan,
+    default_response_class=DefaultResponse
 )
 
 # CORS - Allow all for maximum compatibility during debug
@@ -19,10 +48,21 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(LatencyMiddleware)
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected(request: Request, exc: AdmissionRejected):
+    """Over the LLM token budget: tell the client when to come back"""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
 
 # Include routers
 app.include_router(learning_paths.router, prefix=f"/{settings.api_version}")
 app.include_router(quiz.router, prefix=f"/{settings.api_version}")
+app.include_router(jobs.router, prefix=f"/{settings.api_version}")
 
 @app.get("/")
 async def root():
@@ -32,6 +72,18 @@ async def root():
         "status": "running"
     }
 
+@app.get("/stats")
+async def stats(request: Request):
+    """Service counters (single-flight coalescing, cache tiers, etc.)"""
+    stats = request.app.state.path_service.stats()
+    stats["jobs"] = await request.app.state.job_queue.stats()
+    return stats
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
-async def health_check():
-    return {"status": "healthy"}
+async def health_check(request: Request):
+    return await request.app.state.path_service.health()
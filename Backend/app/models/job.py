@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+from enum import Enum
+from app.models.learning_path import UserInput, LearningPathResponse
+
+class JobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+class Job(BaseModel):
+    id: str
+    status: JobStatus = JobStatus.queued
+    user_input: UserInput
+    client: str = "anonymous"  # charged for the job's LLM work, like the request that queued it
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    attempts: int = 0
+    result: Optional[LearningPathResponse] = None
+    error: Optional[str] = None
@@ -38,4 +38,22 @@ class LearningPath(BaseModel):
 class LearningPathResponse(BaseModel):
     success: bool
     learning_path: Optional[LearningPath] = None
-    message: str
\ No newline at end of file
+    message: str
+
+
+class BatchGenerateRequest(BaseModel):
+    inputs: List[UserInput] = Field(..., min_length=1, description="One entry per learner")
+
+class BatchGenerateResponse(BaseModel):
+    success: bool
+    results: List[LearningPathResponse]  # same order as the inputs
+    unique_inputs: int  # after deduping equivalent inputs
+    failed: int
+    message: str
+
+class WeekUpdateRequest(BaseModel):
+    instructions: Optional[str] = Field(None, max_length=1000, description="What to change about the week")
+    topic: Optional[str] = Field(None, max_length=200, description="New topic for the week")
+
+class ResizeRequest(BaseModel):
+    duration_weeks: int = Field(..., ge=1, le=52, description="New total weeks")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 class QuizOption(BaseModel):
     text: str
@@ -13,6 +13,7 @@ class QuizQuestion(BaseModel):
 class QuizRequest(BaseModel):
     week_number: int
     topics: List[str]
+    path_id: Optional[str] = None  # lets a pre-generated quiz be found next to its path
 
 class QuizResponse(BaseModel):
     week_number: int
@@ -0,0 +1,323 @@
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from app.config import get_settings
+
+settings = get_settings()
+
+# Prompt tokens per LLM call (instructions plus the learner's input)
+PROMPT_TOKENS = 400
+
+# Who the current request is charged to, and how long it may queue for budget
+# (None = ADMISSION_MAX_WAIT), for the global bucket separately if set.
+# Set per request by the API, per job by workers.
+current_client: ContextVar[str] = ContextVar("admission_client", default="anonymous")
+current_max_wait: ContextVar[Optional[float]] = ContextVar("admission_max_wait", default=None)
+current_global_max_wait: ContextVar[Optional[float]] = ContextVar("admission_global_max_wait", default=None)
+
+# Tokens actually used inside a reserve() block, reported by LLMService
+_usage: ContextVar[Optional[List[int]]] = ContextVar("admission_usage", default=None)
+
+def record_usage(tokens: int):
+    """Count tokens from a finished LLM call against the current reservation"""
+    usage = _usage.get()
+    if usage is not None:
+        usage[0] += tokens
+
+def charge_to(client: str, max_wait: Optional[float] = None, global_max_wait: Optional[float] = None):
+    """Attribute LLM work in the current context (request or task) to client;
+    global_max_wait overrides max_wait for the global bucket only"""
+    current_client.set(client)
+    current_max_wait.set(max_wait)
+    current_global_max_wait.set(global_max_wait)
+
+def estimate_path_tokens(duration_weeks: int) -> int:
+    """Expected tokens to generate a path: prompt per call plus output per week,
+    capped by the max_tokens each call is allowed"""
+    completion = duration_weeks * settings.admission_tokens_per_week
+    if settings.fanout_min_weeks and duration_weeks >= settings.fanout_min_weeks:
+        detail_calls = math.ceil(duration_weeks / max(1, settings.fanout_weeks_per_call))
+        calls = 1 + detail_calls
+        # The outline lists every week once more before the details are written
+        completion += duration_weeks * 30
+        cap = settings.fanout_outline_max_tokens + detail_calls * settings.fanout_detail_max_tokens
+    else:
+        calls = 1
+        cap = settings.max_tokens
+    return calls * PROMPT_TOKENS + min(completion, cap)
+
+def estimate_weeks_tokens(weeks: int) -> int:
+    """Expected tokens to rewrite or add weeks of a stored path, one call per
+    FANOUT_WEEKS_PER_CALL weeks"""
+    calls = math.ceil(weeks / max(1, settings.fanout_weeks_per_call))
+    return calls * PROMPT_TOKENS + weeks * settings.admission_tokens_per_week
+
+def estimate_quiz_tokens() -> int:
+    return PROMPT_TOKENS + settings.admission_quiz_tokens
+
+class AdmissionRejected(Exception):
+    """Raised when a request would have to wait longer than its deadline for budget"""
+    
+    def __init__(self, retry_after: int, scope: str):
+        super().__init__(
+            "LLM token budget exhausted, try again later" if scope == "global"
+            else "Rate limit exceeded for this client, try again later"
+        )
+        self.retry_after = retry_after
+        self.scope = scope
+
+class MemoryBuckets:
+    """Token buckets in process memory, kept as GCRA theoretical arrival times.
+    
+    A bucket refilling at `rate` tokens/s with room for `burst` tokens is one
+    timestamp: the time at which it would be full again. Taking c tokens
+    pushes it c / rate seconds later; the caller must wait until it is at
+    most burst / rate seconds ahead of now. A cost above burst only has to
+    wait for a full bucket and leaves it in debt, so the largest requests
+    are slowed down rather than never admitted.
+    """
+    
+    def __init__(self):
+        self._tat: Dict[str, float] = {}
+    
+    async def take(
+        self, buckets: List[Tuple[str, float, float]], cost: int, max_waits: List[float]
+    ) -> Tuple[float, int]:
+        """Reserve cost tokens from every bucket, or none. Returns (wait, -1) on
+        success, or (wait, index of the bucket that refused) if a bucket's wait
+        is over its entry in max_waits."""
+        now = time.monotonic()
+        wait = 0.0
+        for i, (key, rate, burst) in enumerate(buckets):
+            tat = max(self._tat.get(key, now), now)
+            bucket_wait = tat + min(cost, burst) / rate - now - burst / rate
+            if bucket_wait > max_waits[i]:
+                return bucket_wait, i
+            wait = max(wait, bucket_wait)
+        for key, rate, _ in buckets:
+            self._tat[key] = max(self._tat.get(key, now), now) + cost / rate
+        if len(self._tat) > 10000:
+            # Buckets that are full again hold no state worth keeping
+            self._tat = {key: tat for key, tat in self._tat.items() if tat > now}
+        return wait, -1
+    
+    async def refund(self, buckets: List[Tuple[str, float, float]], tokens: int):
+        for key, rate, _ in buckets:
+            if key in self._tat:
+                self._tat[key] -= tokens / rate
+
+# Same algorithm as MemoryBuckets, atomically in Redis. KEYS are bucket names;
+# ARGV = cost, then rate, burst and max_wait per key. Returns {wait_ms, refused}
+# with refused = 0 when admitted, else the 1-based key that refused.
+_TAKE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local cost = tonumber(ARGV[1])
+local wait = 0
+local tats = {}
+for i, key in ipairs(KEYS) do
+    local rate, burst, max_wait = tonumber(ARGV[3 * i - 1]), tonumber(ARGV[3 * i]), tonumber(ARGV[3 * i + 1])
+    local tat = math.max(tonumber(redis.call('GET', key) or now), now)
+    tats[i] = tat
+    local bucket_wait = tat + math.min(cost, burst) / rate - now - burst / rate
+    if bucket_wait > max_wait then return {math.ceil(bucket_wait * 1000), i} end
+    wait = math.max(wait, bucket_wait)
+end
+for i, key in ipairs(KEYS) do
+    local rate, burst = tonumber(ARGV[3 * i - 1]), tonumber(ARGV[3 * i])
+    local tat = tats[i] + cost / rate
+    redis.call('SET', key, tostring(tat), 'PX', math.ceil((tat - now + burst / rate) * 1000) + 1000)
+end
+return {math.ceil(wait * 1000), 0}
+"""
+
+_REFUND_SCRIPT = """
+for i, key in ipairs(KEYS) do
+    local tat = redis.call('GET', key)
+    if tat then
+        redis.call('SET', key, tostring(tonumber(tat) - tonumber(ARGV[1]) / tonumber(ARGV[1 + i])), 'KEEPTTL')
+    end
+end
+return 0
+"""
+
+class RedisBuckets:
+    """Token buckets shared by every worker through Redis (one Lua call per admission)"""
+    
+    def __init__(self, redis_client):
+        self._take = redis_client.register_script(_TAKE_SCRIPT)
+        self._refund = redis_client.register_script(_REFUND_SCRIPT)
+    
+    async def take(
+        self, buckets: List[Tuple[str, float, float]], cost: int, max_waits: List[float]
+    ) -> Tuple[float, int]:
+        args = [cost]
+        for (_, rate, burst), max_wait in zip(buckets, max_waits):
+            # Lua can't parse "inf"; a year is as good as forever here
+            args += [rate, burst, min(max_wait, 365 * 86400)]
+        wait_ms, refused = await self._take(keys=[f"admission:{key}" for key, _, _ in buckets], args=args)
+        return int(wait_ms) / 1000, int(refused) - 1
+    
+    async def refund(self, buckets: List[Tuple[str, float, float]], tokens: int):
+        await self._refund(
+            keys=[f"admission:{key}" for key, _, _ in buckets],
+            args=[tokens] + [rate for _, rate, _ in buckets]
+        )
+
+class Reservation:
+    """Budget taken by AdmissionController.admit, settled by hold()"""
+    
+    def __init__(self, store, buckets: List[Tuple[str, float, float]], estimated_tokens: int):
+        self.store = store
+        self.buckets = buckets
+        self.estimated_tokens = estimated_tokens
+
+class AdmissionController:
+    """Token-per-minute budget for LLM work, global and per client.
+    
+    Each generation reserves its estimated tokens before calling the LLM.
+    Over budget, it waits for the buckets to refill if that takes at most
+    its deadline, otherwise AdmissionRejected carries a Retry-After. Once
+    the work is done the unused part of the estimate is refunded, so the
+    budget tracks what the provider actually counts.
+    """
+    
+    def __init__(self, cache):
+        self._cache = cache
+        self._memory = MemoryBuckets()
+        self._redis: Optional[RedisBuckets] = None
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.rejected_client = 0
+        self.wait_seconds = 0.0
+        self.reserved_tokens = 0
+        self.refunded_tokens = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return settings.admission_tpm > 0 or settings.admission_client_tpm > 0
+    
+    def _buckets(self, client: str) -> List[Tuple[str, float, float]]:
+        buckets = []
+        burst_minutes = settings.admission_burst_seconds / 60
+        if settings.admission_tpm > 0:
+            buckets.append(("global", settings.admission_tpm / 60, settings.admission_tpm * burst_minutes))
+        if settings.admission_client_tpm > 0:
+            buckets.append((
+                f"client:{client}",
+                settings.admission_client_tpm / 60,
+                settings.admission_client_tpm * burst_minutes
+            ))
+        return buckets
+    
+    def _store(self):
+        """Redis when configured and reachable, else this process's memory"""
+        if settings.admission_backend == "redis" and self._cache.enabled:
+            if self._redis is None:
+                self._redis = RedisBuckets(self._cache.redis_client)
+            return self._redis
+        return self._memory
+    
+    @asynccontextmanager
+    async def reserve(self, estimated_tokens: int):
+        """Hold budget for the LLM calls made inside the block"""
+        reservation = await self.admit(estimated_tokens)
+        async with self.hold(reservation):
+            yield
+    
+    async def admit(self, estimated_tokens: int) -> Optional[Reservation]:
+        """Take budget for work that starts later (e.g. a response stream); pass
+        the result to hold() around that work. None when admission is off."""
+        if not self.enabled:
+            return None
+        
+        buckets = self._buckets(current_client.get())
+        max_wait = current_max_wait.get()
+        if max_wait is None:
+            max_wait = settings.admission_max_wait
+        global_max_wait = current_global_max_wait.get()
+        max_waits = [
+            global_max_wait if key == "global" and global_max_wait is not None else max_wait
+            for key, _, _ in buckets
+        ]
+        store = self._store()
+        try:
+            wait, refused = await store.take(buckets, estimated_tokens, max_waits)
+        except Exception as e:
+            # Budget state unreachable: don't turn a Redis outage into an LLM outage
+            print(f"⚠️ Admission check failed, admitting: {e}")
+            wait, refused = 0.0, -1
+        if refused >= 0:
+            self.rejected += 1
+            scope = buckets[refused][0].split(":")[0]
+            if scope == "client":
+                self.rejected_client += 1
+            raise AdmissionRejected(max(1, math.ceil(wait - max_waits[refused])), scope)
+        
+        self.admitted += 1
+        self.reserved_tokens += estimated_tokens
+        if wait > 0:
+            self.queued += 1
+            self.wait_seconds += wait
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # Caller went away while queued: give the whole reservation back
+                await self._settle(store, buckets, estimated_tokens)
+                raise
+        return Reservation(store, buckets, estimated_tokens)
+    
+    @asynccontextmanager
+    async def hold(self, reservation: Optional[Reservation]):
+        """Count the LLM calls made inside the block against an admitted reservation"""
+        if reservation is None:
+            yield
+            return
+        
+        usage = [0]
+        token = _usage.set(usage)
+        try:
+            yield
+        finally:
+            _usage.reset(token)
+            # Calls that reported no usage (streams) keep the whole estimate;
+            # going over the estimate is charged as well
+            if usage[0]:
+                await self._settle(
+                    reservation.store, reservation.buckets, reservation.estimated_tokens - usage[0]
+                )
+    
+    async def release(self, reservation: Optional[Reservation]):
+        """Refund a reservation whose work turned out not to be needed"""
+        if reservation is not None:
+            await self._settle(reservation.store, reservation.buckets, reservation.estimated_tokens)
+    
+    async def _settle(self, store, buckets: List[Tuple[str, float, float]], tokens: int):
+        """Return (or, if negative, charge) tokens after the fact"""
+        if not tokens:
+            return
+        self.refunded_tokens += tokens
+        try:
+            await store.refund(buckets, tokens)
+        except Exception:
+            pass
+    
+    def stats(self) -> dict:
+        admitted = self.admitted
+        return {
+            "enabled": self.enabled,
+            "backend": settings.admission_backend,
+            "tpm": settings.admission_tpm,
+            "client_tpm": settings.admission_client_tpm,
+            "admitted": admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "rejected_client": self.rejected_client,
+            "avg_wait_s": round(self.wait_seconds / admitted, 3) if admitted else 0.0,
+            "reserved_tokens": self.reserved_tokens,
+            "refunded_tokens": self.refunded_tokens,
+        }
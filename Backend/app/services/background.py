@@ -0,0 +1,57 @@
+import asyncio
+from typing import Awaitable, Callable, List
+
+class BackgroundWorker:
+    """Fixed pool of asyncio workers draining a bounded queue of jobs"""
+    
+    def __init__(self, name: str, workers: int, queue_size: int):
+        self.name = name
+        self.workers = workers
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._tasks: List[asyncio.Task] = []
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+    
+    def submit(self, job: Callable[[], Awaitable]) -> bool:
+        """Queue a job; returns False (and drops it) when the queue is full"""
+        if not self._tasks:
+            # Started lazily so the worker is created inside the running loop
+            self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+        try:
+            self._queue.put_nowait(job)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+    
+    async def _run(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await job()
+                self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"⚠️ {self.name} job failed: {e}")
+            finally:
+                self._queue.task_done()
+    
+    async def join(self):
+        """Wait until every queued job has finished"""
+        await self._queue.join()
+    
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+    
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize(),
+            "completed": self.completed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+        }
@@ -1,38 +1,293 @@
-import redis
-import json
+import asyncio
+import redis.asyncio as redis
+import time
+from collections import OrderedDict
+from redis.client import NEVER_DECODE
 from app.config import get_settings
-from typing import Optional
+from app.models.learning_path import LearningPath
+from app.models.quiz import QuizResponse
+from app.utils.codec import Codec
+from app.utils.metrics import redis_timer
+from typing import Any, List, Optional
 
 settings = get_settings()
 
+class LRUCache:
+    """Bounded in-process cache with LRU and TTL eviction"""
+    
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        if self.max_entries <= 0:
+            return
+        expires_at = time.monotonic() + min(ttl or self.ttl, self.ttl)
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def delete(self, key: str):
+        self._entries.pop(key, None)
+    
+    def clear(self):
+        self._entries.clear()
+    
+    def delete_where(self, predicate) -> int:
+        """Remove entries whose value matches predicate; returns the count removed"""
+        keys = [key for key, (value, _) in self._entries.items() if predicate(value)]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+    
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
 class CacheService:
     def __init__(self):
-        try:
-            self.redis_client = redis.from_url(
-                settings.redis_url,
-                decode_responses=True
-            )
-            self.redis_client.ping()
-            self.enabled = True
-        except:
-            print("⚠️  Redis not available, caching disabled")
-            self.enabled = False
+        # L1: in-process, holds validated LearningPath objects
+        self.local = LRUCache(settings.l1_cache_max_entries, settings.l1_cache_ttl)
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self.local_quizzes = LRUCache(settings.l1_cache_max_entries, settings.l1_cache_ttl)
+        self.quiz_l2_hits = 0
+        self.quiz_l2_misses = 0
+        self.codec = Codec(
+            settings.cache_serializer,
+            settings.cache_compression,
+            settings.cache_compression_min_bytes
+        )
+        
+        self.redis_client = None
+        self.enabled = False
+        self._connected = False
+        self._connect_lock = asyncio.Lock()
     
-    def get(self, key: str) -> Optional[dict]:
+    async def connect(self):
+        """Connect to Redis with a bounded pool; caching stays disabled if unreachable"""
+        async with self._connect_lock:
+            if self._connected:
+                return
+            self._connected = True
+            try:
+                pool = redis.BlockingConnectionPool.from_url(
+                    settings.redis_url,
+                    decode_responses=True,
+                    max_connections=settings.redis_max_connections,
+                    socket_connect_timeout=5
+                )
+                self.redis_client = redis.Redis(connection_pool=pool)
+                await self.redis_client.ping()
+                self.enabled = True
+            except Exception:
+                print("⚠️  Redis not available, caching disabled")
+                self.enabled = False
+    
+    async def _ready(self) -> bool:
+        if not self._connected:
+            await self.connect()
+        return self.enabled
+    
+    async def get(self, key: str) -> Optional[dict]:
         """Get cached value"""
-        if not self.enabled:
+        if not await self._ready():
             return None
         try:
-            value = self.redis_client.get(key)
-            return json.loads(value) if value else None
+            with redis_timer("get"):
+                # Raw bytes: encoded values aren't text (the client decodes replies by default)
+                value = await self.redis_client.execute_command("GET", key, **{NEVER_DECODE: True})
+            return self.codec.decode(value) if value else None
         except:
             return None
     
-    def set(self, key: str, value: dict, expire: int = 3600):
+    async def set(self, key: str, value: dict, expire: int = 3600):
         """Set cached value with expiration (default 1 hour)"""
-        if not self.enabled:
+        if not await self._ready():
             return
         try:
-            self.redis_client.setex(key, expire, json.dumps(value))
+            with redis_timer("setex"):
+                await self.redis_client.setex(key, expire, self.codec.encode(value))
         except:
-            pass
\ No newline at end of file
+            pass
+    
+    async def delete(self, key: str):
+        """Delete cached value"""
+        if not await self._ready():
+            return
+        try:
+            with redis_timer("delete"):
+                await self.redis_client.delete(key)
+        except:
+            pass
+    
+    async def get_learning_path(self, key: str) -> Optional[LearningPath]:
+        """Get a learning path from L1, falling back to Redis (L2)"""
+        learning_path = self.local.get(key)
+        if learning_path is not None:
+            return learning_path
+        
+        cached_path = await self.get(key)
+        if not cached_path:
+            self.l2_misses += 1
+            return None
+        self.l2_hits += 1
+        
+        learning_path = LearningPath(**cached_path)
+        self.local.set(key, learning_path)
+        return learning_path
+    
+    async def set_learning_path(self, key: str, learning_path: LearningPath, expire: int = 3600):
+        """Cache a learning path in both tiers"""
+        self.local.set(key, learning_path, ttl=expire)
+        # mode="json" so datetimes serialize (plain .dict() made json.dumps fail silently)
+        await self.set(key, learning_path.model_dump(mode="json"), expire=expire)
+        if learning_path.id:
+            await self._track_key(learning_path.id, key, expire)
+    
+    async def _track_key(self, path_id: str, key: str, expire: int):
+        """Add key to the set of keys a stored path is cached under (its exact
+        input, and every input a stored or semantic lookup resolved to it)"""
+        if not await self._ready():
+            return
+        keys_name = f"learning_path_keys:{path_id}"
+        try:
+            with redis_timer("sadd"):
+                await self.redis_client.sadd(keys_name, key)
+            # Outlive the longest-lived key in the set
+            with redis_timer("ttl"):
+                ttl = await self.redis_client.ttl(keys_name)
+            if ttl < expire:
+                with redis_timer("expire"):
+                    await self.redis_client.expire(keys_name, expire)
+        except:
+            pass
+    
+    async def invalidate_learning_path(self, path_id: str) -> List[str]:
+        """Drop every cached copy of a stored learning path; returns the cache
+        keys it was under, for other workers to drop from their L1"""
+        self.local.delete_where(lambda learning_path: learning_path.id == path_id)
+        if not await self._ready():
+            return []
+        keys_name = f"learning_path_keys:{path_id}"
+        try:
+            with redis_timer("smembers"):
+                keys = sorted(await self.redis_client.smembers(keys_name))
+            with redis_timer("delete"):
+                await self.redis_client.delete(*keys, keys_name)
+            return keys
+        except:
+            return []
+    
+    async def get_quiz(self, key: str) -> Optional[QuizResponse]:
+        """Get a quiz from L1, falling back to Redis (L2)"""
+        quiz = self.local_quizzes.get(key)
+        if quiz is not None:
+            return quiz
+        
+        cached_quiz = await self.get(key)
+        if not cached_quiz:
+            self.quiz_l2_misses += 1
+            return None
+        self.quiz_l2_hits += 1
+        
+        quiz = QuizResponse(**cached_quiz)
+        self.local_quizzes.set(key, quiz)
+        return quiz
+    
+    async def set_quiz(self, key: str, quiz: QuizResponse, expire: int = 86400):
+        """Cache a quiz in both tiers"""
+        self.local_quizzes.set(key, quiz, ttl=expire)
+        await self.set(key, quiz.model_dump(mode="json"), expire=expire)
+    
+    async def acquire_lock(self, name: str, ttl: int):
+        """Try to take a non-blocking distributed lock; returns the lock or None"""
+        if not await self._ready():
+            return None
+        try:
+            lock = self.redis_client.lock(name, timeout=ttl)
+            with redis_timer("lock_acquire"):
+                acquired = await lock.acquire(blocking=False)
+            return lock if acquired else None
+        except:
+            return None
+    
+    async def lock_exists(self, name: str) -> bool:
+        """Check whether a distributed lock is currently held"""
+        if not await self._ready():
+            return False
+        try:
+            with redis_timer("exists"):
+                return bool(await self.redis_client.exists(name))
+        except:
+            return False
+    
+    async def release_lock(self, lock):
+        """Release a lock taken with acquire_lock (expired locks are ignored)"""
+        try:
+            await lock.release()
+        except:
+            pass
+    
+    async def health(self) -> str:
+        """Redis status: up, down, unavailable (caching disabled) or connecting"""
+        if not self._connected:
+            return "connecting"
+        if not self.enabled:
+            return "unavailable"
+        try:
+            with redis_timer("ping"):
+                await asyncio.wait_for(self.redis_client.ping(), timeout=1)
+            return "up"
+        except:
+            return "down"
+    
+    async def close(self):
+        """Close the Redis connection pool"""
+        if self.redis_client is not None:
+            await self.redis_client.aclose(close_connection_pool=True)
+    
+    def stats(self) -> dict:
+        """Hit/miss/eviction counters per tier"""
+        return {
+            "l1": self.local.stats(),
+            "l2": {
+                "enabled": self.enabled,
+                "hits": self.l2_hits,
+                "misses": self.l2_misses,
+            },
+            "quiz_l1": self.local_quizzes.stats(),
+            "quiz_l2": {
+                "hits": self.quiz_l2_hits,
+                "misses": self.quiz_l2_misses,
+            },
+            "codec": self.codec.stats(),
+        }
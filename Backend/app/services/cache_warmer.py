@@ -0,0 +1,211 @@
+import asyncio
+import json
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+from pydantic import ValidationError
+from app.config import get_settings
+from app.models.learning_path import UserInput
+from app.services.admission import charge_to, estimate_path_tokens
+from app.services.path_generator import PathGeneratorService
+from app.utils.fingerprint import canonicalize_user_input, fingerprint_user_input
+
+settings = get_settings()
+
+# Stored-path lookups and Redis copies are cheap; only generation is bounded
+# by the warmer's concurrency
+LOOKUP_CONCURRENCY = 32
+
+def _dedupe(inputs: List[UserInput]) -> List[UserInput]:
+    """Drop inputs equivalent to an earlier one, keeping the order"""
+    unique = {}
+    for user_input in inputs:
+        unique.setdefault(fingerprint_user_input(user_input), user_input)
+    return list(unique.values())
+
+def load_seed(path: str) -> List[UserInput]:
+    """Inputs from a seed file, most popular first: a JSON array or NDJSON of
+    UserInput objects (current_skills may also be a list of skills).
+    Raises ValueError naming the entry that isn't a valid input."""
+    with open(path, encoding="utf-8") as seed:
+        text = seed.read()
+    if text.lstrip().startswith("["):
+        entries = json.loads(text)
+    else:
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+    
+    inputs = []
+    for number, entry in enumerate(entries, start=1):
+        if isinstance(entry.get("current_skills"), list):
+            entry["current_skills"] = ", ".join(entry["current_skills"])
+        try:
+            inputs.append(UserInput(**entry))
+        except ValidationError as e:
+            raise ValueError(f"Seed entry {number} is not a valid input: {e}")
+    return _dedupe(inputs)
+
+async def mine_popular_inputs(paths: PathGeneratorService, top_goals: int, per_goal: int) -> List[UserInput]:
+    """Candidate inputs for the most requested goals in MongoDB.
+    
+    Stored inputs are grouped by canonical goal and goals ranked by how many
+    paths were stored for them. Each of the top_goals goals gets its most
+    common skills and learning style at its per_goal most common hours and
+    weeks, topped up from the most common ones overall, so a goal seen with
+    only one schedule is warmed at the popular schedules as well.
+    """
+    goals: Counter = Counter()
+    titles: Dict[str, str] = {}
+    skills: Dict[str, Counter] = defaultdict(Counter)
+    styles: Dict[str, Counter] = defaultdict(Counter)
+    schedules: Dict[str, Counter] = defaultdict(Counter)
+    all_schedules: Counter = Counter()
+    
+    async for user_input in paths.vector_store.iter_user_inputs():
+        try:
+            canonical = canonicalize_user_input(user_input)
+        except (KeyError, TypeError, ValueError):
+            continue
+        goal = canonical["target_goal"]
+        if not goal:
+            continue
+        goals[goal] += 1
+        titles.setdefault(goal, user_input["target_goal"].strip())
+        skills[goal][canonical["current_skills"]] += 1
+        styles[goal][canonical["preferred_learning_style"]] += 1
+        schedule = (canonical["hours_per_week"], canonical["duration_weeks"])
+        schedules[goal][schedule] += 1
+        all_schedules[schedule] += 1
+    
+    popular_schedules = [schedule for schedule, _ in all_schedules.most_common(per_goal)]
+    inputs = []
+    for goal, _ in goals.most_common(top_goals):
+        goal_schedules = [schedule for schedule, _ in schedules[goal].most_common(per_goal)]
+        for schedule in popular_schedules:
+            if len(goal_schedules) >= per_goal:
+                break
+            if schedule not in goal_schedules:
+                goal_schedules.append(schedule)
+        for hours, weeks in goal_schedules:
+            try:
+                inputs.append(UserInput(
+                    current_skills=skills[goal].most_common(1)[0][0],
+                    target_goal=titles[goal],
+                    hours_per_week=hours,
+                    duration_weeks=weeks,
+                    preferred_learning_style=styles[goal].most_common(1)[0][0]
+                ))
+            except ValidationError:
+                continue
+    return _dedupe(inputs)
+
+class CacheWarmer:
+    """Fills Redis (and MongoDB) for known-popular inputs ahead of traffic.
+    
+    Inputs are taken most popular first. A stored path is copied into Redis;
+    a missing one is generated, at most `concurrency` at a time, while the
+    tokens spent so far plus the estimates of generations in flight leave
+    room for it within `token_budget` (0 = unlimited). Quizzes queued for the
+    new paths count against the budget too. Inputs that don't fit are
+    skipped, so smaller paths further down the list may still be warmed.
+    """
+    
+    def __init__(
+        self,
+        paths: PathGeneratorService,
+        concurrency: Optional[int] = None,
+        token_budget: Optional[int] = None,
+        ttl: Optional[int] = None
+    ):
+        self.paths = paths
+        self.concurrency = concurrency or settings.cache_warm_concurrency
+        self.token_budget = settings.cache_warm_token_budget if token_budget is None else token_budget
+        self.ttl = ttl or settings.cache_warm_ttl
+    
+    def _tokens_used(self) -> int:
+        return self.paths.llm.prompt_tokens + self.paths.llm.completion_tokens
+    
+    async def hit_rate(self, inputs: List[UserInput]) -> dict:
+        """Where each input would be answered from right now"""
+        semaphore = asyncio.Semaphore(LOOKUP_CONCURRENCY)
+        vector_store = self.paths.vector_store
+        
+        async def tier(user_input: UserInput) -> str:
+            async with semaphore:
+                if await self.paths.cache.get(self.paths._get_cache_key(user_input)) is not None:
+                    return "cached"
+                if await vector_store.find_by_fingerprint(fingerprint_user_input(user_input)):
+                    return "stored"
+                if await vector_store.find_similar_learning_path(user_input.dict()):
+                    return "similar"
+                return "missing"
+        
+        tiers = Counter(await asyncio.gather(*(tier(user_input) for user_input in inputs)))
+        total = len(inputs)
+        return {
+            "inputs": total,
+            "cached": tiers["cached"],
+            "stored": tiers["stored"],
+            "similar": tiers["similar"],
+            "missing": tiers["missing"],
+            "cache_hit_rate": round(tiers["cached"] / total, 4) if total else 0.0,
+            "no_llm_rate": round((total - tiers["missing"]) / total, 4) if total else 0.0,
+        }
+    
+    async def warm(self, inputs: List[UserInput]) -> dict:
+        """Preload stored paths into Redis, then generate the missing ones
+        within the token budget. Returns counts per outcome."""
+        # Warming may queue for LLM budget as long as it takes, behind live traffic
+        charge_to("cache-warmer", max_wait=float("inf"))
+        outcomes: Counter = Counter()
+        
+        semaphore = asyncio.Semaphore(LOOKUP_CONCURRENCY)
+        
+        async def preload(user_input: UserInput) -> Optional[str]:
+            async with semaphore:
+                try:
+                    return await self.paths.warm_learning_path(user_input, self.ttl, generate=False)
+                except Exception as e:
+                    print(f"⚠️ Could not preload '{user_input.target_goal}': {e}")
+                    return "failed"
+        
+        preloaded = await asyncio.gather(*(preload(user_input) for user_input in inputs))
+        outcomes.update(outcome for outcome in preloaded if outcome)
+        missing = [user_input for user_input, outcome in zip(inputs, preloaded) if outcome is None]
+        print(f"🔍 {outcomes['preloaded']} stored paths copied to Redis, {len(missing)} to generate")
+        
+        started_tokens = self._tokens_used()
+        reserved = 0
+        pending = iter(missing)
+        
+        async def generate_next():
+            nonlocal reserved
+            for user_input in pending:
+                estimate = estimate_path_tokens(user_input.duration_weeks)
+                spent = self._tokens_used() - started_tokens
+                if self.token_budget and spent + reserved + estimate > self.token_budget:
+                    outcomes["over_budget"] += 1
+                    continue
+                reserved += estimate
+                try:
+                    outcome = await self.paths.warm_learning_path(user_input, self.ttl)
+                    outcomes[outcome] += 1
+                    print(f"✅ {outcome.capitalize()}: {user_input.target_goal} "
+                          f"({user_input.duration_weeks} weeks, {user_input.hours_per_week} h/week)")
+                except Exception as e:
+                    outcomes["failed"] += 1
+                    print(f"⚠️ Could not generate '{user_input.target_goal}': {e}")
+                finally:
+                    reserved -= estimate
+        
+        await asyncio.gather(*(generate_next() for _ in range(self.concurrency)))
+        # Let the quizzes queued for new paths finish before reporting the spend
+        await self.paths.quiz_worker.join()
+        return {
+            "inputs": len(inputs),
+            "already_cached": outcomes["cached"],
+            "preloaded": outcomes["preloaded"],
+            "generated": outcomes["generated"],
+            "over_budget": outcomes["over_budget"],
+            "failed": outcomes["failed"],
+            "tokens_used": self._tokens_used() - started_tokens,
+            "token_budget": self.token_budget,
+        }
@@ -0,0 +1,208 @@
+import asyncio
+import json
+import os
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+from app.config import get_settings
+
+settings = get_settings()
+
+# Changes older than this are pruned from the SQLite feed; a worker that
+# polls less often than this has been stalled and resyncs anyway
+SQLITE_FEED_RETENTION = 60
+
+# Called with each change another worker made, or None when changes may
+# have been missed (after a reconnect) and nothing held locally can be trusted
+ChangeHandler = Callable[[Optional[dict]], None]
+
+class ChangeFeed:
+    """Announces changes to stored paths to the other worker processes.
+    
+    A change is {"path_id", "user_input", "deleted", "keys"}: a path was
+    stored, rewritten, edited or deleted, and any copy of it held in a
+    worker's memory (L1 cache entries under keys, semantic index) is out of
+    date. This base class is the single-process feed: there is nobody to
+    tell. See RedisChangeFeed and SQLiteChangeFeed for several uvicorn workers.
+    """
+    
+    backend = "none"
+    
+    def __init__(self):
+        # Workers ignore their own announcements
+        self.origin = uuid.uuid4().hex
+        self.published = 0
+        self.received = 0
+        self.resyncs = 0
+        self._task: Optional[asyncio.Task] = None
+    
+    async def start(self, handler: ChangeHandler):
+        pass
+    
+    async def publish(
+        self, path_id: str, user_input: Optional[dict] = None, deleted: bool = False, keys: List[str] = ()
+    ):
+        """Tell the other workers a path changed; never fails the caller"""
+        change = {
+            "origin": self.origin,
+            "path_id": path_id,
+            "user_input": user_input,
+            "deleted": deleted,
+            "keys": list(keys),
+        }
+        try:
+            await self._send(json.dumps(change, default=str))
+            self.published += 1
+        except Exception as e:
+            print(f"⚠️ Could not announce change to {path_id}: {e}")
+    
+    async def _send(self, message: str):
+        pass
+    
+    def _deliver(self, handler: ChangeHandler, message: str):
+        change = json.loads(message)
+        if change.get("origin") == self.origin:
+            return
+        self.received += 1
+        handler(change)
+    
+    def _resync(self, handler: ChangeHandler):
+        self.resyncs += 1
+        handler(None)
+    
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+    
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "published": self.published,
+            "received": self.received,
+            "resyncs": self.resyncs,
+        }
+
+class RedisChangeFeed(ChangeFeed):
+    """Changes over Redis pub/sub on SHARED_STATE_CHANNEL. Delivery is
+    immediate but at most once: after losing the subscription a worker
+    resyncs, since it can't know what it missed."""
+    
+    backend = "redis"
+    
+    def __init__(self, redis_client, channel: str):
+        super().__init__()
+        self.redis = redis_client
+        self.channel = channel
+    
+    async def start(self, handler: ChangeHandler):
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen(handler))
+    
+    async def _listen(self, handler: ChangeHandler):
+        subscribed_before = False
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                if subscribed_before:
+                    self._resync(handler)
+                subscribed_before = True
+                async for message in pubsub.listen():
+                    self._deliver(handler, message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Change feed subscription lost, retrying: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+    
+    async def _send(self, message: str):
+        await self.redis.publish(self.channel, message)
+
+class SQLiteChangeFeed(ChangeFeed):
+    """Changes through a table in a SQLite file every worker opens, polled
+    every SHARED_STATE_POLL_INTERVAL seconds; for a single host without Redis"""
+    
+    backend = "sqlite"
+    
+    def __init__(self, path: str, poll_interval: float):
+        super().__init__()
+        self.poll_interval = poll_interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS changes ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, created_at REAL NOT NULL, message TEXT NOT NULL)"
+        )
+        # Only changes made from now on are news to this worker
+        self._last_seq = self._db.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+        self._last_poll = time.time()
+        # Statements may wait busy_timeout on another worker's write lock: they run
+        # on this thread, one at a time, instead of on the event loop
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="change-feed")
+    
+    async def _run(self, fn: Callable, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+    
+    async def start(self, handler: ChangeHandler):
+        if self._task is None:
+            self._task = asyncio.create_task(self._poll(handler))
+    
+    async def _poll(self, handler: ChangeHandler):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                now = time.time()
+                if now - self._last_poll > SQLITE_FEED_RETENTION:
+                    # Stalled long enough for changes to have been pruned unseen
+                    self._resync(handler)
+                self._last_poll = now
+                rows = await self._run(self._read, self._last_seq)
+                for seq, message in rows:
+                    self._last_seq = seq
+                    self._deliver(handler, message)
+            except Exception as e:
+                print(f"⚠️ Change feed poll failed: {e}")
+    
+    def _read(self, after: int) -> list:
+        return self._db.execute("SELECT seq, message FROM changes WHERE seq > ? ORDER BY seq", (after,)).fetchall()
+    
+    def _write(self, message: str, prune: bool):
+        now = time.time()
+        self._db.execute("INSERT INTO changes (created_at, message) VALUES (?, ?)", (now, message))
+        if prune:
+            self._db.execute("DELETE FROM changes WHERE created_at < ?", (now - SQLITE_FEED_RETENTION,))
+    
+    async def _send(self, message: str):
+        await self._run(self._write, message, self.published % 100 == 0)
+    
+    async def close(self):
+        await super().close()
+        self._executor.shutdown(wait=True)
+        self._db.close()
+
+def create_change_feed(cache) -> ChangeFeed:
+    """The feed SHARED_STATE asks for; a single-process feed if it can't be had"""
+    if settings.shared_state == "redis":
+        if cache.enabled:
+            return RedisChangeFeed(cache.redis_client, settings.shared_state_channel)
+        print("⚠️  Redis not available, workers won't see each other's changes")
+    elif settings.shared_state == "sqlite":
+        if settings.memory_store_spill_path:
+            try:
+                return SQLiteChangeFeed(settings.memory_store_spill_path, settings.shared_state_poll_interval)
+            except sqlite3.Error as e:
+                print(f"⚠️  Could not open the change feed, workers won't see each other's changes: {e}")
+                return ChangeFeed()
+        print("⚠️  SHARED_STATE=sqlite needs MEMORY_STORE_SPILL_PATH, workers won't see each other's changes")
+    return ChangeFeed()
@@ -0,0 +1,341 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from app.config import get_settings
+from app.models.job import Job, JobStatus
+from app.models.learning_path import UserInput
+from app.services.admission import charge_to, current_client
+
+settings = get_settings()
+
+# Seconds a worker pauses after an error (e.g. Redis unreachable) before dequeuing again
+WORKER_ERROR_BACKOFF = 1.0
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity"""
+    
+    def __init__(self, retry_after: int):
+        super().__init__("Job queue is full, try again later")
+        self.retry_after = retry_after
+
+class JobQueue:
+    """Bounded generation queue drained by a fixed pool of workers.
+    
+    Jobs and their results live in process memory; see RedisJobQueue for a
+    queue shared by several uvicorn workers.
+    """
+    
+    def __init__(self, path_service, workers: int, max_depth: int):
+        self.path_service = path_service
+        self.workers = workers
+        self.max_depth = max_depth
+        self._tasks: List[asyncio.Task] = []
+        self._busy = 0
+        self._busy_seconds = 0.0
+        self._started_at = time.monotonic()
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_depth)
+        self._jobs: Dict[str, Job] = {}
+    
+    async def start(self):
+        if not self._tasks:
+            self._started_at = time.monotonic()
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+    
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+    
+    async def submit(self, user_input: UserInput) -> Job:
+        """Queue a generation job, or raise JobQueueFull for backpressure"""
+        job = Job(id=uuid.uuid4().hex, user_input=user_input, client=current_client.get())
+        await self._enqueue(job)
+        return job
+    
+    async def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+    
+    async def depth(self) -> int:
+        return self._queue.qsize()
+    
+    async def _enqueue(self, job: Job):
+        self._prune()
+        try:
+            self._queue.put_nowait(job.id)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise JobQueueFull(self._retry_after())
+        self._jobs[job.id] = job
+    
+    async def _dequeue(self) -> Optional[str]:
+        return await self._queue.get()
+    
+    async def _save(self, job: Job):
+        self._jobs[job.id] = job
+    
+    def _prune(self):
+        """Forget finished jobs once their results have expired"""
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.job_result_ttl)
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+    
+    def _retry_after(self) -> int:
+        # Roughly how long until a worker frees a slot
+        return max(1, int(self._average_run_seconds()))
+    
+    def _average_run_seconds(self) -> float:
+        finished = self.completed + self.failed
+        return self._busy_seconds / finished if finished else 30.0
+    
+    async def _worker(self):
+        while True:
+            try:
+                job_id = await self._dequeue()
+                if job_id is None:
+                    continue
+                job = await self.get(job_id)
+                if job is None:
+                    await self._ack(job_id)
+                    continue
+                await self._run(job)
+            except Exception as e:
+                # A lost connection must not shrink the pool; a job claimed
+                # before the error is requeued by the reaper once its lease lapses
+                print(f"⚠️ Job worker error, retrying: {e}")
+                await asyncio.sleep(WORKER_ERROR_BACKOFF)
+    
+    async def _run(self, job: Job):
+        # Charged to whoever queued it: over their own budget the job fails like
+        # their request would, but it waits as long as it takes for global budget
+        charge_to(job.client, global_max_wait=float("inf"))
+        job.status = JobStatus.running
+        job.started_at = datetime.utcnow()
+        job.attempts += 1
+        wait = (job.started_at - job.created_at).total_seconds()
+        self._wait_seconds_total += wait
+        self._wait_seconds_max = max(self._wait_seconds_max, wait)
+        await self._save(job)
+        
+        self._busy += 1
+        started = time.monotonic()
+        try:
+            result = await self.path_service.generate_learning_path(job.user_input)
+            job.result = result
+            job.status = JobStatus.succeeded if result.success else JobStatus.failed
+            job.error = None if result.success else result.message
+        except Exception as e:
+            job.status = JobStatus.failed
+            job.error = str(e)
+        finally:
+            self._busy -= 1
+            self._busy_seconds += time.monotonic() - started
+        
+        await self._finish(job)
+    
+    async def _finish(self, job: Job):
+        if job.status == JobStatus.succeeded:
+            self.completed += 1
+        else:
+            self.failed += 1
+        job.finished_at = datetime.utcnow()
+        await self._save(job)
+    
+    async def _ack(self, job_id: str):
+        """The job is done with (or gone); nothing to do for the in-process queue"""
+    
+    async def stats(self) -> dict:
+        started = self.completed + self.failed
+        uptime = max(time.monotonic() - self._started_at, 1e-9)
+        return {
+            "backend": "memory",
+            "workers": self.workers,
+            "busy_workers": self._busy,
+            "utilization": round(self._busy_seconds / (uptime * self.workers), 4) if self.workers else 0.0,
+            "depth": await self.depth(),
+            "max_depth": self.max_depth,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_wait_s": round(self._wait_seconds_total / started, 3) if started else 0.0,
+            "max_wait_s": round(self._wait_seconds_max, 3),
+        }
+
+# Check the depth, save the job and queue it in one step, so concurrent
+# submitters can't push the queue past its maximum depth
+_ENQUEUE_SCRIPT = """
+if redis.call('LLEN', KEYS[1]) >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+redis.call('LPUSH', KEYS[1], ARGV[4])
+return 1
+"""
+
+# Move an abandoned job from the processing list to the head of the queue;
+# returns 0 if another worker's reaper (or the job's own worker) got there first
+_REQUEUE_SCRIPT = """
+if redis.call('LREM', KEYS[1], 1, ARGV[1]) == 0 then
+    return 0
+end
+redis.call('RPUSH', KEYS[2], ARGV[1])
+return 1
+"""
+
+class RedisJobQueue(JobQueue):
+    """JobQueue backed by Redis lists so every uvicorn worker shares one queue.
+    
+    Delivery is at least once: a worker moves a job onto a processing list
+    (BLMOVE) and holds a lease on it, renewed while the job runs. Jobs whose
+    lease lapsed, because their worker died, are put back at the head of the
+    queue by any worker's reaper, until they have run JOB_MAX_ATTEMPTS times.
+    
+    Redis is resolved on first use, so building the queue never waits on it;
+    if it is unreachable the queue runs in process, like JobQueue.
+    """
+    
+    QUEUE_KEY = "jobs:queue"
+    PROCESSING_KEY = "jobs:processing"
+    
+    def __init__(self, path_service, workers: int, max_depth: int):
+        super().__init__(path_service, workers, max_depth)
+        self.cache = path_service.cache
+        self.redis = None
+        self._resolved = False
+        # Lease-less jobs seen by the last sweep; requeued if still lease-less at the next
+        self._suspects = set()
+        self.requeued = 0
+    
+    async def start(self):
+        if not self._tasks:
+            await super().start()
+            self._tasks.append(asyncio.create_task(self._reaper()))
+    
+    async def _ready(self) -> bool:
+        """True once Redis is connected; False means the queue runs in process"""
+        if not self._resolved:
+            await self.cache.connect()
+            if not self._resolved:
+                self._resolved = True
+                if self.cache.enabled:
+                    self.redis = self.cache.redis_client
+                    self._enqueue_script = self.redis.register_script(_ENQUEUE_SCRIPT)
+                    self._requeue_script = self.redis.register_script(_REQUEUE_SCRIPT)
+                else:
+                    print("⚠️  Redis not available, using in-process job queue")
+        return self.redis is not None
+    
+    async def get(self, job_id: str) -> Optional[Job]:
+        if not await self._ready():
+            return await super().get(job_id)
+        data = await self.redis.get(f"job:{job_id}")
+        return Job.model_validate_json(data) if data else None
+    
+    async def depth(self) -> int:
+        if not await self._ready():
+            return await super().depth()
+        return await self.redis.llen(self.QUEUE_KEY)
+    
+    async def _enqueue(self, job: Job):
+        if not await self._ready():
+            return await super()._enqueue(job)
+        queued = await self._enqueue_script(
+            keys=[self.QUEUE_KEY, f"job:{job.id}"],
+            args=[self.max_depth, job.model_dump_json(), settings.job_result_ttl, job.id]
+        )
+        if not queued:
+            self.rejected += 1
+            raise JobQueueFull(self._retry_after())
+    
+    async def _dequeue(self) -> Optional[str]:
+        if not await self._ready():
+            return await super()._dequeue()
+        # Short timeout so cancellation on shutdown is prompt
+        return await self.redis.blmove(self.QUEUE_KEY, self.PROCESSING_KEY, 1, "RIGHT", "LEFT")
+    
+    async def _save(self, job: Job):
+        if not await self._ready():
+            return await super()._save(job)
+        await self.redis.set(f"job:{job.id}", job.model_dump_json(), ex=settings.job_result_ttl)
+    
+    async def _run(self, job: Job):
+        if not await self._ready():
+            return await super()._run(job)
+        lease = f"job:{job.id}:lease"
+        await self.redis.set(lease, "1", ex=settings.job_visibility_timeout)
+        heartbeat = asyncio.create_task(self._renew(lease))
+        try:
+            if job.attempts >= settings.job_max_attempts:
+                job.status = JobStatus.failed
+                job.error = f"Job abandoned: its worker stopped during all {job.attempts} attempts"
+                await self._finish(job)
+            else:
+                await super()._run(job)
+        finally:
+            heartbeat.cancel()
+            await self._ack(job.id)
+    
+    async def _renew(self, lease: str):
+        while True:
+            await asyncio.sleep(settings.job_visibility_timeout / 3)
+            try:
+                await self.redis.expire(lease, settings.job_visibility_timeout)
+            except Exception as e:
+                print(f"⚠️ Could not renew job lease {lease}: {e}")
+    
+    async def _ack(self, job_id: str):
+        if not await self._ready():
+            return
+        await self.redis.lrem(self.PROCESSING_KEY, 1, job_id)
+        await self.redis.delete(f"job:{job_id}:lease")
+    
+    async def _reaper(self):
+        if not await self._ready():
+            return
+        while True:
+            await asyncio.sleep(settings.job_visibility_timeout / 2)
+            try:
+                await self._requeue_abandoned()
+            except Exception as e:
+                print(f"⚠️ Job reaper sweep failed: {e}")
+    
+    async def _requeue_abandoned(self):
+        """Requeue processing jobs without a lease in two sweeps running (a
+        worker takes its lease just after moving the job, so one sweep may
+        land in between)"""
+        suspects = set()
+        for job_id in await self.redis.lrange(self.PROCESSING_KEY, 0, -1):
+            if await self.redis.exists(f"job:{job_id}:lease"):
+                continue
+            if job_id not in self._suspects:
+                suspects.add(job_id)
+            elif await self._requeue_script(keys=[self.PROCESSING_KEY, self.QUEUE_KEY], args=[job_id]):
+                self.requeued += 1
+                print(f"⚠️ Requeued job {job_id}: its worker stopped while running it")
+        self._suspects = suspects
+    
+    async def stats(self) -> dict:
+        if not await self._ready():
+            return await super().stats()
+        stats = await super().stats()
+        stats["backend"] = "redis"
+        stats["processing"] = await self.redis.llen(self.PROCESSING_KEY)
+        stats["requeued"] = self.requeued
+        return stats
+
+def create_job_queue(path_service) -> JobQueue:
+    """Build the configured job queue (Redis falls back to memory if unavailable)"""
+    if settings.job_queue_backend == "redis":
+        return RedisJobQueue(path_service, workers=settings.job_workers, max_depth=settings.job_queue_max_depth)
+    return JobQueue(path_service, workers=settings.job_workers, max_depth=settings.job_queue_max_depth)
@@ -0,0 +1,276 @@
+from cerebras.cloud.sdk import AsyncCerebras
+import asyncio
+import json
+import random
+import re
+from app.config import get_settings
+from typing import AsyncIterator, List, Optional, Union
+
+settings = get_settings()
+
+# Rough chars-per-token ratio, used wherever the provider doesn't report usage
+CHARS_PER_TOKEN = 4
+
+class Completion:
+    """Text of one completion plus what the provider reported about it"""
+    
+    def __init__(self, text: str, finish_reason: Optional[str] = None,
+                 prompt_tokens: int = 0, completion_tokens: int = 0):
+        self.text = text
+        self.finish_reason = finish_reason
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+
+class LLMBackend:
+    """Chat-completion provider used by LLMService"""
+    
+    name = "base"
+    
+    async def complete(self, messages: List[dict], max_tokens: int, model: Optional[str] = None) -> Completion:
+        raise NotImplementedError
+    
+    def stream(
+        self, messages: List[dict], max_tokens: int, model: Optional[str] = None
+    ) -> AsyncIterator[Union[str, Completion]]:
+        """Text deltas, then one Completion (empty text) with the stream's
+        finish reason and token usage"""
+        raise NotImplementedError
+    
+    async def close(self):
+        pass
+
+class CerebrasBackend(LLMBackend):
+    """Cerebras Cloud (OpenAI-compatible chat completions)"""
+    
+    name = "cerebras"
+    
+    def __init__(self):
+        # Async client so a slow completion never blocks the event loop.
+        # The SDK's TCP warm-up is a blocking request at construction; skip it
+        # so startup doesn't depend on the provider being reachable.
+        # Timeouts and retries are LLMService's (ModelRouter), not the SDK's.
+        self.client = AsyncCerebras(
+            api_key=settings.cerebras_api_key,
+            warm_tcp_connection=False,
+            max_retries=0
+        )
+        self.model = settings.cerebras_model
+    
+    async def complete(self, messages: List[dict], max_tokens: int, model: Optional[str] = None) -> Completion:
+        response = await self.client.chat.completions.create(
+            model=model or self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=0.7
+        )
+        choice = response.choices[0]
+        usage = getattr(response, "usage", None)
+        return Completion(
+            choice.message.content or "",
+            finish_reason=getattr(choice, "finish_reason", None),
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", 0) or 0
+        )
+    
+    async def stream(
+        self, messages: List[dict], max_tokens: int, model: Optional[str] = None
+    ) -> AsyncIterator[Union[str, Completion]]:
+        stream = await self.client.chat.completions.create(
+            model=model or self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=0.7,
+            stream=True
+        )
+        finish_reason = None
+        usage = None
+        completion_chars = 0
+        async for chunk in stream:
+            if chunk.choices:
+                choice = chunk.choices[0]
+                finish_reason = getattr(choice, "finish_reason", None) or finish_reason
+                if choice.delta.content:
+                    completion_chars += len(choice.delta.content)
+                    yield choice.delta.content
+            # The final chunk carries usage for the whole stream
+            usage = getattr(chunk, "usage", None) or usage
+        prompt_chars = sum(len(message["content"]) for message in messages)
+        yield Completion(
+            "",
+            finish_reason=finish_reason,
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or prompt_chars // CHARS_PER_TOKEN,
+            completion_tokens=getattr(usage, "completion_tokens", 0) or completion_chars // CHARS_PER_TOKEN
+        )
+    
+    async def close(self):
+        await self.client.close()
+
+class FakeLLMError(Exception):
+    """Injected provider failure, reported as a server error"""
+    
+    status_code = 503
+
+class FakeBackend(LLMBackend):
+    """Offline stand-in that answers the app's prompts with schema-valid JSON.
+    
+    Output is deterministic per prompt; latency, throughput, failures and
+    truncation are configurable so the full stack can be load-tested.
+    """
+    
+    name = "fake"
+    
+    def __init__(self, latency: Optional[float] = None, tokens_per_second: Optional[float] = None,
+                 error_rate: Optional[float] = None, truncation_rate: Optional[float] = None,
+                 seed: Optional[int] = None):
+        self.latency = settings.fake_llm_latency if latency is None else latency
+        self.tokens_per_second = settings.fake_llm_tokens_per_second if tokens_per_second is None else tokens_per_second
+        self.error_rate = settings.fake_llm_error_rate if error_rate is None else error_rate
+        self.truncation_rate = settings.fake_llm_truncation_rate if truncation_rate is None else truncation_rate
+        self._random = random.Random(settings.fake_llm_seed if seed is None else seed)
+        self.calls = 0
+    
+    def _respond(self, messages: List[dict], max_tokens: int):
+        """Full text for the conversation, cut to max_tokens or at random"""
+        self.calls += 1
+        if self._random.random() < self.error_rate:
+            raise FakeLLMError("Injected LLM failure")
+    
+        text = fake_response(messages[0]["content"])
+        if len(messages) > 1 and messages[1]["role"] == "assistant":
+            # Continuation request: answer with the rest of the same response
+            text = text[len(messages[1]["content"]):]
+    
+        finish_reason = "stop"
+        limit = max_tokens * CHARS_PER_TOKEN
+        if len(text) > limit:
+            text, finish_reason = text[:limit], "length"
+        elif text and self._random.random() < self.truncation_rate:
+            text, finish_reason = text[:int(len(text) * self._random.uniform(0.3, 0.9))], "length"
+        return text, finish_reason
+    
+    def _generation_time(self, text: str) -> float:
+        if self.tokens_per_second <= 0:
+            return 0.0
+        return len(text) / CHARS_PER_TOKEN / self.tokens_per_second
+    
+    async def complete(self, messages: List[dict], max_tokens: int, model: Optional[str] = None) -> Completion:
+        await asyncio.sleep(self.latency)
+        text, finish_reason = self._respond(messages, max_tokens)
+        await asyncio.sleep(self._generation_time(text))
+        prompt_chars = sum(len(message["content"]) for message in messages)
+        return Completion(
+            text,
+            finish_reason=finish_reason,
+            prompt_tokens=prompt_chars // CHARS_PER_TOKEN,
+            completion_tokens=len(text) // CHARS_PER_TOKEN
+        )
+    
+    async def stream(
+        self, messages: List[dict], max_tokens: int, model: Optional[str] = None
+    ) -> AsyncIterator[Union[str, Completion]]:
+        await asyncio.sleep(self.latency)
+        text, finish_reason = self._respond(messages, max_tokens)
+        chunk_size = 16 * CHARS_PER_TOKEN
+        for start in range(0, len(text), chunk_size):
+            chunk = text[start:start + chunk_size]
+            await asyncio.sleep(self._generation_time(chunk))
+            yield chunk
+        prompt_chars = sum(len(message["content"]) for message in messages)
+        yield Completion(
+            "",
+            finish_reason=finish_reason,
+            prompt_tokens=prompt_chars // CHARS_PER_TOKEN,
+            completion_tokens=len(text) // CHARS_PER_TOKEN
+        )
+
+def _fake_week(week_number: int, goal: str, hours: int, topic: Optional[str] = None) -> dict:
+    topic = topic or f"{goal}: part {week_number}"
+    return {
+        "week_number": week_number,
+        "topic": topic,
+        "subtopics": [f"{topic} - concept {i}" for i in range(1, 5)],
+        "why_this_first": f"Builds on week {week_number - 1}." if week_number > 1 else "Sets up the foundations.",
+        "prerequisites_covered": [f"Week {week_number - 1} material"] if week_number > 1 else [],
+        "resources": [
+            {
+                "title": f"{topic} ({kind})",
+                "type": kind,
+                "search_query": f"Search YouTube for: '{topic} {kind}'",
+                "estimated_time": "2 hours"
+            }
+            for kind in ("video", "article", "practice")
+        ],
+        "estimated_hours": float(hours),
+        "key_takeaways": [f"Understand {topic}", f"Apply {topic} in a small project"]
+    }
+
+def _profile(prompt: str) -> dict:
+    goal = re.search(r"Target Goal: (.*)", prompt)
+    skills = re.search(r"Current Skills: (.*)", prompt)
+    hours = re.search(r"(\d+) hours/week", prompt)
+    weeks = re.search(r"hours/week for (\d+) weeks", prompt)
+    return {
+        "goal": goal.group(1).strip() if goal else "the goal",
+        "skills": skills.group(1).strip() if skills else "current skills",
+        "hours": int(hours.group(1)) if hours else 5,
+        "weeks": int(weeks.group(1)) if weeks else 4
+    }
+
+def fake_response(prompt: str) -> str:
+    """Deterministic JSON answer to one of the app's prompts"""
+    quiz = re.search(r"Generate (\d+) multiple-choice questions for Week (\d+) covering: (.*)", prompt)
+    if quiz:
+        count, topics = int(quiz.group(1)), quiz.group(3).strip()
+        return json.dumps({
+            "questions": [
+                {
+                    "question": f"Question {i} about {topics}?",
+                    "options": [{"text": f"Option {j}", "is_correct": j == i % 4 + 1} for j in range(1, 5)],
+                    "explanation": f"Option {i % 4 + 1} applies {topics} correctly."
+                }
+                for i in range(1, count + 1)
+            ]
+        })
+    
+    profile = _profile(prompt)
+    revision = re.search(r"Rewrite weeks: ([\d, ]+)", prompt)
+    if revision:
+        numbers = [int(number) for number in revision.group(1).split(",")]
+        return json.dumps({
+            "weeks": [
+                _fake_week(n, profile["goal"], profile["hours"], f"{profile['goal']}: revised part {n}")
+                for n in numbers
+            ]
+        })
+    
+    details = re.search(r"Write full details for weeks: ([\d, ]+)", prompt)
+    if details:
+        outline = dict(
+            (int(number), topic)
+            for number, topic in re.findall(r"^- Week (\d+): (.*)$", prompt, re.MULTILINE)
+        )
+        numbers = [int(number) for number in details.group(1).split(",")]
+        return json.dumps({
+            "weeks": [_fake_week(n, profile["goal"], profile["hours"], outline.get(n)) for n in numbers]
+        })
+    
+    weeks = [_fake_week(n, profile["goal"], profile["hours"]) for n in range(1, profile["weeks"] + 1)]
+    data = {
+        "path_title": f"From {profile['skills']} to {profile['goal']}",
+        "total_weeks": profile["weeks"],
+        "total_hours": float(profile["hours"] * profile["weeks"]),
+        "weekly_breakdown": weeks,
+        "final_project": f"Capstone project: {profile['goal']}"
+    }
+    if '"outline"' in prompt:
+        data["outline"] = [
+            {"week_number": week["week_number"], "topic": week["topic"], "prerequisites_covered": week["prerequisites_covered"]}
+            for week in data.pop("weekly_breakdown")
+        ]
+    return json.dumps(data)
+
+def create_llm_backend() -> LLMBackend:
+    """Build the backend selected by LLM_BACKEND"""
+    if settings.llm_backend == "fake":
+        return FakeBackend()
+    return CerebrasBackend()
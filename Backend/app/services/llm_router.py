@@ -0,0 +1,301 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+from cerebras.cloud.sdk import APIConnectionError
+from app.config import get_settings
+from app.services.llm_backends import Completion, LLMBackend
+from app.utils.metrics import LLM_CALL_SECONDS, LLM_CALLS, span
+
+settings = get_settings()
+
+# Provider statuses worth another try; other 4xx (bad request, auth) fail the same way again
+RETRYABLE_STATUS = {408, 409, 429}
+
+# Failures before an answer came back (APITimeoutError is an APIConnectionError)
+RETRYABLE_ERRORS = (APIConnectionError, ConnectionError, TimeoutError)
+
+# Error rates only count the last minute, so a model that lost its traffic
+# gets tried again once its failures age out; and only from a few calls up
+ERROR_RATE_SECONDS = 60
+ERROR_RATE_MIN_CALLS = 5
+
+def is_retryable(error: Exception) -> bool:
+    """Timeouts, connection errors, rate limits and server errors are retried"""
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status is not None and (status in RETRYABLE_STATUS or status >= 500)
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff before retry number `attempt` (1-based)"""
+    cap = min(settings.llm_retry_max_delay, settings.llm_retry_base_delay * 2 ** (attempt - 1))
+    return random.uniform(0, cap)
+
+class LatencyWindow:
+    """The most recent call latencies, for rolling percentiles"""
+    
+    def __init__(self, size: int):
+        self._samples: Deque[float] = deque(maxlen=size)
+    
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+    
+    def __len__(self) -> int:
+        return len(self._samples)
+    
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+class ModelStats:
+    """Rolling latency and error rate for one model.
+    
+    Latencies are also kept per call shape (kind of call and expected output
+    size, to a power of two), since a quiz and a 52-week roadmap on the same
+    model have nothing in common; hedging compares a call against its shape.
+    """
+    
+    def __init__(self, window: int):
+        self.window = window
+        self.latency = LatencyWindow(window)
+        self._shapes: Dict[Tuple[str, int], LatencyWindow] = {}
+        self._outcomes: Deque[Tuple[float, bool]] = deque(maxlen=window)  # (time, failed)
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+    
+    def record_success(self, shape: Tuple[str, int], seconds: float, completion: Completion):
+        self.calls += 1
+        self.latency.add(seconds)
+        window = self._shapes.get(shape)
+        if window is None:
+            window = self._shapes[shape] = LatencyWindow(self.window)
+        window.add(seconds)
+        self._outcomes.append((time.monotonic(), False))
+        self.prompt_tokens += completion.prompt_tokens
+        self.completion_tokens += completion.completion_tokens
+    
+    def record_failure(self, timeout: bool = False):
+        self.calls += 1
+        self.errors += 1
+        if timeout:
+            self.timeouts += 1
+        self._outcomes.append((time.monotonic(), True))
+    
+    def error_rate(self) -> float:
+        horizon = time.monotonic() - ERROR_RATE_SECONDS
+        while self._outcomes and self._outcomes[0][0] < horizon:
+            self._outcomes.popleft()
+        if len(self._outcomes) < ERROR_RATE_MIN_CALLS:
+            return 0.0
+        return sum(failed for _, failed in self._outcomes) / len(self._outcomes)
+    
+    def hedge_delay(self, shape: Tuple[str, int]) -> Optional[float]:
+        """Rolling p95 for the shape, once it has LLM_HEDGE_MIN_SAMPLES calls"""
+        window = self._shapes.get(shape)
+        if window is None or len(window) < settings.llm_hedge_min_samples:
+            return None
+        return window.percentile(95)
+    
+    def stats(self) -> dict:
+        p50, p95 = self.latency.percentile(50), self.latency.percentile(95)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "recent_error_rate": round(self.error_rate(), 4),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
+
+class ModelRouter:
+    """Picks the model for each LLM call and makes the call resilient.
+    
+    Calls of the LLM_FAST_KINDS, or expected to write at most
+    LLM_FAST_MAX_TOKENS, go to LLM_FAST_MODEL; the rest to CEREBRAS_MODEL.
+    The other model is the fallback: it is tried first when the preferred
+    one failed more than LLM_ROUTE_MAX_ERROR_RATE of its calls in the last
+    minute, and for the last retry. Each attempt holds an in-flight slot
+    and has a timeout counted from getting it; retries back off with
+    full jitter. With hedging on, an attempt still running after its
+    model's rolling p95 for that shape of call gets a duplicate and the
+    first answer wins, within a budget of LLM_HEDGE_MAX_RATIO extra calls.
+    """
+    
+    def __init__(self, in_flight: asyncio.Semaphore):
+        self._in_flight = in_flight
+        self.models: Dict[str, ModelStats] = {}
+        self.calls = 0
+        self.retries = 0
+        self.fallbacks = 0
+        self.hedges = 0
+    
+    def _stats(self, model: str) -> ModelStats:
+        stats = self.models.get(model)
+        if stats is None:
+            stats = self.models[model] = ModelStats(settings.llm_stats_window)
+        return stats
+    
+    def route(self, kind: str, expected_tokens: int) -> List[str]:
+        """Models to try for a call, best first"""
+        large = settings.cerebras_model
+        fast = settings.llm_fast_model or large
+        fast_kinds = {name.strip() for name in settings.llm_fast_kinds.split(",") if name.strip()}
+        if kind in fast_kinds or expected_tokens <= settings.llm_fast_max_tokens:
+            order = [fast, large]
+        else:
+            order = [large, fast]
+        if order[0] == order[1]:
+            return order[:1]
+        # Feedback: a model that keeps failing gives way to the other tier
+        if self._stats(order[0]).error_rate() > settings.llm_route_max_error_rate >= self._stats(order[1]).error_rate():
+            order.reverse()
+        return order
+    
+    async def complete(
+        self, backend: LLMBackend, messages: List[dict], max_tokens: int, kind: str, expected_tokens: int
+    ) -> Completion:
+        shape = self._shape(kind, expected_tokens)
+        preferred = None
+        last_error: Optional[Exception] = None
+        for attempt in range(settings.llm_max_retries + 1):
+            order = self.route(kind, expected_tokens)
+            preferred = preferred or order[0]
+            # The final retry goes to the fallback model, if there is one
+            model = order[-1] if attempt and attempt == settings.llm_max_retries else order[0]
+            if attempt:
+                self.retries += 1
+                await asyncio.sleep(backoff_delay(attempt))
+            if model != preferred:
+                self.fallbacks += 1
+        
+            self.calls += 1
+            # Waiting for a slot is not the model being slow: the timeout and
+            # the hedge clock only start once the call holds one
+            async with self._in_flight:
+                try:
+                    return await asyncio.wait_for(
+                        self._hedged(backend, model, messages, max_tokens, kind, shape),
+                        timeout=settings.llm_timeout
+                    )
+                except asyncio.TimeoutError:
+                    self._stats(model).record_failure(timeout=True)
+                    LLM_CALLS.inc(model=model, kind=kind, outcome="timeout")
+                    last_error = TimeoutError(f"{model} did not answer within {settings.llm_timeout:g}s")
+                except Exception as e:
+                    last_error = e
+                    if not is_retryable(e):
+                        raise
+        raise last_error
+    
+    @staticmethod
+    def _shape(kind: str, expected_tokens: int) -> Tuple[str, int]:
+        return (kind, max(1, expected_tokens).bit_length())
+    
+    def record_stream(
+        self, model: str, kind: str, expected_tokens: int, seconds: float, completion: Optional[Completion]
+    ):
+        """Count a streamed call (made outside complete()) like a routed one;
+        completion is None when the stream failed"""
+        self.calls += 1
+        stats = self._stats(model)
+        if completion is None:
+            stats.record_failure()
+            LLM_CALLS.inc(model=model, kind=kind, outcome="error")
+            return
+        stats.record_success(self._shape(kind, expected_tokens), seconds, completion)
+        LLM_CALLS.inc(model=model, kind=kind, outcome="ok")
+        LLM_CALL_SECONDS.observe(seconds, model=model, kind=kind)
+    
+    async def _call(
+        self, backend: LLMBackend, model: str, messages: List[dict], max_tokens: int, kind: str,
+        shape: Tuple[str, int]
+    ) -> Completion:
+        stats = self._stats(model)
+        start = time.perf_counter()
+        try:
+            with span("llm_call"):
+                completion = await backend.complete(messages, max_tokens, model=model)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            stats.record_failure()
+            LLM_CALLS.inc(model=model, kind=kind, outcome="error")
+            raise
+        seconds = time.perf_counter() - start
+        stats.record_success(shape, seconds, completion)
+        LLM_CALLS.inc(model=model, kind=kind, outcome="ok")
+        LLM_CALL_SECONDS.observe(seconds, model=model, kind=kind)
+        return completion
+    
+    async def _hedge_call(
+        self, backend: LLMBackend, model: str, messages: List[dict], max_tokens: int, kind: str,
+        shape: Tuple[str, int]
+    ) -> Completion:
+        """The duplicate call takes a slot of its own; the primary's is held by complete()"""
+        async with self._in_flight:
+            return await self._call(backend, model, messages, max_tokens, kind, shape)
+    
+    def _may_hedge(self) -> bool:
+        return settings.llm_hedge_enabled and self.hedges < settings.llm_hedge_max_ratio * self.calls
+    
+    async def _hedged(
+        self, backend: LLMBackend, model: str, messages: List[dict], max_tokens: int, kind: str,
+        shape: Tuple[str, int]
+    ) -> Completion:
+        stats = self._stats(model)
+        delay = stats.hedge_delay(shape) if settings.llm_hedge_enabled else None
+        primary = asyncio.ensure_future(self._call(backend, model, messages, max_tokens, kind, shape))
+        hedge = None
+        try:
+            if delay is None:
+                return await primary
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            # A hedge only goes out on a free slot; queued, it would just add load
+            if done or not self._may_hedge() or self._in_flight.locked():
+                return await primary
+        
+            # Past the p95: race a duplicate, keep the first good answer
+            self.hedges += 1
+            stats.hedges += 1
+            hedge = asyncio.ensure_future(self._hedge_call(backend, model, messages, max_tokens, kind, shape))
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            stats.hedge_wins += 1
+                        return task.result()
+            return primary.result()  # both failed: raise the original error
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+    
+    def stats(self) -> dict:
+        calls = self.calls
+        return {
+            "fast_model": settings.llm_fast_model or settings.cerebras_model,
+            "large_model": settings.cerebras_model,
+            "calls": calls,
+            "retries": self.retries,
+            "fallbacks": self.fallbacks,
+            "hedges": self.hedges,
+            "hedge_rate": round(self.hedges / calls, 4) if calls else 0.0,
+            "models": {model: stats.stats() for model, stats in self.models.items()},
+        }
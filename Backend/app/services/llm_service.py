@@ -1,45 +1,176 @@
-from cerebras.cloud.sdk import Cerebras
-import json
+import asyncio
+import time
 from app.config import get_settings
+from app.services.admission import record_usage
+from app.services.llm_backends import Completion, create_llm_backend
+from app.services.llm_router import ModelRouter
+from app.utils.json_repair import JSONExtractionError, extract_json, find_truncation
+from app.utils.metrics import LLM_TOKENS, span
+from typing import AsyncIterator, List, Optional
+
+CONTINUE_PROMPT = (
+    "Your previous response was cut off. Continue the JSON exactly where it stopped. "
+    "Output only the remaining characters, with no preamble, markdown or repetition."
+)
 
 settings = get_settings()
 
 class LLMService:
     def __init__(self):
-        self.client = Cerebras(api_key=settings.cerebras_api_key)
-        self.model = settings.cerebras_model
+        self.backend = create_llm_backend()
+        # Bound concurrent calls so a burst can't open unlimited connections
+        self._in_flight = asyncio.Semaphore(settings.llm_max_in_flight)
+        self.router = ModelRouter(self._in_flight)
+        
+        # Output quality counters
+        self.parses = 0
+        self.parse_failures = 0
+        self.extractions = 0
+        self.repairs = 0
+        self.continuations = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
     
-    async def generate_completion(self, prompt: str, max_tokens: int = 4000) -> dict:
-        """Generate completion from Cerebras API"""
+    async def generate_completion(
+        self, prompt: str, max_tokens: int = 4000, kind: str = "path", expected_tokens: Optional[int] = None
+    ) -> dict:
+        """Generate a JSON completion from the configured backend. kind and
+        expected_tokens (default max_tokens) decide which model answers."""
         try:
-            # Generate response using Cerebras (OpenAI-compatible API)
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=max_tokens,
-                temperature=0.7
-            )
+            messages = [
+                {"role": "user", "content": prompt}
+            ]
+            response_text = ""
             
-            # Extract text content
-            response_text = response.choices[0].message.content
+            for attempt in range(settings.llm_max_continuations + 1):
+                completion = await self._complete(messages, max_tokens, kind, expected_tokens)
+                content = completion.text
+                response_text += self._strip_leading_fence(content) if attempt else content
+                
+                truncated = completion.finish_reason == "length" or find_truncation(response_text)
+                if not truncated or attempt == settings.llm_max_continuations:
+                    break
+                
+                # Ask for just the rest rather than regenerating the whole thing
+                self.continuations += 1
+                messages = self._continuation_messages(prompt, response_text)
             
-            # Parse JSON response
-            # Remove markdown code blocks if present
-            cleaned_text = response_text.strip()
-            if cleaned_text.startswith("```json"):
-                cleaned_text = cleaned_text[7:]
-            if cleaned_text.startswith("```"):
-                cleaned_text = cleaned_text[3:]
-            if cleaned_text.endswith("```"):
-                cleaned_text = cleaned_text[:-3]
+            return self.parse_json(response_text)
             
-            cleaned_text = cleaned_text.strip()
-            
-            return json.loads(cleaned_text)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise Exception(f"LLM API error: {str(e)}")
+    
+    async def _complete(self, messages: List[dict], max_tokens: int, kind: str, expected_tokens: Optional[int]):
+        """One routed completion, with its token usage recorded"""
+        completion = await self.router.complete(
+            self.backend, messages, max_tokens, kind, expected_tokens or max_tokens
+        )
+        self._record_usage(completion)
+        return completion
+    
+    def _record_usage(self, completion: Completion):
+        self.prompt_tokens += completion.prompt_tokens
+        self.completion_tokens += completion.completion_tokens
+        record_usage(completion.prompt_tokens + completion.completion_tokens)
+        LLM_TOKENS.inc(completion.prompt_tokens, backend=self.backend.name, type="prompt")
+        LLM_TOKENS.inc(completion.completion_tokens, backend=self.backend.name, type="completion")
+    
+    @staticmethod
+    def _continuation_messages(prompt: str, response_text: str) -> List[dict]:
+        return [
+            {"role": "user", "content": prompt},
+            {"role": "assistant", "content": response_text},
+            {"role": "user", "content": CONTINUE_PROMPT}
+        ]
+    
+    async def stream_completion(
+        self, prompt: str, max_tokens: int = 4000, kind: str = "path", expected_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """Stream completion text deltas from the configured backend (routed, but
+        not retried or hedged: deltas may already have reached the client).
+        Output cut off mid-JSON is continued like generate_completion's; each
+        continuation arrives as one delta."""
+        try:
+            expected = expected_tokens or max_tokens
+            model = self.router.route(kind, expected)[0]
+            response_text = ""
+            completion = Completion("")
+            async with self._in_flight:
+                messages = [
+                    {"role": "user", "content": prompt}
+                ]
+                start = time.perf_counter()
+                try:
+                    async for item in self.backend.stream(messages, max_tokens, model=model):
+                        if isinstance(item, Completion):
+                            # Usage for the whole stream, sent last
+                            completion = item
+                            continue
+                        response_text += item
+                        yield item
+                except Exception:
+                    self.router.record_stream(model, kind, expected, 0.0, None)
+                    raise
+                seconds = time.perf_counter() - start
+            # Counted like generate_completion's calls (tokens, budget, latency)
+            self.router.record_stream(model, kind, expected, seconds, completion)
+            self._record_usage(completion)
             
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Failed to parse LLM response as JSON: {str(e)}")
+            for _ in range(settings.llm_max_continuations):
+                if completion.finish_reason != "length" and not find_truncation(response_text):
+                    break
+                self.continuations += 1
+                completion = await self._complete(
+                    self._continuation_messages(prompt, response_text), max_tokens, kind, expected_tokens
+                )
+                content = self._strip_leading_fence(completion.text)
+                response_text += content
+                yield content
         except Exception as e:
-            raise Exception(f"LLM API error: {str(e)}")
\ No newline at end of file
+            raise Exception(f"LLM API error: {str(e)}")
+    
+    def parse_json(self, response_text: str) -> dict:
+        """Parse a JSON completion, recovering from prose, fences, trailing
+        commas and truncation where possible"""
+        self.parses += 1
+        try:
+            with span("json_parse"):
+                result = extract_json(response_text)
+        except JSONExtractionError:
+            self.parse_failures += 1
+            raise
+        if result.extracted:
+            self.extractions += 1
+        if result.repaired:
+            self.repairs += 1
+        return result.data
+    
+    @staticmethod
+    def _strip_leading_fence(text: str) -> str:
+        # Continuations sometimes reopen a markdown code block
+        stripped = text.lstrip()
+        for fence in ("```json", "```"):
+            if stripped.startswith(fence):
+                return stripped[len(fence):].lstrip("\n")
+        return text
+    
+    async def close(self):
+        await self.backend.close()
+    
+    def stats(self) -> dict:
+        parses = self.parses
+        return {
+            "backend": self.backend.name,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "parses": parses,
+            "parse_failures": self.parse_failures,
+            "parse_failure_rate": round(self.parse_failures / parses, 4) if parses else 0.0,
+            "extractions": self.extractions,
+            "repairs": self.repairs,
+            "repair_rate": round(self.repairs / parses, 4) if parses else 0.0,
+            "continuations": self.continuations,
+            "routing": self.router.stats(),
+        }
@@ -0,0 +1,340 @@
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+def _default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def _encode(document: dict) -> str:
+    return json.dumps(document, default=_default, separators=(",", ":"))
+
+class BoundedStore:
+    """Capped document store for the no-MongoDB fallback.
+    
+    Documents are held serialized, so max_bytes bounds the memory they really
+    use. Entries leave memory least-recently-used first once max_entries or
+    max_bytes is exceeded, or when older than ttl seconds (0 = no expiry).
+    With spill_path set, every document is also written to SQLite: evicted
+    paths are read back from disk on demand and everything survives a restart.
+    
+    shared=True is for several worker processes on one spill file: reads
+    always go to SQLite (WAL lets them run alongside a writer), so no worker
+    serves a copy another one has since changed, and memory holds nothing.
+    A write there may wait up to busy_timeout for another worker's lock, so
+    callers on the event loop go through run(), which makes every call on
+    the connection from one thread of the store's own.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        ttl: int = 0,
+        spill_path: Optional[str] = None,
+        on_evict: Optional[Callable[[str], None]] = None,
+        shared: bool = False
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.shared = shared and bool(spill_path)
+    
+        self._entries: "OrderedDict[str, Tuple[str, float, Optional[str]]]" = OrderedDict()  # LRU order
+        self._inserted: Dict[str, None] = {}  # insertion order, for listing without a spill file
+        self._fingerprints: Dict[str, str] = {}
+        self._bytes = 0
+    
+        self.evictions = 0
+        self.expirations = 0
+        self.disk_reads = 0
+    
+        self._db = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._spilled = 0
+        self._counting: Optional[Future] = None
+        if spill_path:
+            self._open_spill(spill_path)
+        if self.shared:
+            # One thread: calls on the connection stay serialized, like on the event loop
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-store")
+    
+    def _open_spill(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # WAL + NORMAL: commits don't fsync, so writes stay sub-millisecond
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        # Other workers may hold the write lock for a moment
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "id TEXT PRIMARY KEY, seq INTEGER NOT NULL, fingerprint TEXT, "
+            "expires_at REAL, doc TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS documents_seq ON documents (seq)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS documents_fingerprint ON documents (fingerprint)")
+        if self.shared:
+            return
+    
+        # Warm memory with the newest documents from the previous run
+        rows = self._db.execute(
+            "SELECT id, fingerprint, expires_at, doc FROM documents ORDER BY seq DESC LIMIT ?",
+            (self.max_entries,)
+        ).fetchall()
+        for path_id, fingerprint, expires_at, encoded in reversed(rows):
+            if not self._is_expired(expires_at):
+                self._remember(path_id, encoded, expires_at, fingerprint)
+        self._evict()
+    
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        """fn(*args), on the store's thread in shared mode, where SQLite may
+        block on another worker's write lock; directly otherwise"""
+        if self._executor is None:
+            return fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+    
+    def _is_expired(self, expires_at: Optional[float]) -> bool:
+        return expires_at is not None and expires_at <= time.time()
+    
+    def _remember(self, path_id: str, encoded: str, expires_at: Optional[float], fingerprint: Optional[str]):
+        """Put an encoded document in memory (no disk write, no eviction)"""
+        previous = self._entries.pop(path_id, None)
+        if previous is not None:
+            self._bytes -= len(previous[0])
+            if previous[2] and previous[2] != fingerprint and self._fingerprints.get(previous[2]) == path_id:
+                del self._fingerprints[previous[2]]
+        self._entries[path_id] = (encoded, expires_at, fingerprint)
+        self._inserted.setdefault(path_id, None)
+        if fingerprint:
+            self._fingerprints[fingerprint] = path_id
+        self._bytes += len(encoded)
+    
+    def _forget(self, path_id: str) -> bool:
+        """Drop an entry from memory; the spill file keeps its copy"""
+        entry = self._entries.pop(path_id, None)
+        if entry is None:
+            return False
+        self._inserted.pop(path_id, None)
+        if entry[2] and self._fingerprints.get(entry[2]) == path_id:
+            del self._fingerprints[entry[2]]
+        self._bytes -= len(entry[0])
+        if self.on_evict:
+            self.on_evict(path_id)
+        return True
+    
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._forget(next(iter(self._entries)))
+            self.evictions += 1
+    
+    def _expire(self, path_id: str):
+        self._forget(path_id)
+        self.expirations += 1
+        if self._db is not None:
+            self._db.execute("DELETE FROM documents WHERE id = ?", (path_id,))
+    
+    def put(self, path_id: str, document: dict):
+        """Insert or replace a document (a replaced one keeps its list position)"""
+        encoded = _encode(document)
+        expires_at = time.time() + self.ttl if self.ttl else None
+        fingerprint = document.get("fingerprint")
+        if self._db is not None:
+            # seq comes from the file, not this process, so other writers' documents order correctly
+            self._db.execute(
+                "INSERT INTO documents (id, seq, fingerprint, expires_at, doc) "
+                "VALUES (?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM documents), ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET fingerprint = excluded.fingerprint, "
+                "expires_at = excluded.expires_at, doc = excluded.doc",
+                (path_id, fingerprint, expires_at, encoded)
+            )
+            if self.shared:
+                return
+        self._remember(path_id, encoded, expires_at, fingerprint)
+        self._evict()
+    
+    def _load(self, path_id: str) -> Optional[str]:
+        """Encoded document from memory, falling back to the spill file"""
+        entry = self._entries.get(path_id)
+        if entry is not None:
+            if self._is_expired(entry[1]):
+                self._expire(path_id)
+                return None
+            self._entries.move_to_end(path_id)
+            return entry[0]
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT fingerprint, expires_at, doc FROM documents WHERE id = ?", (path_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        fingerprint, expires_at, encoded = row
+        if self._is_expired(expires_at):
+            self._expire(path_id)
+            return None
+        self.disk_reads += 1
+        if not self.shared:
+            self._remember(path_id, encoded, expires_at, fingerprint)
+            self._evict()
+        return encoded
+    
+    def get(self, path_id: str) -> Optional[dict]:
+        encoded = self._load(path_id)
+        return json.loads(encoded) if encoded is not None else None
+    
+    def find_id_by_fingerprint(self, fingerprint: str) -> Optional[str]:
+        path_id = self._fingerprints.get(fingerprint)
+        if path_id is None and self._db is not None:
+            row = self._db.execute(
+                "SELECT id FROM documents WHERE fingerprint = ? ORDER BY seq DESC LIMIT 1", (fingerprint,)
+            ).fetchone()
+            path_id = row[0] if row else None
+        if path_id is None or self._load(path_id) is None:
+            return None
+        return path_id
+    
+    def delete(self, path_id: str) -> bool:
+        deleted = self._forget(path_id)
+        if self._db is not None:
+            deleted = self._db.execute("DELETE FROM documents WHERE id = ?", (path_id,)).rowcount > 0 or deleted
+        return deleted
+    
+    def _disk_rows(self, after: Optional[str]) -> Iterator[Tuple[str, Optional[float], str]]:
+        if after is None:
+            cursor = self._db.execute("SELECT id, expires_at, doc FROM documents ORDER BY seq DESC")
+            return iter(lambda: cursor.fetchmany(100), [])
+        row = self._db.execute("SELECT seq FROM documents WHERE id = ?", (after,)).fetchone()
+        if row is None:
+            raise KeyError(after)
+        cursor = self._db.execute(
+            "SELECT id, expires_at, doc FROM documents WHERE seq < ? ORDER BY seq DESC", (row[0],)
+        )
+        return iter(lambda: cursor.fetchmany(100), [])
+    
+    def _memory_rows(self, after: Optional[str]) -> Iterator[Tuple[str, Optional[float], str]]:
+        ids = list(self._inserted)
+        start = len(ids)
+        if after is not None:
+            if after not in self._inserted:
+                raise KeyError(after)
+            start = ids.index(after)
+        # One lazy batch; page() doesn't modify the store while walking it
+        rows = (
+            (path_id, self._entries[path_id][1], self._entries[path_id][0])
+            for path_id in reversed(ids[:start])
+        )
+        return iter([rows])
+    
+    def page(
+        self, limit: int, after: Optional[str] = None, predicate: Optional[Callable[[dict], bool]] = None
+    ) -> List[Tuple[str, dict]]:
+        """Up to limit (id, document) pairs, newest first, starting after the given id.
+        Reads don't count as use for LRU. Raises KeyError if after is unknown."""
+        batches = self._disk_rows(after) if self._db is not None else self._memory_rows(after)
+        page = []
+        for batch in batches:
+            for path_id, expires_at, encoded in batch:
+                if self._is_expired(expires_at):
+                    continue
+                document = json.loads(encoded)
+                if predicate and not predicate(document):
+                    continue
+                page.append((path_id, document))
+                if len(page) >= limit:
+                    return page
+        return page
+    
+    @contextmanager
+    def transaction(self):
+        """Make a read-modify-write atomic for processes sharing the spill file
+        (within one process it already is, having no await in between)"""
+        if not self.shared:
+            yield
+            return
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+    
+    def scan(self) -> Iterator[Tuple[str, dict]]:
+        """Every stored document, oldest first, including spilled ones (for export)"""
+        if self._db is not None:
+            cursor = self._db.execute("SELECT id, expires_at, doc FROM documents ORDER BY seq")
+            rows = (row for batch in iter(lambda: cursor.fetchmany(100), []) for row in batch)
+        else:
+            rows = (
+                (path_id, self._entries[path_id][1], self._entries[path_id][0])
+                for path_id in list(self._inserted) if path_id in self._entries
+            )
+        for path_id, expires_at, encoded in rows:
+            if not self._is_expired(expires_at):
+                yield path_id, json.loads(encoded)
+    
+    async def scan_async(self, batch_size: int = 100) -> AsyncIterator[Tuple[str, dict]]:
+        """scan() for the event loop: batches are read through run()"""
+        rows = self.scan()
+        while True:
+            batch = await self.run(lambda: list(islice(rows, batch_size)))
+            if not batch:
+                return
+            for row in batch:
+                yield row
+    
+    def __contains__(self, path_id: str) -> bool:
+        return self._load(path_id) is not None
+    
+    def items(self) -> Iterator[Tuple[str, dict]]:
+        """Documents currently held in memory"""
+        for path_id, (encoded, _, _) in list(self._entries.items()):
+            yield path_id, json.loads(encoded)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+    
+    def _count_spilled(self):
+        self._spilled = self._db.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+    
+    def stats(self) -> dict:
+        stats = {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+        if self._db is not None:
+            if self._executor is None:
+                self._count_spilled()
+            elif self._counting is None or self._counting.done():
+                # Counted on the store's thread, so as of the previous stats() call
+                self._counting = self._executor.submit(self._count_spilled)
+            stats["spilled"] = self._spilled
+            stats["disk_reads"] = self.disk_reads
+        return stats
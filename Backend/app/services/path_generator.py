@@ -1,85 +1,871 @@
+from app.services.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    Reservation,
+    charge_to,
+    estimate_path_tokens,
+    estimate_quiz_tokens,
+    estimate_weeks_tokens,
+)
 from app.services.llm_service import LLMService
 from app.services.vector_service import VectorService
 from app.services.cache_service import CacheService  # 👈 NEW
-from app.models.learning_path import UserInput, LearningPath, LearningPathResponse
+from app.services.single_flight import SingleFlight
+from app.services.background import BackgroundWorker
+from app.services.change_feed import ChangeFeed, create_change_feed
+from app.config import get_settings
+from app.models.learning_path import (
+    BatchGenerateResponse,
+    LearningPath,
+    LearningPathResponse,
+    UserInput,
+    WeekTopic,
+    WeekUpdateRequest,
+)
 from app.models.quiz import QuizRequest, QuizResponse
-from app.utils.prompts import get_learning_path_prompt, get_quiz_prompt
-import hashlib
+from app.utils.prompts import (
+    get_extend_instructions,
+    get_learning_path_prompt,
+    get_outline_prompt,
+    get_quiz_prompt,
+    get_shorten_instructions,
+    get_week_change_instructions,
+    get_week_details_prompt,
+    get_week_revision_prompt,
+)
+from app.utils.fingerprint import fingerprint_quiz, fingerprint_user_input
+from app.utils.metrics import span
+from app.utils.streaming import WeeklyBreakdownParser, format_sse
+from pydantic import ValidationError
+import asyncio
 import json
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+
+settings = get_settings()
+
+# Outline calls per fanned-out path before a short or gappy outline fails it
+OUTLINE_ATTEMPTS = 2
+
+class PathNotFound(Exception):
+    """The learning path (or week) to edit doesn't exist"""
+
+class PathEditConflict(Exception):
+    """The stored path changed while an edit was being generated"""
 
 class PathGeneratorService:
     def __init__(self):
         self.llm = LLMService()
         self.vector_store = VectorService()
         self.cache = CacheService()  # 👈 NEW
+        self._single_flight = SingleFlight()
+        self.admission = AdmissionController(self.cache)
+        # Replaced once Redis is connected, if SHARED_STATE asks for a shared feed
+        self.changes = ChangeFeed()
+        self.coalesced_remote = 0
+        self.stored_hits = 0
+        self.stale_regenerations = 0
+        self.weeks_regenerated = 0
+        self.resizes = 0
+        self.quiz_worker = BackgroundWorker(
+            "Quiz pre-generation",
+            workers=settings.quiz_pregenerate_workers,
+            queue_size=settings.quiz_pregenerate_queue_size
+        )
+    
+    async def connect(self):
+        """Connect storage backends concurrently (each falls back if unreachable)"""
+        await asyncio.gather(self.cache.connect(), self.vector_store.connect())
+        self.changes = create_change_feed(self.cache)
+        await self.changes.start(self._apply_change)
+    
+    async def close(self):
+        """Stop background work and release backend connections"""
+        await self.quiz_worker.close()
+        await self.changes.close()
+        await self.cache.close()
+        self.vector_store.close()
+        await self.llm.close()
+    
+    async def health(self) -> dict:
+        """Backend reachability; running on a fallback counts as degraded"""
+        redis_status, mongo_status = await asyncio.gather(self.cache.health(), self.vector_store.health())
+        return {
+            "status": "healthy" if redis_status == mongo_status == "up" else "degraded",
+            "components": {
+                "redis": redis_status,
+                "mongodb": mongo_status,
+                "llm_backend": self.llm.backend.name
+            }
+        }
     
     def _get_cache_key(self, user_input: UserInput) -> str:
-        """Generate cache key from user input"""
-        input_str = json.dumps(user_input.dict(), sort_keys=True)
-        return f"learning_path:{hashlib.md5(input_str.encode()).hexdigest()}"
+        """Generate cache key from the canonicalized user input"""
+        return f"learning_path:{fingerprint_user_input(user_input)}"
     
     async def generate_learning_path(self, user_input: UserInput) -> LearningPathResponse:
         """Generate a complete learning path with caching"""
         try:
             # Check cache first
             cache_key = self._get_cache_key(user_input)
-            cached_path = self.cache.get(cache_key)
+            with span("cache_lookup"):
+                cached_path = await self.cache.get_learning_path(cache_key)
             
             if cached_path:
                 print("✅ Returning cached learning path")
                 return LearningPathResponse(
                     success=True,
-                    learning_path=LearningPath(**cached_path),
+                    learning_path=cached_path,
                     message="Learning path retrieved from cache"
                 )
             
-            # Generate prompt
-            prompt = get_learning_path_prompt(user_input.dict())
+            # Identical concurrent requests share a single LLM call
+            learning_path = await self._single_flight.do(
+                cache_key,
+                lambda: self._generate_uncached(cache_key, user_input),
+                retry_on=(AdmissionRejected,)
+            )
             
-            # Get LLM response
-            path_data = await self.llm.generate_completion(prompt)
+            return LearningPathResponse(
+                success=True,
+                learning_path=learning_path,
+                message="Learning path generated successfully"
+            )
+            
+        except AdmissionRejected:
+            raise
+        except Exception as e:
+            return LearningPathResponse(
+                success=False,
+                message=f"Error generating learning path: {str(e)}"
+            )
+    
+    async def warm_learning_path(
+        self, user_input: UserInput, expire: int, generate: bool = True
+    ) -> Optional[str]:
+        """Make an input a Redis hit ahead of its first request: a stored (or
+        semantically similar) path is copied into the cache, otherwise the path
+        is generated, which stores it in MongoDB too. Returns "cached" (it
+        already was), "preloaded" or "generated"; None when the path would have
+        to be generated and generate is False."""
+        cache_key = self._get_cache_key(user_input)
+        if await self.cache.get(cache_key) is not None:
+            return "cached"
+        learning_path, _ = await self._lookup_stored(cache_key, user_input)
+        outcome = "preloaded"
+        if learning_path is None:
+            if not generate:
+                return None
+            learning_path = await self._single_flight.do(
+                cache_key,
+                lambda: self._generate_uncached(cache_key, user_input),
+                retry_on=(AdmissionRejected,)
+            )
+            outcome = "generated"
+        # Longer-lived than a path cached on demand
+        await self.cache.set_learning_path(cache_key, learning_path, expire=expire)
+        return outcome
+    
+    async def generate_batch(self, inputs: List[UserInput]) -> BatchGenerateResponse:
+        """Generate paths for many learners: equivalent inputs are generated once,
+        cache hits are served straight away and at most BATCH_GENERATE_CONCURRENCY
+        misses generate at a time. A failed input doesn't fail the batch."""
+        cache_keys = [self._get_cache_key(user_input) for user_input in inputs]
+        unique = {}
+        for cache_key, user_input in zip(cache_keys, inputs):
+            unique.setdefault(cache_key, user_input)
+        semaphore = asyncio.Semaphore(settings.batch_generate_concurrency)
+        
+        async def generate(cache_key: str, user_input: UserInput) -> LearningPathResponse:
+            cached_path = await self.cache.get_learning_path(cache_key)
+            if cached_path:
+                return LearningPathResponse(
+                    success=True,
+                    learning_path=cached_path,
+                    message="Learning path retrieved from cache"
+                )
+            async with semaphore:
+                try:
+                    return await self.generate_learning_path(user_input)
+                except AdmissionRejected as e:
+                    return LearningPathResponse(success=False, message=str(e))
+        
+        responses = await asyncio.gather(*(generate(key, user_input) for key, user_input in unique.items()))
+        by_key = dict(zip(unique, responses))
+        results = [by_key[cache_key] for cache_key in cache_keys]
+        failed = sum(not response.success for response in results)
+        return BatchGenerateResponse(
+            success=failed == 0,
+            results=results,
+            unique_inputs=len(unique),
+            failed=failed,
+            message=f"Generated learning paths for {len(inputs) - failed} of {len(inputs)} inputs"
+        )
+    
+    async def _generate_uncached(
+        self,
+        cache_key: str,
+        user_input: UserInput,
+        on_week: Optional[Callable[[WeekTopic], None]] = None,
+        reservation: Optional[Reservation] = None
+    ) -> LearningPath:
+        """Generate a path on a cache miss, holding a Redis lock so other workers wait for it.
+        With on_week the path is streamed, each week passed to it as it completes.
+        reservation is budget the caller already took; it is refunded if the path
+        turns up without an LLM call."""
+        lock = None
+        try:
+            # A previous leader may have filled the cache while this caller was checking it
+            cached_path = self.cache.local.get(cache_key)
+            if cached_path is not None:
+                return cached_path
+            
+            if settings.singleflight_distributed:
+                lock = await self.cache.acquire_lock(f"lock:{cache_key}", settings.singleflight_lock_ttl)
+                if lock is None and self.cache.enabled:
+                    cached_path = await self._wait_for_remote(cache_key)
+                    if cached_path:
+                        self.coalesced_remote += 1
+                        return cached_path
+            
+            with span("stored_lookup"):
+                stored_path, stale_id = await self._lookup_stored(cache_key, user_input)
+            if stored_path:
+                return stored_path
+            
+            # Get LLM response, once there's token budget for it
+            if reservation is None:
+                reservation = await self.admission.admit(estimate_path_tokens(user_input.duration_weeks))
+            held, reservation = reservation, None
+            async with self.admission.hold(held):
+                if on_week is None:
+                    path_data = await self._generate_path_data(user_input)
+                else:
+                    path_data = await self._stream_path_data(user_input, on_week)
             
             # Create LearningPath object
-            learning_path = LearningPath(
-                user_input=user_input,
-                **path_data
+            with span("validation"):
+                learning_path = LearningPath(
+                    user_input=user_input,
+                    **path_data
+                )
+            
+            await self._store_and_cache(cache_key, learning_path, replace_id=stale_id)
+            return learning_path
+        finally:
+            if lock is not None:
+                await self.cache.release_lock(lock)
+            await self.admission.release(reservation)
+    
+    async def _lookup_stored(
+        self, cache_key: str, user_input: UserInput
+    ) -> Tuple[Optional[LearningPath], Optional[str]]:
+        """Serve from MongoDB before calling the LLM: exact fingerprint match first,
+        then a semantically similar path. Hits are warmed back into the cache.
+        Returns (path, None) on a fresh hit, or (None, stale_id) when the stored
+        path for this exact input is past its max age and should be replaced."""
+        stored_path = await self.vector_store.find_by_fingerprint(fingerprint_user_input(user_input))
+        if stored_path:
+            if not self._is_fresh(stored_path):
+                self.stale_regenerations += 1
+                return None, stored_path["_id"]
+        else:
+            # A stored path for a near-identical input is as good as a new one
+            stored_path = await self.vector_store.find_similar_learning_path(user_input.dict())
+            if stored_path and not self._is_fresh(stored_path):
+                stored_path = None
+        
+        if not stored_path:
+            return None, None
+        
+        self.stored_hits += 1
+        learning_path = self._learning_path_from_document(stored_path, user_input)
+        await self.cache.set_learning_path(cache_key, learning_path, expire=3600)
+        return learning_path, None
+    
+    @staticmethod
+    def _is_fresh(document: dict) -> bool:
+        """Apply the staleness policy (STORED_PATH_MAX_AGE seconds, 0 = never stale)"""
+        if not settings.stored_path_max_age:
+            return True
+        created_at = document.get("created_at")
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        if not isinstance(created_at, datetime):
+            return True
+        return datetime.utcnow() - created_at < timedelta(seconds=settings.stored_path_max_age)
+    
+    @staticmethod
+    def _learning_path_from_document(document: dict, user_input: UserInput) -> LearningPath:
+        """Build a LearningPath for user_input from a stored document"""
+        path_data = dict(document)
+        path_id = path_data.pop("_id", None) or path_data.pop("id", None)
+        path_data["user_input"] = user_input
+        path_data["id"] = str(path_id) if path_id else None
+        return LearningPath(**path_data)
+    
+    @staticmethod
+    def _fans_out(user_input: UserInput) -> bool:
+        return bool(settings.fanout_min_weeks) and user_input.duration_weeks >= settings.fanout_min_weeks
+    
+    async def _generate_path_data(self, user_input: UserInput) -> dict:
+        """Generate raw path JSON, fanning out long paths into concurrent calls"""
+        if self._fans_out(user_input):
+            return await self._generate_fanout(user_input)
+        
+        with span("prompt_build"):
+            prompt = get_learning_path_prompt(user_input.dict())
+        return await self.llm.generate_completion(
+            prompt,
+            kind="path",
+            expected_tokens=user_input.duration_weeks * settings.admission_tokens_per_week
+        )
+    
+    async def _generate_fanout(self, user_input: UserInput) -> dict:
+        """Outline the whole path, then detail weeks in concurrent batches"""
+        outline_data, batches = await self._start_fanout(user_input)
+        try:
+            results = await asyncio.gather(*batches)
+        finally:
+            # A batch failed: the others would only spend LLM slots and budget
+            for batch in batches:
+                batch.cancel()
+        return self._fanout_path_data(user_input, outline_data, [week for weeks in results for week in weeks])
+    
+    async def _start_fanout(self, user_input: UserInput) -> Tuple[dict, List[asyncio.Task]]:
+        """Outline the path and start detailing its weeks: returns the outline
+        and one task per batch of weeks, in week order"""
+        user_dict = user_input.dict()
+        expected = list(range(1, user_input.duration_weeks + 1))
+        for _ in range(OUTLINE_ATTEMPTS):
+            outline_data = await self.llm.generate_completion(
+                get_outline_prompt(user_dict),
+                max_tokens=settings.fanout_outline_max_tokens,
+                kind="outline",
+                expected_tokens=user_input.duration_weeks * 30
+            )
+            outline = sorted(outline_data.get("outline", []), key=lambda week: week.get("week_number", 0))
+            # A short outline (or one cut back after truncation) would make a shorter path
+            week_numbers = [week.get("week_number") for week in outline]
+            if week_numbers == expected:
+                break
+            print(f"⚠️ Outline doesn't cover weeks 1 to {user_input.duration_weeks}, retrying")
+        else:
+            raise ValueError(
+                f"LLM outline covers {len(outline)} weeks, expected weeks 1 to {user_input.duration_weeks}"
+            )
+        
+        batch_size = max(1, settings.fanout_weeks_per_call)
+        batches = [outline[i:i + batch_size] for i in range(0, len(outline), batch_size)]
+        semaphore = asyncio.Semaphore(settings.fanout_max_concurrency)
+        
+        async def detail(batch: list) -> list:
+            async with semaphore:
+                week_numbers = [week["week_number"] for week in batch]
+                data = await self.llm.generate_completion(
+                    get_week_details_prompt(user_dict, outline, week_numbers),
+                    max_tokens=settings.fanout_detail_max_tokens,
+                    kind="details",
+                    expected_tokens=len(week_numbers) * settings.admission_tokens_per_week
+                )
+            weeks = {week["week_number"]: week for week in data["weeks"]}
+            missing = [number for number in week_numbers if number not in weeks]
+            if missing:
+                raise ValueError(f"LLM response is missing weeks {missing}")
+            return [weeks[number] for number in week_numbers]
+        
+        return outline_data, [asyncio.create_task(detail(batch)) for batch in batches]
+    
+    @staticmethod
+    def _fanout_path_data(user_input: UserInput, outline_data: dict, weeks: List[dict]) -> dict:
+        return {
+            "path_title": outline_data["path_title"],
+            "total_weeks": outline_data.get("total_weeks", user_input.duration_weeks),
+            "total_hours": outline_data.get(
+                "total_hours", user_input.hours_per_week * user_input.duration_weeks
+            ),
+            "weekly_breakdown": weeks,
+            "final_project": outline_data["final_project"],
+        }
+    
+    async def _store_and_cache(
+        self, cache_key: str, learning_path: LearningPath, replace_id: Optional[str] = None
+    ):
+        """Persist a freshly generated path (replacing a stale one if given)
+        and cache it under its input key"""
+        # Store in MongoDB
+        with span("mongo_insert"):
+            if replace_id:
+                await self.vector_store.replace_learning_path(
+                    replace_id, learning_path.dict(exclude={'id'})
+                )
+                await self._invalidate(replace_id, learning_path.user_input.dict())
+                path_id = replace_id
+            else:
+                path_id = await self.vector_store.store_learning_path(
+                    learning_path.dict(exclude={'id'})
+                )
+                # Other workers add it to their semantic index
+                await self.changes.publish(path_id, learning_path.user_input.dict())
+        learning_path.id = path_id
+        
+        # Cache the result
+        with span("cache_set"):
+            await self.cache.set_learning_path(cache_key, learning_path, expire=3600)
+        self._schedule_quiz_pregeneration(learning_path)
+    
+    def _schedule_quiz_pregeneration(self, learning_path: LearningPath):
+        """Queue quizzes for the first QUIZ_PREGENERATE_WEEKS weeks of a new path"""
+        for week in learning_path.weekly_breakdown[:settings.quiz_pregenerate_weeks]:
+            # Same topics the frontend sends when a learner opens the quiz
+            quiz_request = QuizRequest(
+                week_number=week.week_number,
+                topics=week.subtopics,
+                path_id=learning_path.id
+            )
+            self.quiz_worker.submit(lambda quiz_request=quiz_request: self._pregenerate_quiz(quiz_request))
+    
+    async def _pregenerate_quiz(self, quiz_request: QuizRequest):
+        # Best effort: skipped rather than queued when the token budget is spent
+        charge_to("quiz-pregeneration", max_wait=0)
+        await self.generate_quiz(quiz_request)
+    
+    async def stream_learning_path(self, user_input: UserInput) -> AsyncIterator[str]:
+        """Look the path up and, if it has to be generated, take its token budget
+        now, so AdmissionRejected is raised before any response is sent. Returns
+        the SSE events: one "week" per completed week, then "complete" with the
+        full response (or "error")"""
+        cache_key = self._get_cache_key(user_input)
+        learning_path = await self.cache.get_learning_path(cache_key)
+        if not learning_path:
+            learning_path, _ = await self._lookup_stored(cache_key, user_input)
+        
+        reservation = None
+        # Joining a generation already in flight here costs no budget
+        if not learning_path and cache_key not in self._single_flight:
+            reservation = await self.admission.admit(estimate_path_tokens(user_input.duration_weeks))
+        return self._stream_events(user_input, cache_key, learning_path, reservation)
+    
+    async def _stream_events(
+        self,
+        user_input: UserInput,
+        cache_key: str,
+        learning_path: Optional[LearningPath],
+        reservation: Optional[Reservation]
+    ) -> AsyncIterator[str]:
+        generation = None
+        try:
+            message = "Learning path retrieved from cache"
+            if learning_path:
+                for week in learning_path.weekly_breakdown:
+                    yield format_sse("week", week.model_dump_json())
+            else:
+                weeks: asyncio.Queue = asyncio.Queue()
+                
+                def generate():
+                    nonlocal reservation
+                    # The budget taken up front goes to the first run; a retry admits its own
+                    held, reservation = reservation, None
+                    return self._generate_uncached(cache_key, user_input, on_week=weeks.put_nowait, reservation=held)
+                
+                # Identical concurrent requests, streamed or not, share a single generation
+                generation = asyncio.ensure_future(
+                    self._single_flight.do(cache_key, generate, retry_on=(AdmissionRejected,))
+                )
+                generation.add_done_callback(lambda _: weeks.put_nowait(None))
+                streamed = 0
+                while True:
+                    week = await weeks.get()
+                    if week is None:
+                        break
+                    streamed += 1
+                    yield format_sse("week", week.model_dump_json())
+                learning_path = generation.result()
+                if not streamed:
+                    # Another request (or worker) generated it: replay its weeks
+                    for week in learning_path.weekly_breakdown:
+                        yield format_sse("week", week.model_dump_json())
+                message = "Learning path generated successfully"
+            
+            response = LearningPathResponse(
+                success=True,
+                learning_path=learning_path,
+                message=message
             )
+            yield format_sse("complete", response.model_dump_json())
             
-            # Store in MongoDB
-            path_id = await self.vector_store.store_learning_path(
-                learning_path.dict(exclude={'id'})
+        except Exception as e:
+            response = LearningPathResponse(
+                success=False,
+                message=f"Error generating learning path: {str(e)}"
             )
-            learning_path.id = path_id
+            yield format_sse("error", response.model_dump_json())
+        finally:
+            # A client going away stops waiting; the shared generation carries on
+            if generation is not None:
+                generation.cancel()
+            await self.admission.release(reservation)
+    
+    async def _stream_path_data(self, user_input: UserInput, on_week: Callable[[WeekTopic], None]) -> dict:
+        """Stream the path's completion(s), passing each completed week to on_week"""
+        if self._fans_out(user_input):
+            weeks = self._stream_fanout(user_input)
+        else:
+            weeks = self._stream_single(user_input)
+        async for item in weeks:
+            if isinstance(item, WeekTopic):
+                on_week(item)
+            else:
+                path_data = item
+        return path_data
+    
+    async def _stream_single(self, user_input: UserInput) -> AsyncIterator:
+        """One streamed completion: yields each week (a WeekTopic) as its closing
+        brace arrives, then the path JSON"""
+        prompt = get_learning_path_prompt(user_input.dict())
+        parser = WeeklyBreakdownParser()
+        chunks = []
+        async for delta in self.llm.stream_completion(
+            prompt,
+            kind="path",
+            expected_tokens=user_input.duration_weeks * settings.admission_tokens_per_week
+        ):
+            chunks.append(delta)
+            for week_data in parser.feed(delta):
+                # Partial weeks that fail validation surface in the final parse
+                try:
+                    yield WeekTopic(**week_data)
+                except ValidationError:
+                    continue
+        yield self.llm.parse_json("".join(chunks))
+    
+    async def _stream_fanout(self, user_input: UserInput) -> AsyncIterator:
+        """Outline plus concurrent week batches: yields each batch's weeks (as
+        WeekTopics) once it and the batches before it are done, then the path JSON"""
+        outline_data, batches = await self._start_fanout(user_input)
+        weeks = []
+        try:
+            for batch in batches:
+                for week_data in await batch:
+                    weeks.append(week_data)
+                    try:
+                        yield WeekTopic(**week_data)
+                    except ValidationError:
+                        continue
+        finally:
+            # The client went away or a batch failed: the rest won't be used
+            for batch in batches:
+                batch.cancel()
+        yield self._fanout_path_data(user_input, outline_data, weeks)
+    
+    async def _wait_for_remote(self, cache_key: str) -> Optional[LearningPath]:
+        """Poll the cache while another worker holds the generation lock"""
+        lock_name = f"lock:{cache_key}"
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.singleflight_lock_ttl
+        while loop.time() < deadline:
+            await asyncio.sleep(settings.singleflight_poll_interval)
+            cached_path = await self.cache.get_learning_path(cache_key)
+            if cached_path:
+                return cached_path
+            if not await self.cache.lock_exists(lock_name):
+                return None
+        return None
+    
+    async def import_learning_paths(self, lines: AsyncIterator[bytes]) -> dict:
+        """Validate NDJSON learning paths (as written by the export) and store
+        them IMPORT_CHUNK_SIZE at a time. Invalid lines are skipped and reported;
+        paths already stored (same id or equivalent input) count as duplicates."""
+        imported = duplicates = invalid = 0
+        errors = []
+        chunk = []
+        
+        async def flush():
+            nonlocal imported, duplicates
+            inserted, skipped = await self.vector_store.insert_learning_paths(chunk)
+            imported += inserted
+            duplicates += skipped
+            chunk.clear()
+        
+        line_number = 0
+        async for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+            try:
+                document = json.loads(line)
+                if not isinstance(document, dict):
+                    raise ValueError("expected a JSON object")
+                learning_path = LearningPath(**document).dict(exclude={'id'})
+            except ValueError as e:  # includes JSON and pydantic validation errors
+                invalid += 1
+                if len(errors) < 20:
+                    errors.append({"line": line_number, "error": str(e)[:300]})
+                continue
             
-            # Cache the result
-            self.cache.set(cache_key, learning_path.dict(), expire=3600)
+            path_id = document.get("_id") or document.get("id")
+            if path_id:
+                learning_path["_id"] = str(path_id)
+            if isinstance(document.get("quizzes"), dict):
+                learning_path["quizzes"] = document["quizzes"]
+            chunk.append(learning_path)
+            if len(chunk) >= settings.import_chunk_size:
+                await flush()
+        if chunk:
+            await flush()
+        
+        return {
+            "success": True,
+            "imported": imported,
+            "duplicates": duplicates,
+            "invalid": invalid,
+            "errors": errors,
+        }
+    
+    async def regenerate_week(
+        self, path_id: str, week_number: int, update: WeekUpdateRequest
+    ) -> LearningPathResponse:
+        """Rewrite one week of a stored path. The LLM only sees that week's
+        neighbours, and only that array element is written back."""
+        try:
+            learning_path = await self._load_for_edit(path_id)
+            weeks = learning_path.weekly_breakdown
+            index = next((i for i, week in enumerate(weeks) if week.week_number == week_number), None)
+            if index is None:
+                raise PathNotFound(f"Week {week_number} not found in learning path")
             
+            [week] = await self._generate_weeks(
+                learning_path,
+                self._context_weeks(weeks, index, index + 1),
+                [week_number],
+                get_week_change_instructions(update.topic, update.instructions)
+            )
+            if not await self.vector_store.update_week(path_id, index, week.model_dump()):
+                raise PathEditConflict("Learning path changed while the week was being generated, try again")
+            await self._invalidate(path_id)
+            self.weeks_regenerated += 1
+            
+            weeks[index] = week
             return LearningPathResponse(
                 success=True,
                 learning_path=learning_path,
-                message="Learning path generated successfully"
+                message=f"Week {week_number} regenerated"
             )
-            
+        except (PathNotFound, PathEditConflict, AdmissionRejected):
+            raise
         except Exception as e:
             return LearningPathResponse(
                 success=False,
-                message=f"Error generating learning path: {str(e)}"
+                message=f"Error regenerating week: {str(e)}"
             )
     
-    async def generate_quiz(self, quiz_request: QuizRequest) -> QuizResponse:
-        """Generate a quiz for a specific week"""
+    async def resize_learning_path(self, path_id: str, duration_weeks: int) -> LearningPathResponse:
+        """Change a stored path's length. Longer paths get only the new weeks
+        generated, continuing from the last ones; shorter paths keep their first
+        weeks and get a new final week condensing the ones it replaces."""
         try:
-            prompt = get_quiz_prompt(
-                quiz_request.week_number,
-                quiz_request.topics
+            learning_path = await self._load_for_edit(path_id)
+            weeks = learning_path.weekly_breakdown
+            old_length = len(weeks)
+            if duration_weeks == old_length:
+                return LearningPathResponse(
+                    success=True,
+                    learning_path=learning_path,
+                    message="Learning path already has that duration"
+                )
+            
+            new_weeks = []
+            if duration_weeks > old_length:
+                keep = old_length
+                instructions = get_extend_instructions(old_length, duration_weeks)
+                next_number = weeks[-1].week_number + 1 if weeks else 1
+                batch_size = max(1, settings.fanout_weeks_per_call)
+                # One call per batch, in order, each continuing from the weeks before it
+                while keep + len(new_weeks) < duration_weeks:
+                    count = min(batch_size, duration_weeks - keep - len(new_weeks))
+                    written = weeks + new_weeks
+                    new_weeks += await self._generate_weeks(
+                        learning_path,
+                        self._context_weeks(written, len(written), len(written)),
+                        list(range(next_number, next_number + count)),
+                        instructions
+                    )
+                    next_number += count
+            else:
+                keep = duration_weeks - 1
+                dropped = [week.model_dump(include={"week_number", "topic"}) for week in weeks[keep:]]
+                new_weeks = await self._generate_weeks(
+                    learning_path,
+                    self._context_weeks(weeks, keep, old_length),
+                    [weeks[keep].week_number],
+                    get_shorten_instructions(old_length, duration_weeks, dropped)
+                )
+            
+            user_input = learning_path.user_input.model_copy(update={"duration_weeks": duration_weeks})
+            updates = {
+                "user_input": user_input.dict(),
+                "total_weeks": duration_weeks,
+                "total_hours": float(user_input.hours_per_week * duration_weeks),
+            }
+            resized = await self.vector_store.resize_learning_path(
+                path_id, old_length, keep, [week.model_dump() for week in new_weeks], updates
             )
+            if not resized:
+                raise PathEditConflict("Learning path changed while it was being resized, try again")
+            await self._invalidate(path_id, updates["user_input"])
+            self.resizes += 1
             
-            quiz_data = await self.llm.generate_completion(prompt, max_tokens=2000)
+            learning_path = learning_path.model_copy(update={
+                **updates,
+                "user_input": user_input,
+                "weekly_breakdown": weeks[:keep] + new_weeks,
+            })
+            return LearningPathResponse(
+                success=True,
+                learning_path=learning_path,
+                message=f"Learning path resized from {old_length} to {duration_weeks} weeks"
+            )
+        except (PathNotFound, PathEditConflict, AdmissionRejected):
+            raise
+        except Exception as e:
+            return LearningPathResponse(
+                success=False,
+                message=f"Error resizing learning path: {str(e)}"
+            )
+    
+    async def _load_for_edit(self, path_id: str) -> LearningPath:
+        document = await self.vector_store.get_learning_path(path_id)
+        if not document:
+            raise PathNotFound("Learning path not found")
+        # In-memory documents don't carry their id
+        document = dict(document, _id=path_id)
+        return self._learning_path_from_document(document, UserInput(**document["user_input"]))
+    
+    @staticmethod
+    def _context_weeks(weeks: List[WeekTopic], start: int, end: int) -> List[dict]:
+        """Compact form of the REGENERATE_CONTEXT_WEEKS weeks either side of weeks[start:end]"""
+        around = settings.regenerate_context_weeks
+        context = weeks[max(0, start - around):start] + weeks[end:end + around]
+        return [week.model_dump(include={"week_number", "topic", "subtopics"}) for week in context]
+    
+    async def _generate_weeks(
+        self, learning_path: LearningPath, context: List[dict], week_numbers: List[int], instructions: str
+    ) -> List[WeekTopic]:
+        """Generate full details for the given week numbers in one LLM call"""
+        prompt = get_week_revision_prompt(
+            learning_path.user_input.dict(), context, week_numbers, instructions, learning_path.final_project
+        )
+        async with self.admission.reserve(estimate_weeks_tokens(len(week_numbers))):
+            data = await self.llm.generate_completion(
+                prompt,
+                max_tokens=settings.fanout_detail_max_tokens,
+                kind="weeks",
+                expected_tokens=len(week_numbers) * settings.admission_tokens_per_week
+            )
+        weeks = {week["week_number"]: week for week in data["weeks"]}
+        missing = [number for number in week_numbers if number not in weeks]
+        if missing:
+            raise ValueError(f"LLM response is missing weeks {missing}")
+        return [WeekTopic(**weeks[number]) for number in week_numbers]
+    
+    async def delete_learning_path(self, path_id: str) -> bool:
+        """Delete a stored learning path and invalidate its cache entries"""
+        deleted = await self.vector_store.delete_learning_path(path_id)
+        if deleted:
+            await self._invalidate(path_id, deleted=True)
+        return deleted
+    
+    async def _invalidate(self, path_id: str, user_input: Optional[dict] = None, deleted: bool = False):
+        """Drop the cached copies of a changed path, here and in the other workers
+        (user_input: the path's input if it changed, for their semantic index)"""
+        keys = await self.cache.invalidate_learning_path(path_id)
+        await self.changes.publish(path_id, user_input, deleted, keys)
+    
+    def _apply_change(self, change: Optional[dict]):
+        """Another worker stored, edited or deleted a path: forget this worker's
+        copy. None means changes may have been missed, so the whole L1 goes."""
+        if change is None:
+            self.cache.local.clear()
+            return
+        path_id = change["path_id"]
+        for key in change.get("keys", []):
+            self.cache.local.delete(key)
+        self.cache.local.delete_where(lambda learning_path: learning_path.id == path_id)
+        if change["deleted"]:
+            self.vector_store.reindex(path_id, None)
+        elif change["user_input"]:
+            self.vector_store.reindex(path_id, change["user_input"])
+    
+    def stats(self) -> dict:
+        """Counters for coalesced generations and cache tiers"""
+        single_flight = self._single_flight.stats()
+        single_flight["coalesced_remote"] = self.coalesced_remote
+        return {
+            "single_flight": single_flight,
+            "llm": self.llm.stats(),
+            "cache": self.cache.stats(),
+            "semantic_cache": self.vector_store.semantic_stats(),
+            "stored_paths": {
+                "hits": self.stored_hits,
+                "stale_regenerations": self.stale_regenerations,
+            },
+            "partial_regeneration": {
+                "weeks_regenerated": self.weeks_regenerated,
+                "resizes": self.resizes,
+            },
+            "memory_store": self.vector_store.memory_store_stats(),
+            "admission": self.admission.stats(),
+            "quiz_pregeneration": self.quiz_worker.stats(),
+            "shared_state": self.changes.stats(),
+        }
+    
+    async def generate_quiz(self, quiz_request: QuizRequest) -> QuizResponse:
+        """Generate a quiz for a specific week (cached by week and topics)"""
+        try:
+            quiz_key = f"quiz:{fingerprint_quiz(quiz_request.week_number, quiz_request.topics)}"
+            quiz = await self.cache.get_quiz(quiz_key)
+            if quiz:
+                return quiz
             
-            return QuizResponse(
-                week_number=quiz_request.week_number,
-                **quiz_data
+            return await self._single_flight.do(
+                quiz_key,
+                lambda: self._generate_quiz_uncached(quiz_key, quiz_request),
+                retry_on=(AdmissionRejected,)
             )
             
+        except AdmissionRejected:
+            raise
         except Exception as e:
             raise Exception(f"Error generating quiz: {str(e)}")
+    
+    async def _generate_quiz_uncached(self, quiz_key: str, quiz_request: QuizRequest) -> QuizResponse:
+        """Serve a quiz stored with its path, or generate, cache and store a new one"""
+        if quiz_request.path_id:
+            stored_quiz = await self.vector_store.get_quiz(quiz_request.path_id, quiz_key)
+            if stored_quiz:
+                quiz = QuizResponse(**stored_quiz)
+                await self.cache.set_quiz(quiz_key, quiz)
+                return quiz
+        
+        prompt = get_quiz_prompt(
+            quiz_request.week_number,
+            quiz_request.topics
+        )
+        
+        async with self.admission.reserve(estimate_quiz_tokens()):
+            quiz_data = await self.llm.generate_completion(
+                prompt,
+                max_tokens=2000,
+                kind="quiz",
+                expected_tokens=settings.admission_quiz_tokens
+            )
+        
+        quiz = QuizResponse(
+            week_number=quiz_request.week_number,
+            **quiz_data
+        )
+        
+        await self.cache.set_quiz(quiz_key, quiz)
+        if quiz_request.path_id:
+            await self.vector_store.store_quiz(quiz_request.path_id, quiz_key, quiz.dict())
+        return quiz
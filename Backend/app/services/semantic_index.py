@@ -0,0 +1,65 @@
+import numpy as np
+from typing import Dict, Hashable, List, Optional, Tuple
+
+class _Bucket:
+    """Contiguous matrix of unit vectors for brute-force cosine search"""
+    
+    def __init__(self, dim: int):
+        self.vectors = np.zeros((16, dim), dtype=np.float32)
+        self.ids: List[str] = []
+    
+    def add(self, path_id: str, vector: np.ndarray):
+        if len(self.ids) == len(self.vectors):
+            grown = np.zeros((len(self.vectors) * 2, self.vectors.shape[1]), dtype=np.float32)
+            grown[:len(self.ids)] = self.vectors
+            self.vectors = grown
+        self.vectors[len(self.ids)] = vector
+        self.ids.append(path_id)
+    
+    def remove(self, path_id: str):
+        # Swap with the last row to keep the matrix dense
+        index = self.ids.index(path_id)
+        last = len(self.ids) - 1
+        self.vectors[index] = self.vectors[last]
+        self.ids[index] = self.ids[last]
+        self.ids.pop()
+    
+    def search(self, vector: np.ndarray) -> Tuple[Optional[str], float]:
+        if not self.ids:
+            return None, 0.0
+        scores = self.vectors[:len(self.ids)] @ vector
+        best = int(np.argmax(scores))
+        return self.ids[best], float(scores[best])
+
+class SemanticIndex:
+    """In-memory nearest-neighbour index partitioned by an exact-match key
+    (hours per week and duration), so only compatible paths are scored"""
+    
+    def __init__(self, dim: int):
+        self.dim = dim
+        self._buckets: Dict[Hashable, _Bucket] = {}
+        self._keys: Dict[str, Hashable] = {}
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def add(self, path_id: str, key: Hashable, vector: np.ndarray):
+        if path_id in self._keys:
+            self.remove(path_id)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(self.dim)
+        bucket.add(path_id, vector)
+        self._keys[path_id] = key
+    
+    def remove(self, path_id: str):
+        key = self._keys.pop(path_id, None)
+        if key is not None:
+            self._buckets[key].remove(path_id)
+    
+    def search(self, key: Hashable, vector: np.ndarray) -> Tuple[Optional[str], float]:
+        """Best (path_id, cosine score) within the key's partition"""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return None, 0.0
+        return bucket.search(vector)
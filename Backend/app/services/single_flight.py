@@ -0,0 +1,52 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+class SingleFlight:
+    """Collapse concurrent calls sharing a key into one in-flight execution"""
+    
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.retried = 0
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]], retry_on: Tuple[type, ...] = ()) -> Any:
+        """Run fn() once per key; concurrent callers await the same result.
+        
+        retry_on lists errors that belong to the leader rather than the work
+        (e.g. its client being over budget): a follower that gets one starts
+        a fresh execution in its own context instead of sharing the failure.
+        """
+        while True:
+            task = self._calls.get(key)
+            leader = task is None
+            if leader:
+                self.leaders += 1
+                # Run as a task so a disconnecting leader doesn't cancel the shared work
+                task = asyncio.ensure_future(fn())
+                self._calls[key] = task
+                task.add_done_callback(lambda done: self._forget(key, done))
+            else:
+                self.coalesced += 1
+            try:
+                return await asyncio.shield(task)
+            except retry_on:
+                if leader:
+                    raise
+                self._forget(key, task)
+                self.retried += 1
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._calls
+    
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+    
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "retried": self.retried,
+        }
@@ -1,94 +1,689 @@
+import asyncio
 import os
+import time
+import numpy as np
 from app.config import get_settings
-from typing import Optional, Dict, Any
+from app.services.memory_store import BoundedStore
+from app.services.semantic_index import SemanticIndex
+from app.utils.embedding import embed_user_input, goal_tokens
+from app.utils.fingerprint import canonicalize_user_input, fingerprint_user_input
+from app.utils.metrics import mongo_timer
+from typing import AsyncIterator, Optional, Dict, Any, Tuple
 import uuid
 
 settings = get_settings()
 
+# Fields returned by the list endpoint's summary view
+SUMMARY_PROJECTION = {
+    "path_title": 1,
+    "total_weeks": 1,
+    "total_hours": 1,
+    "created_at": 1,
+    "user_input.target_goal": 1,
+}
+
+# Fields kept on stored documents for the service's own use, never served with a path
+PATH_PROJECTION = {"embedding": 0, "quizzes": 0, "fingerprint": 0}
+
+def _served(path: dict) -> dict:
+    """PATH_PROJECTION applied to a fallback-store document"""
+    return {field: value for field, value in path.items() if field not in PATH_PROJECTION}
+
+async def _iterate(items: list) -> AsyncIterator[Dict[str, Any]]:
+    for item in items:
+        yield item
+
 class VectorService:
     def __init__(self):
-        """Initialize MongoDB connection - made optional for development"""
+        """Set up storage - MongoDB is connected lazily and optional for development"""
         self.client = None
         self.db = None
         self.collection = None
-        self._in_memory_store = {}  # Fallback for when MongoDB is not available
+        self._connected = False
+        self._connect_lock = asyncio.Lock()
+        
+        # Semantic cache (in-memory backend); Mongo documents also keep the embedding
+        self.semantic_index = SemanticIndex(settings.embedding_dim)
+        self.semantic_lookups = 0
+        self.semantic_hits = 0
+        self.semantic_lookup_seconds = 0.0
         
-        # Try to connect to MongoDB, but don't fail if not available
-        if settings.mongodb_atlas_uri and "placeholder" not in settings.mongodb_atlas_uri:
+        # Fallback for when MongoDB is not available; opened on first use
+        self._in_memory_store: Optional[BoundedStore] = None
+    
+    async def connect(self):
+        """Connect to MongoDB, falling back to in-memory storage if unavailable"""
+        async with self._connect_lock:
+            if self._connected:
+                return
+            self._connected = True
+            
+            if not settings.mongodb_atlas_uri or "placeholder" in settings.mongodb_atlas_uri:
+                print("⚠️ MongoDB not configured, using in-memory storage")
+                self._open_memory_store()
+                return
+            
             try:
-                from pymongo import MongoClient
-                self.client = MongoClient(settings.mongodb_atlas_uri, serverSelectionTimeoutMS=5000)
+                from motor.motor_asyncio import AsyncIOMotorClient
+                self.client = AsyncIOMotorClient(
+                    settings.mongodb_atlas_uri,
+                    serverSelectionTimeoutMS=5000,
+                    maxPoolSize=settings.mongodb_max_pool_size,
+                    minPoolSize=settings.mongodb_min_pool_size
+                )
                 # Test connection
-                self.client.server_info()
+                await self.client.server_info()
                 self.db = self.client[settings.mongodb_db_name]
                 self.collection = self.db[settings.mongodb_collection_name]
                 print("✅ MongoDB connected successfully")
+                # Sparse so documents not yet backfilled don't collide
+                await self.collection.create_index("fingerprint", unique=True, sparse=True)
+                # Keyset pagination, newest first, optionally within one goal
+                await self.collection.create_index([("user_input.target_goal", 1), ("_id", -1)])
+                if settings.semantic_cache_enabled and settings.semantic_cache_backend == "memory":
+                    await self._load_semantic_index()
             except Exception as e:
                 print(f"⚠️ MongoDB not available, using in-memory storage: {e}")
                 self.client = None
-        else:
-            print("⚠️ MongoDB not configured, using in-memory storage")
+                self.collection = None
+                self._open_memory_store()
+    
+    def _open_memory_store(self):
+        """Open the bounded fallback store and index the paths it reloaded"""
+        shared = settings.shared_state != "none"
+        if shared and not settings.memory_store_spill_path:
+            print("⚠️ SHARED_STATE needs MEMORY_STORE_SPILL_PATH without MongoDB - each worker keeps its own paths")
+        self._in_memory_store = BoundedStore(
+            max_entries=settings.memory_store_max_entries,
+            max_bytes=settings.memory_store_max_bytes,
+            ttl=settings.memory_store_ttl,
+            spill_path=settings.memory_store_spill_path or None,
+            # Paths that leave memory leave the semantic index too, so it stays bounded
+            on_evict=self.semantic_index.remove,
+            shared=shared
+        )
+        if settings.semantic_cache_enabled:
+            if self._in_memory_store.shared:
+                # Nothing is held in memory: index the newest paths in the shared file
+                paths = self._in_memory_store.page(settings.memory_store_max_entries)
+            else:
+                paths = self._in_memory_store.items()
+            for path_id, path in paths:
+                embedding = embed_user_input(path["user_input"], settings.embedding_dim)
+                self.semantic_index.add(path_id, self._semantic_key(path["user_input"]), embedding)
+    
+    async def _ensure_connected(self):
+        if not self._connected:
+            await self.connect()
+    
+    @staticmethod
+    def _semantic_key(user_input: dict) -> tuple:
+        # Only paths with the same schedule, learning style and goal words are
+        # interchangeable; similarity only decides among those
+        canonical = canonicalize_user_input(user_input)
+        return (
+            canonical["hours_per_week"],
+            canonical["duration_weeks"],
+            canonical["preferred_learning_style"],
+            goal_tokens(canonical["target_goal"]),
+        )
+    
+    async def _load_semantic_index(self):
+        """Rebuild the in-memory index from embeddings stored in MongoDB"""
+        cursor = self.collection.find(
+            {"embedding": {"$exists": True}},
+            {"embedding": 1, "user_input": 1}
+        )
+        async for doc in cursor:
+            self.semantic_index.add(
+                str(doc["_id"]),
+                self._semantic_key(doc.get("user_input", {})),
+                np.asarray(doc["embedding"], dtype=np.float32)
+            )
+        print(f"✅ Semantic index loaded ({len(self.semantic_index)} paths)")
+    
+    async def find_similar_learning_path(self, user_input: dict) -> Optional[Dict[str, Any]]:
+        """Find a stored path for near-identical skills/goal with the same hours and weeks"""
+        if not settings.semantic_cache_enabled:
+            return None
+        await self._ensure_connected()
+        
+        start = time.perf_counter()
+        vector = embed_user_input(user_input, settings.embedding_dim)
+        try:
+            if settings.semantic_cache_backend == "atlas" and self.collection is not None:
+                path = await self._atlas_vector_search(user_input, vector)
+            else:
+                path_id, score = self.semantic_index.search(self._semantic_key(user_input), vector)
+                path = None
+                if path_id and score >= settings.semantic_cache_threshold:
+                    path = await self.get_learning_path(path_id)
+                    if path:
+                        path = dict(path, _id=path_id)
+        except Exception as e:
+            print(f"⚠️ Semantic cache lookup failed: {e}")
+            path = None
+        
+        self.semantic_lookups += 1
+        self.semantic_lookup_seconds += time.perf_counter() - start
+        if path:
+            self.semantic_hits += 1
+        return path
+    
+    async def _atlas_vector_search(self, user_input: dict, vector) -> Optional[Dict[str, Any]]:
+        key = self._semantic_key(user_input)
+        hours, weeks = key[:2]
+        pipeline = [
+            {"$vectorSearch": {
+                "index": settings.mongodb_index_name,
+                "path": "embedding",
+                "queryVector": vector.tolist(),
+                "numCandidates": 100,
+                "limit": 10,
+                "filter": {
+                    "user_input.hours_per_week": hours,
+                    "user_input.duration_weeks": weeks,
+                },
+            }},
+            {"$addFields": {"_score": {"$meta": "vectorSearchScore"}}},
+            {"$project": PATH_PROJECTION},
+        ]
+        with mongo_timer("vector_search"):
+            results = await self.collection.aggregate(pipeline).to_list(length=10)
+        # Style and goal words aren't index filter fields: take the best match with the same key.
+        # Atlas reports cosine similarity rescaled to (1 + cos) / 2
+        for path in results:
+            if 2 * path.pop("_score") - 1 < settings.semantic_cache_threshold:
+                return None
+            if self._semantic_key(path["user_input"]) == key:
+                path['_id'] = str(path['_id'])
+                return path
+        return None
+    
+    def reindex(self, path_id: str, user_input: Optional[dict]):
+        """Bring this worker's semantic index in line with another worker's
+        change: re-add the path under its current input, or drop it (None)"""
+        if user_input is None:
+            self.semantic_index.remove(path_id)
+        elif settings.semantic_cache_enabled:
+            embedding = embed_user_input(user_input, settings.embedding_dim)
+            self.semantic_index.add(path_id, self._semantic_key(user_input), embedding)
+    
+    def semantic_stats(self) -> dict:
+        lookups = self.semantic_lookups
+        return {
+            "enabled": settings.semantic_cache_enabled,
+            "backend": settings.semantic_cache_backend,
+            "indexed": len(self.semantic_index),
+            "lookups": lookups,
+            "hits": self.semantic_hits,
+            "hit_rate": round(self.semantic_hits / lookups, 4) if lookups else 0.0,
+            "avg_lookup_ms": round(1000 * self.semantic_lookup_seconds / lookups, 3) if lookups else 0.0,
+        }
     
     async def store_learning_path(self, learning_path: dict) -> str:
         """Store learning path in MongoDB or in-memory"""
+        await self._ensure_connected()
         try:
+            # Equivalent inputs share one stored path; a duplicate returns the existing id
+            fingerprint = fingerprint_user_input(learning_path["user_input"])
+            learning_path = dict(learning_path, fingerprint=fingerprint)
+            
+            embedding = None
+            if settings.semantic_cache_enabled:
+                embedding = embed_user_input(learning_path["user_input"], settings.embedding_dim)
+            
             if self.collection is not None:
-                result = self.collection.insert_one(learning_path)
-                return str(result.inserted_id)
+                from pymongo.errors import DuplicateKeyError
+                document = dict(learning_path)
+                if embedding is not None:
+                    document["embedding"] = embedding.tolist()
+                try:
+                    with mongo_timer("insert_one"):
+                        result = await self.collection.insert_one(document)
+                    path_id = str(result.inserted_id)
+                except DuplicateKeyError:
+                    existing = await self.collection.find_one({"fingerprint": fingerprint}, {"_id": 1})
+                    return str(existing["_id"])
             else:
                 # In-memory fallback
-                path_id = str(uuid.uuid4())
-                self._in_memory_store[path_id] = learning_path
-                return path_id
+                store = self._in_memory_store
+                def insert() -> Tuple[str, bool]:
+                    with store.transaction():
+                        existing_id = store.find_id_by_fingerprint(fingerprint)
+                        if existing_id:
+                            return existing_id, False
+                        new_id = str(uuid.uuid4())
+                        store.put(new_id, learning_path)
+                        return new_id, True
+                path_id, inserted = await store.run(insert)
+                if not inserted:
+                    return path_id
+            
+            if embedding is not None:
+                self.semantic_index.add(path_id, self._semantic_key(learning_path["user_input"]), embedding)
+            return path_id
         except Exception as e:
             raise Exception(f"Error storing learning path: {str(e)}")
     
+    async def find_by_fingerprint(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Retrieve the stored learning path for a canonical input fingerprint"""
+        await self._ensure_connected()
+        try:
+            if self.collection is not None:
+                with mongo_timer("find_one"):
+                    path = await self.collection.find_one({"fingerprint": fingerprint}, PATH_PROJECTION)
+                if path:
+                    path['_id'] = str(path['_id'])
+                return path
+            else:
+                # In-memory fallback
+                store = self._in_memory_store
+                def find() -> Optional[Dict[str, Any]]:
+                    path_id = store.find_id_by_fingerprint(fingerprint)
+                    path = store.get(path_id) if path_id else None
+                    return dict(_served(path), _id=path_id) if path else None
+                return await store.run(find)
+        except Exception as e:
+            raise Exception(f"Error retrieving learning path: {str(e)}")
+    
+    async def replace_learning_path(self, path_id: str, learning_path: dict):
+        """Overwrite a stored learning path in place (keeps its id)"""
+        await self._ensure_connected()
+        try:
+            fingerprint = fingerprint_user_input(learning_path["user_input"])
+            learning_path = dict(learning_path, fingerprint=fingerprint)
+            embedding = None
+            if settings.semantic_cache_enabled:
+                embedding = embed_user_input(learning_path["user_input"], settings.embedding_dim)
+            
+            if self.collection is not None:
+                from bson.objectid import ObjectId
+                document = dict(learning_path)
+                if embedding is not None:
+                    document["embedding"] = embedding.tolist()
+                with mongo_timer("replace_one"):
+                    await self.collection.replace_one({"_id": ObjectId(path_id)}, document)
+            else:
+                # In-memory fallback
+                await self._in_memory_store.run(self._in_memory_store.put, path_id, learning_path)
+            
+            if embedding is not None:
+                self.semantic_index.add(path_id, self._semantic_key(learning_path["user_input"]), embedding)
+        except Exception as e:
+            raise Exception(f"Error replacing learning path: {str(e)}")
+    
+    async def update_week(self, path_id: str, index: int, week: dict) -> bool:
+        """Replace weekly_breakdown[index] in place. Only matches while that slot
+        still holds the same week_number, so a concurrent resize isn't overwritten."""
+        await self._ensure_connected()
+        try:
+            if self.collection is not None:
+                from bson.objectid import ObjectId
+                if not ObjectId.is_valid(path_id):
+                    return False
+                with mongo_timer("update_one"):
+                    result = await self.collection.update_one(
+                        {"_id": ObjectId(path_id), f"weekly_breakdown.{index}.week_number": week["week_number"]},
+                        {"$set": {f"weekly_breakdown.{index}": week}}
+                    )
+                return result.matched_count > 0
+            else:
+                # In-memory fallback
+                store = self._in_memory_store
+                def update() -> bool:
+                    with store.transaction():
+                        path = store.get(path_id)
+                        weeks = (path or {}).get("weekly_breakdown") or []
+                        if index >= len(weeks) or weeks[index].get("week_number") != week["week_number"]:
+                            return False
+                        weeks[index] = week
+                        store.put(path_id, path)
+                    return True
+                return await store.run(update)
+        except Exception as e:
+            raise Exception(f"Error updating learning path: {str(e)}")
+    
+    async def resize_learning_path(
+        self, path_id: str, old_length: int, keep: int, new_weeks: list, updates: dict
+    ) -> bool:
+        """Keep the first `keep` weeks, append new_weeks after them and set the
+        other top-level fields in updates, as one update. A new user_input gets
+        its own fingerprint unless another path already owns that input.
+        Only matches while weekly_breakdown still has old_length weeks."""
+        await self._ensure_connected()
+        try:
+            updates = dict(updates)
+            embedding = None
+            if "user_input" in updates:
+                updates["fingerprint"] = fingerprint_user_input(updates["user_input"])
+                if settings.semantic_cache_enabled:
+                    embedding = embed_user_input(updates["user_input"], settings.embedding_dim)
+            
+            if self.collection is not None:
+                from bson.objectid import ObjectId
+                from pymongo.errors import DuplicateKeyError
+                if not ObjectId.is_valid(path_id):
+                    return False
+                if embedding is not None:
+                    updates["embedding"] = embedding.tolist()
+                update = {
+                    # $position + $slice: insert after the kept weeks, then cut what followed them
+                    "$push": {"weekly_breakdown": {
+                        "$each": new_weeks, "$position": keep, "$slice": keep + len(new_weeks)
+                    }},
+                    "$set": updates,
+                }
+                query = {"_id": ObjectId(path_id), "weekly_breakdown": {"$size": old_length}}
+                try:
+                    with mongo_timer("update_one"):
+                        result = await self.collection.update_one(query, update)
+                except DuplicateKeyError:
+                    updates.pop("fingerprint")
+                    update["$unset"] = {"fingerprint": ""}
+                    with mongo_timer("update_one"):
+                        result = await self.collection.update_one(query, update)
+                if not result.matched_count:
+                    return False
+            else:
+                # In-memory fallback
+                store = self._in_memory_store
+                def resize() -> bool:
+                    with store.transaction():
+                        path = store.get(path_id)
+                        if path is None or len(path.get("weekly_breakdown") or []) != old_length:
+                            return False
+                        fingerprint = updates.get("fingerprint")
+                        if fingerprint and store.find_id_by_fingerprint(fingerprint) not in (None, path_id):
+                            updates.pop("fingerprint")
+                            path.pop("fingerprint", None)
+                        path.update(updates)
+                        path["weekly_breakdown"] = path["weekly_breakdown"][:keep] + new_weeks
+                        store.put(path_id, path)
+                    return True
+                if not await store.run(resize):
+                    return False
+            
+            if embedding is not None:
+                self.semantic_index.add(path_id, self._semantic_key(updates["user_input"]), embedding)
+            return True
+        except Exception as e:
+            raise Exception(f"Error resizing learning path: {str(e)}")
+    
     async def get_learning_path(self, path_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve learning path by ID"""
+        await self._ensure_connected()
         try:
             if self.collection is not None:
                 from bson.objectid import ObjectId
-                path = self.collection.find_one({"_id": ObjectId(path_id)})
+                if not ObjectId.is_valid(path_id):
+                    return None
+                with mongo_timer("find_one"):
+                    path = await self.collection.find_one({"_id": ObjectId(path_id)}, PATH_PROJECTION)
                 if path:
                     path['_id'] = str(path['_id'])
                 return path
             else:
                 # In-memory fallback
-                return self._in_memory_store.get(path_id)
+                path = await self._in_memory_store.run(self._in_memory_store.get, path_id)
+                return _served(path) if path else None
         except Exception as e:
             raise Exception(f"Error retrieving learning path: {str(e)}")
     
-    async def get_all_learning_paths(self, limit: int = 10) -> list:
-        """Retrieve all learning paths"""
+    async def store_quiz(self, path_id: str, quiz_key: str, quiz: dict) -> bool:
+        """Store a generated quiz alongside its learning path"""
+        await self._ensure_connected()
         try:
             if self.collection is not None:
-                paths = list(self.collection.find().limit(limit))
-                for path in paths:
-                    path['_id'] = str(path['_id'])
-                return paths
+                from bson.objectid import ObjectId
+                if not ObjectId.is_valid(path_id):
+                    return False
+                with mongo_timer("update_one"):
+                    result = await self.collection.update_one(
+                        {"_id": ObjectId(path_id)},
+                        {"$set": {f"quizzes.{quiz_key}": quiz}}
+                    )
+                return result.matched_count > 0
             else:
                 # In-memory fallback
-                return list(self._in_memory_store.values())[:limit]
+                store = self._in_memory_store
+                def add_quiz() -> bool:
+                    with store.transaction():
+                        path = store.get(path_id)
+                        if path is None:
+                            return False
+                        path.setdefault("quizzes", {})[quiz_key] = quiz
+                        store.put(path_id, path)
+                    return True
+                return await store.run(add_quiz)
+        except Exception as e:
+            raise Exception(f"Error storing quiz: {str(e)}")
+    
+    async def get_quiz(self, path_id: str, quiz_key: str) -> Optional[Dict[str, Any]]:
+        """Retrieve a quiz stored alongside its learning path"""
+        await self._ensure_connected()
+        try:
+            if self.collection is not None:
+                from bson.objectid import ObjectId
+                if not ObjectId.is_valid(path_id):
+                    return None
+                with mongo_timer("find_one"):
+                    path = await self.collection.find_one(
+                        {"_id": ObjectId(path_id)},
+                        {f"quizzes.{quiz_key}": 1}
+                    )
+            else:
+                # In-memory fallback
+                path = await self._in_memory_store.run(self._in_memory_store.get, path_id)
+            return ((path or {}).get("quizzes") or {}).get(quiz_key)
+        except Exception as e:
+            raise Exception(f"Error retrieving quiz: {str(e)}")
+    
+    async def get_all_learning_paths(self, limit: int = 10) -> list:
+        """Retrieve the newest learning paths (full documents)"""
+        paths = await self.list_learning_paths(limit, summary=False)
+        return [path async for path in paths]
+    
+    async def list_learning_paths(
+        self,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        target_goal: Optional[str] = None,
+        summary: bool = True
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Page through stored paths newest first.
+        
+        Keyset pagination on _id: pass the last _id of a page as cursor to get
+        the next one, so every page costs the same however deep it is.
+        Raises ValueError for a malformed cursor before anything is read.
+        """
+        await self._ensure_connected()
+        if self.collection is not None:
+            from bson.objectid import ObjectId
+            if cursor is not None and not ObjectId.is_valid(cursor):
+                raise ValueError("Invalid cursor")
+            query = {}
+            if cursor is not None:
+                query["_id"] = {"$lt": ObjectId(cursor)}
+            if target_goal is not None:
+                query["user_input.target_goal"] = target_goal
+            projection = SUMMARY_PROJECTION if summary else PATH_PROJECTION
+            return self._iter_mongo_page(query, projection, limit)
+        
+        # In-memory fallback (dicts keep insertion order, so reversed is newest first).
+        # Collected up front: the store may change while the response streams.
+        try:
+            page = await self._in_memory_store.run(
+                self._in_memory_store.page,
+                limit,
+                cursor,
+                (lambda path: path["user_input"].get("target_goal") == target_goal) if target_goal else None
+            )
+        except KeyError:
+            raise ValueError("Invalid cursor")
+        return _iterate([
+            self._memory_summary(path_id, path) if summary else dict(_served(path), _id=path_id)
+            for path_id, path in page
+        ])
+    
+    async def _iter_mongo_page(self, query: dict, projection: dict, limit: int) -> AsyncIterator[Dict[str, Any]]:
+        try:
+            with mongo_timer("find"):
+                documents = self.collection.find(query, projection).sort("_id", -1).limit(limit)
+                async for path in documents:
+                    path["_id"] = str(path["_id"])
+                    yield path
         except Exception as e:
             raise Exception(f"Error retrieving learning paths: {str(e)}")
     
+    @staticmethod
+    def _memory_summary(path_id: str, path: dict) -> Dict[str, Any]:
+        """SUMMARY_PROJECTION applied to a fallback-store document"""
+        return {
+            "_id": path_id,
+            "path_title": path.get("path_title"),
+            "total_weeks": path.get("total_weeks"),
+            "total_hours": path.get("total_hours"),
+            "created_at": path.get("created_at"),
+            "user_input": {"target_goal": path["user_input"].get("target_goal")}
+        }
+    
+    async def export_learning_paths(self, target_goal: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Every stored path (with its quizzes, without the embedding), oldest first.
+        Streams from a MongoDB cursor, so memory stays flat however many there are."""
+        await self._ensure_connected()
+        if self.collection is not None:
+            query = {"user_input.target_goal": target_goal} if target_goal is not None else {}
+            documents = self.collection.find(query, {"embedding": 0}).sort("_id", 1)
+            with mongo_timer("export"):
+                async for path in documents:
+                    path["_id"] = str(path["_id"])
+                    yield path
+        else:
+            # In-memory fallback
+            async for path_id, path in self._in_memory_store.scan_async():
+                if target_goal is None or path["user_input"].get("target_goal") == target_goal:
+                    yield dict(path, _id=path_id)
+    
+    async def iter_user_inputs(self) -> AsyncIterator[Dict[str, Any]]:
+        """The user_input of every stored path, streamed without the paths themselves"""
+        await self._ensure_connected()
+        if self.collection is not None:
+            documents = self.collection.find({}, {"user_input": 1, "_id": 0})
+            with mongo_timer("find"):
+                async for path in documents:
+                    if path.get("user_input"):
+                        yield path["user_input"]
+        else:
+            # In-memory fallback
+            async for _, path in self._in_memory_store.scan_async():
+                if path.get("user_input"):
+                    yield path["user_input"]
+    
+    async def insert_learning_paths(self, learning_paths: list) -> Tuple[int, int]:
+        """Bulk-store paths (e.g. an import chunk) with one insert_many.
+        A path keeps its "_id" when that is a valid id for the backend. Paths
+        whose id or input fingerprint is already stored are skipped.
+        Returns (inserted, duplicates)."""
+        await self._ensure_connected()
+        documents = [
+            dict(learning_path, fingerprint=fingerprint_user_input(learning_path["user_input"]))
+            for learning_path in learning_paths
+        ]
+        embeddings = [
+            embed_user_input(document["user_input"], settings.embedding_dim)
+            if settings.semantic_cache_enabled else None
+            for document in documents
+        ]
+        
+        try:
+            if self.collection is not None:
+                from bson.objectid import ObjectId
+                from pymongo.errors import BulkWriteError
+                for document, embedding in zip(documents, embeddings):
+                    path_id = document.pop("_id", None)
+                    if path_id is not None and ObjectId.is_valid(str(path_id)):
+                        document["_id"] = ObjectId(str(path_id))
+                    if embedding is not None:
+                        document["embedding"] = embedding.tolist()
+                failed = set()
+                try:
+                    with mongo_timer("insert_many"):
+                        # Unordered: one duplicate doesn't stop the rest of the chunk
+                        await self.collection.insert_many(documents, ordered=False)
+                except BulkWriteError as e:
+                    errors = e.details.get("writeErrors", [])
+                    if any(error.get("code") != 11000 for error in errors):
+                        raise
+                    failed = {error["index"] for error in errors}
+                # insert_many sets _id on the documents it was given
+                for i, (document, embedding) in enumerate(zip(documents, embeddings)):
+                    if i not in failed and embedding is not None:
+                        self.semantic_index.add(str(document["_id"]), self._semantic_key(document["user_input"]), embedding)
+                return len(documents) - len(failed), len(failed)
+            else:
+                # In-memory fallback
+                store = self._in_memory_store
+                def insert(path_id: str, document: dict) -> bool:
+                    with store.transaction():
+                        if path_id in store or store.find_id_by_fingerprint(document["fingerprint"]):
+                            return False
+                        store.put(path_id, document)
+                    return True
+                inserted = 0
+                for document, embedding in zip(documents, embeddings):
+                    path_id = str(document.pop("_id", None) or uuid.uuid4())
+                    if not await store.run(insert, path_id, document):
+                        continue
+                    # Indexed right away: a later put in this chunk may evict it again
+                    if embedding is not None:
+                        self.semantic_index.add(path_id, self._semantic_key(document["user_input"]), embedding)
+                    inserted += 1
+                return inserted, len(documents) - inserted
+        except Exception as e:
+            raise Exception(f"Error importing learning paths: {str(e)}")
+    
     async def delete_learning_path(self, path_id: str) -> bool:
         """Delete a learning path by ID"""
+        await self._ensure_connected()
         try:
             if self.collection is not None:
                 from bson.objectid import ObjectId
-                result = self.collection.delete_one({"_id": ObjectId(path_id)})
+                if not ObjectId.is_valid(path_id):
+                    return False
+                self.semantic_index.remove(path_id)
+                with mongo_timer("delete_one"):
+                    result = await self.collection.delete_one({"_id": ObjectId(path_id)})
                 return result.deleted_count > 0
             else:
                 # In-memory fallback
-                if path_id in self._in_memory_store:
-                    del self._in_memory_store[path_id]
-                    return True
-                return False
+                self.semantic_index.remove(path_id)
+                return await self._in_memory_store.run(self._in_memory_store.delete, path_id)
         except Exception as e:
             raise Exception(f"Error deleting learning path: {str(e)}")
     
+    async def health(self) -> str:
+        """MongoDB status: up, down, in-memory (fallback storage) or connecting"""
+        if not self._connected:
+            return "connecting"
+        if self.collection is None:
+            return "in-memory"
+        if self.client is None:
+            return "up"
+        try:
+            with mongo_timer("ping"):
+                await asyncio.wait_for(self.client.admin.command("ping"), timeout=1)
+            return "up"
+        except Exception:
+            return "down"
+    
+    def memory_store_stats(self) -> Optional[dict]:
+        """Fallback store usage, or None while MongoDB is in use"""
+        return self._in_memory_store.stats() if self._in_memory_store is not None else None
+    
     def close(self):
         """Close MongoDB connection"""
         if self.client:
-            self.client.close()
\ No newline at end of file
+            self.client.close()
+        if self._in_memory_store is not None:
+            self._in_memory_store.close()
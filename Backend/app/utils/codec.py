@@ -0,0 +1,122 @@
+import json
+import zlib
+from typing import Any, Callable, Dict, Tuple
+
+# Encoded values are MAGIC + serializer byte + compression byte + payload.
+# A value without MAGIC is plain JSON text written before codecs existed.
+MAGIC = b"\x00"
+
+_SERIALIZER_IDS = {"json": b"j", "orjson": b"j", "msgpack": b"m"}  # orjson writes JSON too
+_COMPRESSION_IDS = {"none": b"n", "zlib": b"z", "zstd": b"s"}
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode()
+
+def _load_serializer(name: str) -> Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]:
+    """(dumps, loads) for a serializer; raises ImportError if its library is missing"""
+    if name == "json":
+        return _json_dumps, json.loads
+    if name == "orjson":
+        import orjson
+        return orjson.dumps, orjson.loads
+    if name == "msgpack":
+        import msgpack
+        return msgpack.packb, msgpack.unpackb
+    raise ValueError(f"Unknown cache serializer: {name}")
+
+def _load_compression(name: str) -> Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    """(compress, decompress) for a compression; raises ImportError if its library is missing"""
+    if name == "none":
+        return (lambda data: data), (lambda data: data)
+    if name == "zlib":
+        # Level 1: within ~10% of level 6's size on paths at a third of the CPU
+        return (lambda data: zlib.compress(data, 1)), zlib.decompress
+    if name == "zstd":
+        import zstandard
+        compressor = zstandard.ZstdCompressor(level=3)
+        decompressor = zstandard.ZstdDecompressor()
+        return compressor.compress, decompressor.decompress
+    raise ValueError(f"Unknown cache compression: {name}")
+
+class Codec:
+    """Serializer plus size-gated compression for cached values.
+    
+    The header records how each value was written, so values written with
+    other settings (or by another worker) still decode as long as the
+    library is installed. Missing optional libraries fall back to json/zlib.
+    """
+    
+    def __init__(self, serializer: str = "orjson", compression: str = "zlib", min_bytes: int = 1024):
+        try:
+            self._dumps, _ = _load_serializer(serializer)
+        except ImportError:
+            print(f"⚠️ {serializer} not installed, caching with json")
+            serializer = "json"
+            self._dumps, _ = _load_serializer(serializer)
+        try:
+            self._compress, _ = _load_compression(compression)
+        except ImportError:
+            print(f"⚠️ {compression} not installed, compressing with zlib")
+            compression = "zlib"
+            self._compress, _ = _load_compression(compression)
+        self.serializer = serializer
+        self.compression = compression
+        self.min_bytes = min_bytes
+        self._header = MAGIC + _SERIALIZER_IDS[serializer]
+        self._loads: Dict[bytes, Callable[[bytes], Any]] = {}
+        self._decompressors: Dict[bytes, Callable[[bytes], bytes]] = {}
+        
+        self.encoded = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+    
+    def encode(self, value: Any) -> bytes:
+        data = self._dumps(value)
+        self.encoded += 1
+        self.raw_bytes += len(data)
+        if self.compression != "none" and len(data) >= self.min_bytes:
+            data = self._header + _COMPRESSION_IDS[self.compression] + self._compress(data)
+        else:
+            data = self._header + b"n" + data
+        self.stored_bytes += len(data)
+        return data
+    
+    def decode(self, data: bytes) -> Any:
+        if isinstance(data, str):
+            return json.loads(data)
+        if data[:1] != MAGIC:
+            return json.loads(data)
+        serializer_id, compression_id, payload = data[1:2], data[2:3], data[3:]
+        if compression_id != b"n":
+            payload = self._decompressor(compression_id)(payload)
+        return self._loader(serializer_id)(payload)
+    
+    def _loader(self, serializer_id: bytes) -> Callable[[bytes], Any]:
+        loads = self._loads.get(serializer_id)
+        if loads is None:
+            if serializer_id == b"j":
+                try:
+                    _, loads = _load_serializer("orjson")
+                except ImportError:
+                    _, loads = _load_serializer("json")
+            else:
+                _, loads = _load_serializer("msgpack")
+            self._loads[serializer_id] = loads
+        return loads
+    
+    def _decompressor(self, compression_id: bytes) -> Callable[[bytes], bytes]:
+        decompress = self._decompressors.get(compression_id)
+        if decompress is None:
+            name = {code: name for name, code in _COMPRESSION_IDS.items()}[compression_id]
+            _, decompress = _load_compression(name)
+            self._decompressors[compression_id] = decompress
+        return decompress
+    
+    def stats(self) -> dict:
+        return {
+            "serializer": self.serializer,
+            "compression": self.compression,
+            "encoded": self.encoded,
+            "avg_raw_bytes": round(self.raw_bytes / self.encoded) if self.encoded else 0,
+            "avg_stored_bytes": round(self.stored_bytes / self.encoded) if self.encoded else 0,
+        }
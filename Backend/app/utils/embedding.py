@@ -0,0 +1,40 @@
+import re
+import zlib
+import numpy as np
+
+_NON_WORD = re.compile(r"[^a-z0-9+#]+")
+# Words that don't change what a goal is about
+_GOAL_STOPWORDS = frozenset({"a", "an", "the", "to", "as", "at", "in", "on", "of", "for", "and", "with", "my"})
+
+def _features(text: str):
+    """Words plus character trigrams, so casing/punctuation/typos barely move the vector"""
+    for word in _NON_WORD.sub(" ", text.lower()).split():
+        yield word
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            yield padded[i:i + 3]
+
+def embed_text(text: str, dim: int) -> np.ndarray:
+    """Hashed n-gram embedding (unit length); deterministic across processes"""
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature in _features(text):
+        h = zlib.crc32(feature.encode())
+        vector[h % dim] += -1.0 if h & 0x80000000 else 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def embed_user_input(user_input: dict, dim: int) -> np.ndarray:
+    """Embed skills and goal separately so both have to match for a high score"""
+    half = dim // 2
+    vector = np.concatenate([
+        embed_text(user_input.get("current_skills", ""), half),
+        embed_text(user_input.get("target_goal", ""), dim - half),
+    ])
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def goal_tokens(goal: str) -> tuple:
+    """The goal's words, lowercased, deduped and sorted, without filler words:
+    goals differing by one keyword ("game" vs "web developer") differ here,
+    however close their embeddings are"""
+    return tuple(sorted(set(_NON_WORD.sub(" ", (goal or "").lower()).split()) - _GOAL_STOPWORDS))
@@ -0,0 +1,46 @@
+import hashlib
+import json
+import re
+from typing import List, Union
+from app.models.learning_path import UserInput
+
+DEFAULT_LEARNING_STYLE = "mixed"
+
+_WHITESPACE = re.compile(r"\s+")
+_SKILL_SEPARATORS = re.compile(r"[,;\n]+")
+
+def _normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", (text or "").strip().lower())
+
+def canonicalize_user_input(user_input: Union[UserInput, dict]) -> dict:
+    """Normalize a UserInput so equivalent forms compare equal: lowercased and
+    trimmed text, skills split/deduped/sorted, and the default style filled in"""
+    if isinstance(user_input, UserInput):
+        user_input = user_input.dict()
+    
+    skills = {
+        _normalize_text(skill)
+        for skill in _SKILL_SEPARATORS.split(user_input.get("current_skills") or "")
+    }
+    skills.discard("")
+    
+    return {
+        "current_skills": ", ".join(sorted(skills)),
+        "target_goal": _normalize_text(user_input.get("target_goal")).rstrip(".!"),
+        "hours_per_week": int(user_input["hours_per_week"]),
+        "duration_weeks": int(user_input["duration_weeks"]),
+        "preferred_learning_style": _normalize_text(
+            user_input.get("preferred_learning_style")
+        ) or DEFAULT_LEARNING_STYLE,
+    }
+
+def fingerprint_user_input(user_input: Union[UserInput, dict]) -> str:
+    """Stable hash of the canonical input, used for cache keys and storage dedupe"""
+    canonical = json.dumps(canonicalize_user_input(user_input), sort_keys=True)
+    return hashlib.md5(canonical.encode()).hexdigest()
+
+def fingerprint_quiz(week_number: int, topics: List[str]) -> str:
+    """Stable hash of a quiz request: week plus deduped, sorted, normalized topics"""
+    normalized = sorted({_normalize_text(topic) for topic in topics} - {""})
+    canonical = json.dumps([int(week_number), normalized])
+    return hashlib.md5(canonical.encode()).hexdigest()
@@ -0,0 +1,130 @@
+import json
+import re
+from typing import List, Tuple
+
+_CLOSERS = {"{": "}", "[": "]"}
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+
+class JSONExtractionError(ValueError):
+    """No usable JSON object could be recovered from LLM output"""
+
+class ExtractedJSON:
+    """Result of extract_json: the parsed object plus what had to be done to get it"""
+    
+    def __init__(self, data: dict, extracted: bool = False, repaired: bool = False, truncated: bool = False):
+        self.data = data
+        self.extracted = extracted  # surrounding prose or code fences were dropped
+        self.repaired = repaired    # syntax defects were fixed
+        self.truncated = truncated  # output ended mid-object and was closed off
+
+def _scan(text: str, start: int) -> Tuple[int, List[Tuple[int, str]]]:
+    """Walk a JSON object from text[start] (a "{").
+    
+    Returns the index just past its closing brace (-1 if the text ends first)
+    and the safe cut points seen on the way: (index, closers needed to make
+    text[start:index] a complete document).
+    """
+    stack = []
+    cuts = []
+    in_string = escape = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+            cuts.append((i + 1, "".join(reversed(stack))))
+        elif char in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                return i + 1, cuts
+            cuts.append((i + 1, "".join(reversed(stack))))
+        elif char == ",":
+            # Cutting before the comma drops only the element that follows it
+            cuts.append((i, "".join(reversed(stack))))
+    return -1, cuts
+
+def _remove_trailing_commas(text: str) -> str:
+    """Drop commas directly before a closing bracket, leaving strings untouched"""
+    parts = re.split(r'("(?:[^"\\]|\\.)*")', text)
+    return "".join(
+        part if i % 2 else _TRAILING_COMMA.sub(r"\1", part)
+        for i, part in enumerate(parts)
+    )
+
+def _loads(candidate: str):
+    try:
+        return json.loads(candidate), False
+    except json.JSONDecodeError:
+        pass
+    fixed = _remove_trailing_commas(candidate)
+    return json.loads(fixed), True
+
+def _quick_loads(text: str, start: int):
+    """Parse text[start:last "}"] directly; None if that isn't valid JSON.
+    
+    Covers the common well-formed cases (bare, fenced, prose around the
+    object) without the character-by-character scan.
+    """
+    end = text.rfind("}")
+    if end < start:
+        return None
+    try:
+        return json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+
+def find_truncation(text: str) -> bool:
+    """True when the outermost JSON object in text never closes"""
+    start = text.find("{")
+    if start == -1 or _quick_loads(text, start) is not None:
+        return False
+    return _scan(text, start)[0] == -1
+
+def extract_json(text: str) -> ExtractedJSON:
+    """Recover the outermost JSON object from LLM output.
+    
+    Tolerates prose before/after the object, markdown fences, trailing commas
+    and output truncated mid-element (the partial element is dropped and the
+    open arrays/objects are closed).
+    """
+    stripped = (text or "").strip()
+    start = stripped.find("{")
+    if start == -1:
+        raise JSONExtractionError("Failed to parse LLM response as JSON: no JSON object found")
+    
+    data = _quick_loads(stripped, start)
+    if data is not None:
+        return ExtractedJSON(data, extracted=start > 0 or not stripped.endswith("}"))
+    
+    end, cuts = _scan(stripped, start)
+    if end != -1:
+        candidate = stripped[start:end]
+        extracted = candidate != stripped
+        try:
+            data, repaired = _loads(candidate)
+            return ExtractedJSON(data, extracted=extracted, repaired=repaired)
+        except json.JSONDecodeError as e:
+            raise JSONExtractionError(f"Failed to parse LLM response as JSON: {str(e)}")
+    
+    # Truncated: back off to the latest cut point that yields valid JSON,
+    # preferring cuts where only the outermost object is left open, so no
+    # nested object (a week, a question) survives half-filled
+    preferred = [cut for cut in cuts if "}" not in cut[1][:-1]][-50:]
+    for index, closers in list(reversed(preferred)) + list(reversed(cuts[-50:])):
+        candidate = _remove_trailing_commas(stripped[start:index].rstrip().rstrip(",") + closers)
+        try:
+            data = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        return ExtractedJSON(data, extracted=start > 0, repaired=True, truncated=True)
+    raise JSONExtractionError("Failed to parse LLM response as JSON: truncated beyond repair")
@@ -1,4 +1,5 @@
-from typing import List
+from typing import List, Optional
+
 def get_learning_path_prompt(user_input: dict) -> str:
     return f"""You are an expert academic counselor and curriculum designer. Create a personalized, time-bound learning roadmap.
 
@@ -49,6 +50,163 @@ OUTPUT FORMAT (JSON):
 
 IMPORTANT: Return ONLY valid JSON, no markdown or extra text."""
 
+def get_outline_prompt(user_input: dict) -> str:
+    """First phase of fan-out generation: a compact week-by-week outline"""
+    return f"""You are an expert academic counselor and curriculum designer. Outline a personalized, time-bound learning roadmap.
+
+USER PROFILE:
+- Current Skills: {user_input['current_skills']}
+- Target Goal: {user_input['target_goal']}
+- Time Commitment: {user_input['hours_per_week']} hours/week for {user_input['duration_weeks']} weeks
+- Learning Style: {user_input.get('preferred_learning_style', 'mixed')}
+
+REQUIREMENTS:
+1. List exactly one entry per week, weeks 1 to {user_input['duration_weeks']}
+2. Each week gets a short topic and the prerequisites it covers
+3. Ensure logical progression: Week N must build on Week N-1
+4. Include a final capstone project related to their goal
+
+OUTPUT FORMAT (JSON):
+{{
+  "path_title": "From [current_skills] to [target_goal]",
+  "total_weeks": {user_input['duration_weeks']},
+  "total_hours": {user_input['hours_per_week'] * user_input['duration_weeks']},
+  "outline": [
+    {{"week_number": 1, "topic": "...", "prerequisites_covered": ["..."]}}
+  ],
+  "final_project": "..."
+}}
+
+IMPORTANT: Return ONLY valid JSON, no markdown or extra text."""
+
+def get_week_details_prompt(user_input: dict, outline: List[dict], week_numbers: List[int]) -> str:
+    """Second phase of fan-out generation: full details for a batch of weeks"""
+    outline_str = "\n".join(f"- Week {week['week_number']}: {week['topic']}" for week in outline)
+    weeks_str = ", ".join(str(number) for number in week_numbers)
+    return f"""You are an expert academic counselor and curriculum designer. Expand part of a learning roadmap.
+
+USER PROFILE:
+- Current Skills: {user_input['current_skills']}
+- Target Goal: {user_input['target_goal']}
+- Time Commitment: {user_input['hours_per_week']} hours/week
+- Learning Style: {user_input.get('preferred_learning_style', 'mixed')}
+
+FULL OUTLINE:
+{outline_str}
+
+Write full details for weeks: {weeks_str}
+
+For EACH of those weeks, keep the outlined topic and provide:
+- 3-5 subtopics
+- "Why this first?" explanation showing prerequisite reasoning
+- Specific, actionable search queries for resources (not generic links)
+- Estimated study time (at most {user_input['hours_per_week']} hours)
+- Key takeaways
+
+OUTPUT FORMAT (JSON):
+{{
+  "weeks": [
+    {{
+      "week_number": {week_numbers[0]},
+      "topic": "...",
+      "subtopics": ["...", "..."],
+      "why_this_first": "...",
+      "prerequisites_covered": ["..."],
+      "resources": [
+        {{
+          "title": "...",
+          "type": "video/article/practice",
+          "search_query": "Search YouTube for: '...'",
+          "estimated_time": "2 hours"
+        }}
+      ],
+      "estimated_hours": 6.0,
+      "key_takeaways": ["...", "..."]
+    }}
+  ]
+}}
+
+IMPORTANT: Return ONLY valid JSON, no markdown or extra text."""
+
+def get_week_revision_prompt(
+    user_input: dict, context: List[dict], week_numbers: List[int], instructions: str, final_project: str
+) -> str:
+    """Rewrite or add a few weeks of a stored path, given only the weeks around them"""
+    context_str = "\n".join(
+        f"- Week {week['week_number']}: {week['topic']} ({'; '.join(week['subtopics'])})" for week in context
+    ) or "- (none)"
+    weeks_str = ", ".join(str(number) for number in week_numbers)
+    return f"""You are an expert academic counselor and curriculum designer. Revise part of an existing learning roadmap.
+
+USER PROFILE:
+- Current Skills: {user_input['current_skills']}
+- Target Goal: {user_input['target_goal']}
+- Time Commitment: {user_input['hours_per_week']} hours/week
+- Learning Style: {user_input.get('preferred_learning_style', 'mixed')}
+
+SURROUNDING WEEKS (unchanged, stay consistent with them):
+{context_str}
+
+FINAL PROJECT: {final_project}
+
+Rewrite weeks: {weeks_str}
+
+CHANGES:
+{instructions}
+
+For EACH of those weeks provide:
+- A clear topic with 3-5 subtopics
+- "Why this first?" explanation showing prerequisite reasoning
+- Specific, actionable search queries for resources (not generic links)
+- Estimated study time (at most {user_input['hours_per_week']} hours)
+- Key takeaways
+
+OUTPUT FORMAT (JSON):
+{{
+  "weeks": [
+    {{
+      "week_number": {week_numbers[0]},
+      "topic": "...",
+      "subtopics": ["...", "..."],
+      "why_this_first": "...",
+      "prerequisites_covered": ["..."],
+      "resources": [
+        {{
+          "title": "...",
+          "type": "video/article/practice",
+          "search_query": "Search YouTube for: '...'",
+          "estimated_time": "2 hours"
+        }}
+      ],
+      "estimated_hours": 6.0,
+      "key_takeaways": ["...", "..."]
+    }}
+  ]
+}}
+
+IMPORTANT: Return ONLY valid JSON, no markdown or extra text."""
+
+def get_week_change_instructions(topic: Optional[str], instructions: Optional[str]) -> str:
+    lines = []
+    if topic:
+        lines.append(f"The week's topic becomes: {topic}")
+    if instructions:
+        lines.append(f"Learner's request: {instructions}")
+    return "\n".join(lines) or "Write a fresh alternative for this week that fills the same place in the progression."
+
+def get_extend_instructions(old_weeks: int, new_weeks: int) -> str:
+    return (
+        f"The roadmap is being extended from {old_weeks} to {new_weeks} weeks. "
+        f"Continue straight after the surrounding weeks, building towards the final project."
+    )
+
+def get_shorten_instructions(old_weeks: int, new_weeks: int, dropped: List[dict]) -> str:
+    dropped_str = "; ".join(f"Week {week['week_number']}: {week['topic']}" for week in dropped)
+    return (
+        f"The roadmap is being shortened from {old_weeks} to {new_weeks} weeks, so week {new_weeks} "
+        f"is now the last one. Condense the essentials of the weeks it replaces into it: {dropped_str}"
+    )
+
 def get_quiz_prompt(week_number: int, topics: List[str]) -> str:
     topics_str = ", ".join(topics)
     return f"""Generate 5 multiple-choice questions for Week {week_number} covering: {topics_str}
@@ -0,0 +1,146 @@
+import json
+import re
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Optional
+from app.utils.json_repair import JSONExtractionError, extract_json
+
+_WEEKLY_BREAKDOWN = re.compile(r'"weekly_breakdown"\s*:\s*\[')
+
+def format_sse(event: str, data: str) -> str:
+    """Format one Server-Sent Event (data must be a single line)"""
+    return f"event: {event}\ndata: {data}\n\n"
+
+def _json_default(value: Any) -> str:
+    # Same rendering FastAPI gives datetimes in regular responses
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+async def stream_json_page(
+    items: AsyncIterator[dict], key: str, limit: int, flush_bytes: int = 65536
+) -> AsyncIterator[str]:
+    """Serialize a page of documents as they arrive from the database:
+    {"success": true, <key>: [...], "count": n, "next_cursor": <last _id or null>}.
+    Output is flushed in chunks of roughly flush_bytes."""
+    buffer = ['{"success": true, "' + key + '": [']
+    size = 0
+    count = 0
+    last_id = None
+    async for item in items:
+        encoded = json.dumps(item, default=_json_default)
+        buffer.append("," + encoded if count else encoded)
+        size += len(encoded)
+        count += 1
+        last_id = item.get("_id")
+        if size >= flush_bytes:
+            yield "".join(buffer)
+            buffer = []
+            size = 0
+    # A full page may have more after it; a short page is the last one
+    next_cursor = last_id if count == limit else None
+    buffer.append(f'], "count": {count}, "next_cursor": {json.dumps(next_cursor)}}}')
+    yield "".join(buffer)
+
+async def stream_ndjson(items: AsyncIterator[dict], flush_bytes: int = 65536) -> AsyncIterator[str]:
+    """Serialize documents as newline-delimited JSON, flushed in chunks of roughly flush_bytes"""
+    buffer = []
+    size = 0
+    async for item in items:
+        encoded = json.dumps(item, default=_json_default) + "\n"
+        buffer.append(encoded)
+        size += len(encoded)
+        if size >= flush_bytes:
+            yield "".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer)
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Split a streamed request body into lines without reading it all first"""
+    pending = b""
+    async for chunk in chunks:
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+class WeeklyBreakdownParser:
+    """Incrementally pull completed week objects out of a streamed learning path.
+    
+    Feed raw LLM text deltas; each call returns the week dicts whose closing
+    brace arrived in that delta. Only the "weekly_breakdown" array is scanned.
+    Weeks with syntax slips json_repair can fix (trailing commas) are repaired;
+    a week beyond repair is skipped and counted, and the final parse of the
+    whole output reports it.
+    """
+    
+    def __init__(self):
+        self._buffer = ""
+        self._in_array = False
+        self._done = False
+        self._pos = 0
+        self._depth = 0
+        self._start = -1
+        self._in_string = False
+        self._escape = False
+        self.skipped = 0
+    
+    def feed(self, text: str) -> List[dict]:
+        if self._done:
+            return []
+        self._buffer += text
+        
+        if not self._in_array:
+            match = _WEEKLY_BREAKDOWN.search(self._buffer)
+            if not match:
+                return []
+            self._in_array = True
+            self._buffer = self._buffer[match.end():]
+            self._pos = 0
+        
+        weeks = []
+        buffer = self._buffer
+        while self._pos < len(buffer):
+            char = buffer[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                if self._depth == 0:
+                    self._start = self._pos
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    week = self._parse_week(buffer[self._start:self._pos + 1])
+                    if week is not None:
+                        weeks.append(week)
+            elif char == "]" and self._depth == 0:
+                self._done = True
+                break
+            self._pos += 1
+        
+        # Drop text belonging to weeks already emitted
+        if self._depth == 0:
+            self._buffer = ""
+            self._pos = 0
+        elif self._start > 0:
+            self._buffer = buffer[self._start:]
+            self._pos -= self._start
+            self._start = 0
+        return weeks
+    
+    def _parse_week(self, text: str) -> Optional[dict]:
+        try:
+            return extract_json(text).data
+        except JSONExtractionError:
+            self.skipped += 1
+            return None
@@ -0,0 +1,111 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks run the FastAPI app in-process against the fake LLM backend, so
+they only need dummy credentials; nothing here talks to Cerebras, Redis or
+MongoDB.
+"""
+
+import os
+import statistics
+import sys
+from contextlib import asynccontextmanager
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault("CEREBRAS_API_KEY", "benchmark")
+os.environ.setdefault("MONGODB_ATLAS_URI", "placeholder")
+os.environ.setdefault("REDIS_URL", "redis://127.0.0.1:1")
+os.environ.setdefault("LLM_BACKEND", "fake")
+
+
+@asynccontextmanager
+async def app_client():
+    """Run the app lifespan in-process and yield (http client, path service)"""
+    import httpx
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client, app.state.path_service
+
+
+def sample_user_input(weeks: int = 4, goal: str = "Become a backend developer") -> dict:
+    return {
+        "current_skills": "Python, SQL",
+        "target_goal": goal,
+        "hours_per_week": 10,
+        "duration_weeks": weeks,
+        "preferred_learning_style": "hands-on",
+    }
+
+
+def sample_week(week_number: int) -> dict:
+    return {
+        "week_number": week_number,
+        "topic": f"Topic for week {week_number}",
+        "subtopics": [f"Subtopic {week_number}.{i}" for i in range(1, 5)],
+        "why_this_first": "Builds directly on the previous week.",
+        "prerequisites_covered": [f"Week {week_number - 1} material"],
+        "resources": [
+            {
+                "title": f"Resource {week_number}.{i}",
+                "type": "video",
+                "search_query": f"Search YouTube for: 'week {week_number} topic {i}'",
+                "estimated_time": "2 hours",
+            }
+            for i in range(1, 4)
+        ],
+        "estimated_hours": 10.0,
+        "key_takeaways": ["Takeaway one", "Takeaway two"],
+    }
+
+
+def sample_path_data(weeks: int = 4) -> dict:
+    """LLM-shaped learning path payload (without user_input)"""
+    return {
+        "path_title": "From Python, SQL to Backend Developer",
+        "total_weeks": weeks,
+        "total_hours": 10.0 * weeks,
+        "weekly_breakdown": [sample_week(n) for n in range(1, weeks + 1)],
+        "final_project": "Build and deploy a REST API",
+    }
+
+
+def sample_quiz_data(questions: int = 5) -> dict:
+    """LLM-shaped quiz payload"""
+    return {
+        "questions": [
+            {
+                "question": f"Question {i}?",
+                "options": [
+                    {"text": f"Option {j}", "is_correct": j == 2} for j in range(1, 5)
+                ],
+                "explanation": "Option 2 is correct.",
+            }
+            for i in range(1, questions + 1)
+        ]
+    }
+
+
+def percentile(samples, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples) -> dict:
+    """Latency summary in milliseconds"""
+    ms = [s * 1000 for s in samples]
+    return {
+        "count": len(ms),
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "mean_ms": round(statistics.fmean(ms), 3) if ms else 0.0,
+    }
@@ -0,0 +1,152 @@
+"""
+Admission control benchmark: goodput at the provider's token limit.
+
+The fake backend is wrapped in a provider-side limit: a token bucket of
+--provider-tpm that answers "429 rate limit" to any call made while the
+bucket is empty, and charges what each answered call actually used. A
+closed loop of --clients learners then generates unique --weeks paths for
+--duration seconds, backing off 0.2 s after a 5xx and Retry-After seconds
+after a 429, first with admission control off, then with ADMISSION_TPM at
+--admission-share of the provider limit.
+
+Without admission every client races for the same bucket; a fanned-out path
+whose detail calls are refused fails after its outline was already paid for,
+so tokens go to work nobody receives. Reported per mode:
+
+    paths_per_s        successful generations per second (goodput)
+    provider_429s      calls the provider refused
+    wasted_tokens      tokens spent on calls of generations that then failed
+    http               response codes seen by the clients
+    p50_ms / p95_ms    latency of successful generations, queueing included
+
+Usage:
+    python -m benchmarks.bench_admission --provider-tpm 600000 --clients 40 --duration 30
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from contextvars import ContextVar
+
+from benchmarks._common import app_client, sample_user_input, summarize
+from benchmarks.standins import attach_standins
+
+# Tokens the provider charged for the generation a learner is waiting on.
+# httpx's ASGI transport runs the app in the caller's task, so the app's
+# calls (fan-out tasks included) see the learner's value.
+_generation_tokens: ContextVar[list] = ContextVar("generation_tokens", default=[0])
+
+
+class ProviderLimit:
+    """Wraps backend.complete with a provider-side tokens-per-minute limit"""
+
+    def __init__(self, backend, tpm: int, burst_seconds: float = 10.0):
+        self._complete = backend.complete
+        self.rate = tpm / 60
+        self.burst = self.rate * burst_seconds
+        self.tat = time.monotonic()
+        self.refused = 0
+        self.tokens = 0
+        backend.complete = self.complete
+
+    async def complete(self, messages, max_tokens, model=None):
+        now = time.monotonic()
+        if max(self.tat, now) - now > self.burst / self.rate:
+            self.refused += 1
+            raise Exception("429 rate limit exceeded")
+        completion = await self._complete(messages, max_tokens, model=model)
+        used = completion.prompt_tokens + completion.completion_tokens
+        self.tat = max(self.tat, time.monotonic()) + used / self.rate
+        self.tokens += used
+        _generation_tokens.get()[0] += used
+        return completion
+
+
+async def _learner(client, mode: str, index: int, weeks: int, deadline: float, outcome: dict):
+    request = 0
+    while time.perf_counter() < deadline:
+        request += 1
+        user_input = sample_user_input(weeks, goal=f"{mode} learner {index} goal {request}")
+        started = time.perf_counter()
+        charged = [0]
+        _generation_tokens.set(charged)
+        response = await client.post(
+            "/v1/learning-paths/generate", json=user_input,
+            headers={"X-Client-Id": f"learner-{index}"}, timeout=None
+        )
+        status = response.status_code
+        outcome["http"][status] = outcome["http"].get(status, 0) + 1
+        if status == 200 and response.json().get("success"):
+            outcome["latencies"].append(time.perf_counter() - started)
+            continue
+        outcome["wasted_tokens"] += charged[0]
+        if status == 429:
+            await asyncio.sleep(int(response.headers.get("Retry-After", "1")))
+        else:
+            await asyncio.sleep(0.2)
+
+
+async def _run_mode(client, mode: str, provider: ProviderLimit, clients: int, weeks: int, duration: float) -> dict:
+    outcome = {"http": {}, "latencies": [], "wasted_tokens": 0}
+    refused, tokens = provider.refused, provider.tokens
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(_learner(client, mode, i, weeks, deadline, outcome) for i in range(clients)))
+    elapsed = time.perf_counter() - deadline + duration
+
+    spent = provider.tokens - tokens
+    succeeded = len(outcome["latencies"])
+    latency = summarize(outcome["latencies"]) if succeeded else {}
+    return {
+        "paths": succeeded,
+        "paths_per_s": round(succeeded / elapsed, 2),
+        "provider_429s": provider.refused - refused,
+        "tokens_per_s": round(spent / elapsed),
+        "wasted_tokens": outcome["wasted_tokens"],
+        "http": outcome["http"],
+        "p50_ms": latency.get("p50_ms"),
+        "p95_ms": latency.get("p95_ms"),
+    }
+
+
+async def run(provider_tpm: int, share: float, clients: int, weeks: int, duration: float, llm_latency: float) -> dict:
+    from app.config import get_settings
+
+    settings = get_settings()
+    settings.semantic_cache_enabled = False  # every goal is new; don't let near-duplicates hit
+    results = {
+        "provider_tpm": provider_tpm, "clients": clients, "weeks": weeks, "duration_s": duration,
+    }
+    async with app_client() as (client, service):
+        service.llm.backend.latency = llm_latency
+        await attach_standins(service)
+        provider = ProviderLimit(service.llm.backend, provider_tpm)
+        for mode, tpm in (("admission_off", 0), ("admission_on", int(provider_tpm * share))):
+            settings.admission_tpm = tpm
+            # Each mode starts with a full provider bucket
+            provider.tat = time.monotonic()
+            results[mode] = {"admission_tpm": tpm, **await _run_mode(
+                client, mode, provider, clients, weeks, duration
+            )}
+        results["admission"] = service.admission.stats()
+        settings.admission_tpm = 0
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--provider-tpm", type=int, default=600000)
+    parser.add_argument("--admission-share", type=float, default=0.95,
+                        help="ADMISSION_TPM as a fraction of the provider limit")
+    parser.add_argument("--clients", type=int, default=40)
+    parser.add_argument("--weeks", type=int, default=12)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(
+        args.provider_tpm, args.admission_share, args.clients, args.weeks, args.duration, args.llm_latency,
+    )), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+End-to-end API benchmark suite.
+
+Runs the FastAPI app in-process against the fake LLM backend and the Mongo
+and Redis stand-ins, then drives each endpoint at a fixed concurrency:
+
+    generate_cold   POST /learning-paths/generate, every input new
+    generate_warm   the same inputs again (served from cache)
+    get_by_id       GET /learning-paths/{id}
+    list            GET /learning-paths/
+    quiz            POST /quiz/generate for weeks of the generated paths
+    delete          DELETE /learning-paths/{id}
+
+For each scenario it reports throughput, p50/p95/p99 and, from a separate
+sequential pass under tracemalloc, memory allocated per request (peak KiB
+above the baseline) and retained after it. Results are JSON; pass
+--compare with an earlier --output file to see the relative change.
+
+Usage:
+    python -m benchmarks.bench_api --concurrency 16 --requests 200 --output results.json
+    python -m benchmarks.bench_api --compare results.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import time
+import tracemalloc
+import uuid
+
+from benchmarks._common import app_client, sample_user_input, summarize
+from benchmarks.standins import attach_standins
+
+SCENARIOS = ["generate_cold", "generate_warm", "get_by_id", "list", "quiz", "delete"]
+
+
+async def _timed_run(send, total: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    indices = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in indices:
+            start = time.perf_counter()
+            response = await send(i)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "latency": summarize(latencies),
+    }
+
+
+async def _allocation_run(send, start_index: int, samples: int) -> dict:
+    """Sequential requests under tracemalloc; kept apart so tracing doesn't skew latency"""
+    if samples <= 0:
+        return {}
+    tracemalloc.start()
+    try:
+        peaks = []
+        baseline = tracemalloc.get_traced_memory()[0]
+        for i in range(start_index, start_index + samples):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            await send(i)
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        retained = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    return {
+        "samples": samples,
+        "peak_kib_per_request": round(sum(peaks) / samples / 1024, 1),
+        "retained_kib_per_request": round(retained / samples / 1024, 2),
+    }
+
+
+async def run(scenarios, concurrency: int, requests: int, alloc_samples: int,
+              llm_latency: float, tokens_per_second: float, mongo_rtt: float,
+              redis_rtt: float, weeks: int) -> dict:
+    from app.services.llm_backends import FakeBackend
+
+    total = requests + alloc_samples
+    results = {}
+    async with app_client() as (client, service):
+        service.llm.backend = FakeBackend(latency=llm_latency, tokens_per_second=tokens_per_second)
+        await attach_standins(service, mongo_rtt=mongo_rtt, redis_rtt=redis_rtt)
+
+        # Random goals so neither the exact nor the semantic cache can serve a cold request
+        payloads = [sample_user_input(weeks, goal=f"Learn {uuid.uuid4().hex}") for _ in range(total)]
+        paths = []
+
+        async def generate(i):
+            response = await client.post("/v1/learning-paths/generate", json=payloads[i])
+            if response.status_code == 200 and len(paths) < total:
+                paths.append(response.json()["learning_path"])
+            return response
+
+        async def get_by_id(i):
+            return await client.get(f"/v1/learning-paths/{paths[i % len(paths)]['id']}")
+
+        async def list_paths(i):
+            return await client.get("/v1/learning-paths/", params={"limit": 10})
+
+        async def quiz(i):
+            path = paths[i % len(paths)]
+            week = path["weekly_breakdown"][(i // len(paths)) % len(path["weekly_breakdown"])]
+            return await client.post("/v1/quiz/generate", json={
+                "week_number": week["week_number"],
+                "topics": week["subtopics"],
+                "path_id": path["id"],
+            })
+
+        async def delete(i):
+            return await client.delete(f"/v1/learning-paths/{paths[i]['id']}")
+
+        senders = {
+            "generate_cold": generate,
+            "generate_warm": generate,
+            "get_by_id": get_by_id,
+            "list": list_paths,
+            "quiz": quiz,
+            "delete": delete,
+        }
+        # Paths generated by the cold pass feed every later scenario
+        order = ["generate_cold"] + [name for name in SCENARIOS if name in scenarios and name != "generate_cold"]
+        for name in order:
+            send = senders[name]
+            result = await _timed_run(send, requests, concurrency)
+            result["allocations"] = await _allocation_run(send, requests, alloc_samples)
+            if name in scenarios:
+                results[name] = result
+            if name == "generate_cold":
+                random.shuffle(paths)
+        stats = service.stats()
+
+    return {
+        "config": {
+            "concurrency": concurrency,
+            "requests": requests,
+            "alloc_samples": alloc_samples,
+            "weeks": weeks,
+            "llm_latency_s": llm_latency,
+            "llm_tokens_per_second": tokens_per_second,
+            "mongo_rtt_s": mongo_rtt,
+            "redis_rtt_s": redis_rtt,
+            "python": platform.python_version(),
+        },
+        "scenarios": results,
+        "cache": {
+            "l1": stats["cache"]["l1"],
+            "single_flight": stats["single_flight"],
+        },
+    }
+
+
+def compare(current: dict, baseline: dict) -> dict:
+    """Relative change per scenario (positive throughput / negative latency is better)"""
+    def change(new, old):
+        return round((new - old) / old * 100, 1) if old else None
+
+    report = {}
+    for name, result in current["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if not old:
+            continue
+        report[name] = {
+            "throughput_pct": change(result["throughput_rps"], old["throughput_rps"]),
+            **{
+                f"{key}_pct": change(result["latency"][key], old["latency"][key])
+                for key in ("p50_ms", "p95_ms", "p99_ms")
+            },
+            "peak_kib_pct": change(
+                result["allocations"].get("peak_kib_per_request", 0),
+                old.get("allocations", {}).get("peak_kib_per_request", 0),
+            ),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per scenario")
+    parser.add_argument("--alloc-samples", type=int, default=20, help="sequential requests traced for allocations")
+    parser.add_argument("--weeks", type=int, default=4)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--tokens-per-second", type=float, default=0, help="fake LLM output speed (0 = instant)")
+    parser.add_argument("--mongo-rtt", type=float, default=0.001)
+    parser.add_argument("--redis-rtt", type=float, default=0.0005)
+    parser.add_argument("--output", help="write results JSON to this file")
+    parser.add_argument("--compare", help="results JSON from an earlier run to compare against")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(
+        args.scenarios, args.concurrency, args.requests, args.alloc_samples, args.llm_latency,
+        args.tokens_per_second, args.mongo_rtt, args.redis_rtt, args.weeks,
+    ))
+    if args.compare:
+        with open(args.compare) as f:
+            result["comparison"] = compare(result, json.load(f))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
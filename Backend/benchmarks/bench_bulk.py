@@ -0,0 +1,129 @@
+"""
+Bulk endpoint benchmark: NDJSON export/import and batch generation.
+
+export  GET /learning-paths/export over N stored paths: time, bytes and
+        traced peak memory (flat in N when the cursor is streamed)
+import  POST /learning-paths/import of that export into an empty collection,
+        per chunk size (one insert_many round trip per chunk)
+batch   one POST /learning-paths/generate/batch for a class of learners whose
+        inputs repeat, versus the same inputs sent one by one to /generate
+
+Usage:
+    python -m benchmarks.bench_bulk --paths 5000 --chunk-sizes 1 100 500 --class-size 60
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+from bson.objectid import ObjectId
+
+from benchmarks._common import app_client, sample_path_data, sample_user_input
+from benchmarks.standins import attach_standins
+
+
+async def _export(service) -> dict:
+    """Drain the export stream the route returns. Read directly rather than
+    through httpx, whose ASGI transport buffers whole response bodies."""
+    from app.utils.streaming import stream_ndjson
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    size = 0
+    lines = 0
+    async for chunk in stream_ndjson(service.vector_store.export_learning_paths()):
+        size += len(chunk)
+        lines += chunk.count("\n")
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return {"paths": lines, "bytes": size, "seconds": round(elapsed, 3), "peak_kib": round(peak / 1024, 1)}
+
+
+async def run(paths: int, weeks: int, chunk_sizes, mongo_rtt: float, class_size: int,
+              distinct: int, llm_latency: float) -> dict:
+    from app.config import get_settings
+
+    settings = get_settings()
+    semantic_cache_enabled = settings.semantic_cache_enabled
+    results = {"paths": paths, "weeks": weeks, "mongo_rtt_s": mongo_rtt}
+    async with app_client() as (client, service):
+        service.llm.backend.latency = llm_latency
+        collection, _ = await attach_standins(service, mongo_rtt=mongo_rtt)
+        for i in range(paths):
+            user_input = sample_user_input(weeks, goal=f"Goal {i}")
+            collection._insert({
+                "_id": ObjectId(), "user_input": user_input, **sample_path_data(weeks), "fingerprint": str(i),
+            })
+
+        results["export"] = await _export(service)
+        async with client.stream("GET", "/v1/learning-paths/export") as response:
+            body = b"".join([chunk async for chunk in response.aiter_bytes()])
+
+        results["import"] = []
+        original_chunk_size = settings.import_chunk_size
+        try:
+            for chunk_size in chunk_sizes:
+                settings.import_chunk_size = chunk_size
+                await attach_standins(service, mongo_rtt=mongo_rtt)
+                started = time.perf_counter()
+                response = await client.post("/v1/learning-paths/import", content=body, timeout=None)
+                elapsed = time.perf_counter() - started
+                report = response.json()
+                results["import"].append({
+                    "chunk_size": chunk_size,
+                    "imported": report["imported"],
+                    "seconds": round(elapsed, 3),
+                    "paths_per_s": round(report["imported"] / elapsed, 1),
+                })
+        finally:
+            settings.import_chunk_size = original_chunk_size
+
+        # Exact dedupe only: the semantic cache would also merge "goal 1" with "goal 2"
+        settings.semantic_cache_enabled = False
+        batch = {}
+        for mode in ("sequential", "batch"):
+            # A class where several learners share a goal (differing only in formatting);
+            # goals are new per mode so neither run is served from the other's cache
+            learners = [
+                sample_user_input(weeks, goal=f"{mode} class goal {i % distinct}" + ("." if i % 2 else ""))
+                for i in range(class_size)
+            ]
+            calls = service.llm.backend.calls
+            started = time.perf_counter()
+            if mode == "batch":
+                response = await client.post("/v1/learning-paths/generate/batch", json={"inputs": learners}, timeout=None)
+                assert response.status_code == 200, response.text
+            else:
+                for learner in learners:
+                    await client.post("/v1/learning-paths/generate", json=learner, timeout=None)
+            batch[mode] = {
+                "seconds": round(time.perf_counter() - started, 3),
+                "llm_calls": service.llm.backend.calls - calls,
+            }
+        results["batch"] = {"class_size": class_size, "distinct_goals": distinct, **batch}
+        settings.semantic_cache_enabled = semantic_cache_enabled
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--paths", type=int, default=5000)
+    parser.add_argument("--weeks", type=int, default=4)
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[1, 100, 500])
+    parser.add_argument("--mongo-rtt", type=float, default=0.001)
+    parser.add_argument("--class-size", type=int, default=60)
+    parser.add_argument("--distinct", type=int, default=12, help="distinct goals in the class")
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(
+        args.paths, args.weeks, args.chunk_sizes, args.mongo_rtt, args.class_size,
+        args.distinct, args.llm_latency,
+    )), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Cache codec benchmark: bytes per entry, encode/decode time and Redis memory.
+
+For 1, 12 and 52-week paths and each codec (the previous json.dumps text,
+then Codec with each serializer/compression available), reports:
+
+    bytes          size of one cached value
+    encode_us      model_dump + encode (what set_learning_path pays)
+    decode_us      decode + LearningPath validation (what an L2 hit pays)
+    redis_mib      keys + values for --entries cached paths, measured with
+                   MEMORY USAGE when --redis-url points at a live server,
+                   otherwise the byte count the stand-in holds
+
+It also times the response side for one cached path: FastAPI's
+response_model round trip rendered by JSONResponse or ORJSONResponse,
+versus ModelResponse serializing the validated model directly.
+
+Usage:
+    python -m benchmarks.bench_codec --weeks 1 12 52 --entries 1000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks._common import sample_path_data, sample_user_input
+from benchmarks.standins import FakeRedis
+
+CODECS = [
+    ("json (previous)", None, None),
+    ("json", "json", "none"),
+    ("orjson", "orjson", "none"),
+    ("orjson+zlib", "orjson", "zlib"),
+    ("orjson+zstd", "orjson", "zstd"),
+    ("msgpack", "msgpack", "none"),
+    ("msgpack+zlib", "msgpack", "zlib"),
+    ("msgpack+zstd", "msgpack", "zstd"),
+]
+
+
+def _per_call_us(fn, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return round((time.perf_counter() - start) / repeats * 1e6, 1)
+
+
+def _available(serializer: str, compression: str) -> bool:
+    from app.utils.codec import _load_compression, _load_serializer
+
+    try:
+        _load_serializer(serializer)
+        _load_compression(compression)
+        return True
+    except ImportError:
+        return False
+
+
+async def _redis_mib(encode, learning_path, entries: int, redis_url: str) -> float:
+    values = []
+    for i in range(entries):
+        data = learning_path.model_dump(mode="json")
+        data["path_title"] = f"{data['path_title']} #{i}"  # distinct values, like real entries
+        values.append((f"learning_path:{i:032x}", encode(data)))
+
+    if redis_url:
+        import redis.asyncio as redis
+
+        client = redis.from_url(redis_url)
+        try:
+            total = 0
+            for key, value in values:
+                await client.set(key, value, ex=60)
+                total += await client.memory_usage(key)
+            await client.delete(*(key for key, _ in values))
+        finally:
+            await client.close()
+        return round(total / 2**20, 2)
+
+    client = FakeRedis(rtt=0)
+    for key, value in values:
+        await client.set(key, value, ex=60)
+    return round(client.memory_usage() / 2**20, 2)
+
+
+async def _response_us(learning_path, repeats: int) -> dict:
+    """Render a LearningPathResponse the way each response path does"""
+    from fastapi.responses import JSONResponse, ORJSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+
+    from app.api.responses import ModelResponse
+    from app.models.learning_path import LearningPathResponse
+
+    response = LearningPathResponse(success=True, learning_path=learning_path, message="cached")
+    field = create_response_field(name="response", type_=LearningPathResponse)
+
+    async def through_response_model(response_class) -> float:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            response_class(await serialize_response(field=field, response_content=response))
+        return round((time.perf_counter() - start) / repeats * 1e6, 1)
+
+    return {
+        "response_model+JSONResponse_us": await through_response_model(JSONResponse),
+        "response_model+ORJSONResponse_us": await through_response_model(ORJSONResponse),
+        "ModelResponse_us": _per_call_us(lambda: ModelResponse(response), repeats),
+    }
+
+
+async def run(weeks_list, entries: int, repeats: int, redis_url: str) -> dict:
+    from app.models.learning_path import LearningPath
+    from app.utils.codec import Codec
+
+    results = []
+    for weeks in weeks_list:
+        learning_path = LearningPath(user_input=sample_user_input(weeks), **sample_path_data(weeks))
+        row = {"weeks": weeks, "codecs": {}}
+        for name, serializer, compression in CODECS:
+            if serializer is None:
+                encode = lambda value: json.dumps(value)
+                decode = json.loads
+            elif _available(serializer, compression):
+                codec = Codec(serializer, compression, min_bytes=1024)
+                encode, decode = codec.encode, codec.decode
+            else:
+                row["codecs"][name] = "not installed"
+                continue
+
+            encoded = encode(learning_path.model_dump(mode="json"))
+            row["codecs"][name] = {
+                "bytes": len(encoded),
+                "encode_us": _per_call_us(lambda: encode(learning_path.model_dump(mode="json")), repeats),
+                "decode_us": _per_call_us(lambda: LearningPath(**decode(encoded)), repeats),
+                "redis_mib": await _redis_mib(encode, learning_path, entries, redis_url),
+            }
+        row["response"] = await _response_us(learning_path, repeats)
+        results.append(row)
+    return {"entries": entries, "redis": redis_url or "stand-in", "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--weeks", type=int, nargs="+", default=[1, 12, 52])
+    parser.add_argument("--entries", type=int, default=1000, help="cached paths for the memory figure")
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--redis-url", default="", help="live Redis for MEMORY USAGE (optional)")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.weeks, args.entries, args.repeats, args.redis_url)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
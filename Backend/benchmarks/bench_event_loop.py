@@ -0,0 +1,90 @@
+"""
+Event-loop responsiveness benchmark.
+
+Measures GET /learning-paths/{id} latency for an already stored path while
+N slow generations are in flight. With the async LLM client the read latency
+stays flat; pass --blocking to simulate the old synchronous client and see
+reads stall behind the LLM calls.
+
+Usage:
+    python -m benchmarks.bench_event_loop --generations 8 --llm-latency 2
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks._common import app_client, sample_path_data, sample_user_input, summarize
+
+
+def slow_backend(latency: float, blocking: bool = False):
+    """Fake LLM backend with a fixed per-call latency; blocking mimics a sync client"""
+    from app.services.llm_backends import FakeBackend
+
+    class _BlockingBackend(FakeBackend):
+        async def complete(self, messages, max_tokens, model=None):
+            time.sleep(latency)
+            return await super().complete(messages, max_tokens, model=model)
+
+    if blocking:
+        return _BlockingBackend(latency=0)
+    return FakeBackend(latency=latency)
+
+
+async def _sample_reads(client, path_id: str, count: int, interval: float) -> list:
+    """Issue reads on a fixed schedule and time them from their scheduled start,
+    so a stalled event loop shows up as latency instead of being hidden."""
+    samples = []
+    origin = time.perf_counter()
+    for i in range(count):
+        scheduled = origin + i * interval
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        response = await client.get(f"/v1/learning-paths/{path_id}")
+        samples.append(time.perf_counter() - scheduled)
+        assert response.status_code == 200, response.text
+    return samples
+
+
+async def run(generations: int, llm_latency: float, reads: int, blocking: bool) -> dict:
+    async with app_client() as (client, service):
+        service.llm.backend = slow_backend(llm_latency, blocking=blocking)
+        path_id = await service.vector_store.store_learning_path(
+            {"user_input": sample_user_input(), **sample_path_data(4)}
+        )
+
+        idle = await _sample_reads(client, path_id, reads, 0.005)
+
+        payloads = [sample_user_input(goal=f"Goal {i}") for i in range(generations)]
+        gen_tasks = [
+            asyncio.create_task(client.post("/v1/learning-paths/generate", json=p, timeout=None))
+            for p in payloads
+        ]
+        loaded = await _sample_reads(client, path_id, reads, llm_latency / reads)
+        responses = await asyncio.gather(*gen_tasks)
+        assert all(r.json()["success"] for r in responses)
+
+    return {
+        "mode": "blocking" if blocking else "async",
+        "generations": generations,
+        "llm_latency_s": llm_latency,
+        "idle": summarize(idle),
+        "under_load": summarize(loaded),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--generations", type=int, default=8)
+    parser.add_argument("--llm-latency", type=float, default=2.0)
+    parser.add_argument("--reads", type=int, default=50)
+    parser.add_argument("--blocking", action="store_true", help="simulate the old sync client")
+    args = parser.parse_args()
+    result = asyncio.run(run(args.generations, args.llm_latency, args.reads, args.blocking))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Single-shot vs fan-out generation benchmark.
+
+Uses the fake LLM backend paced in tokens per second, which truncates
+output at max_tokens like the real provider. For each path
+length it reports wall-clock time and whether generation succeeded.
+
+Usage:
+    python -m benchmarks.bench_fanout --weeks 4 12 26 52 --token-latency 0.002
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks._common import sample_user_input
+
+
+async def _time_generation(service, weeks: int) -> dict:
+    user_input = sample_user_input(weeks, goal=f"Fan-out goal {weeks} {time.perf_counter()}")
+    from app.models.learning_path import UserInput
+
+    start = time.perf_counter()
+    response = await service.generate_learning_path(UserInput(**user_input))
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": round(elapsed, 3),
+        "success": response.success,
+        "error": None if response.success else response.message[:80],
+    }
+
+
+async def run(weeks_list, token_latency: float, first_token_latency: float) -> dict:
+    from app.config import get_settings
+    from app.services.llm_backends import FakeBackend
+    from app.services.path_generator import PathGeneratorService
+
+    settings = get_settings()
+    fanout_min_weeks = settings.fanout_min_weeks or 8
+    service = PathGeneratorService()
+    backend = FakeBackend(latency=first_token_latency, tokens_per_second=1 / token_latency)
+    service.llm.backend = backend
+
+    results = []
+    for weeks in weeks_list:
+        row = {"weeks": weeks}
+        for mode, threshold in (("single_shot", 0), ("fanout", 1)):
+            settings.fanout_min_weeks = threshold
+            backend.calls = 0
+            row[mode] = await _time_generation(service, weeks)
+            row[mode]["llm_calls"] = backend.calls
+        results.append(row)
+    settings.fanout_min_weeks = fanout_min_weeks
+    return {
+        "token_latency_s": token_latency,
+        "weeks_per_call": settings.fanout_weeks_per_call,
+        "max_concurrency": settings.fanout_max_concurrency,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--weeks", type=int, nargs="+", default=[4, 12, 26, 52])
+    parser.add_argument("--token-latency", type=float, default=0.002, help="seconds per output token")
+    parser.add_argument("--first-token-latency", type=float, default=0.2)
+    args = parser.parse_args()
+    result = asyncio.run(run(args.weeks, args.token_latency, args.first_token_latency))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
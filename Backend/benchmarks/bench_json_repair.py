@@ -0,0 +1,145 @@
+"""
+JSON extraction benchmark over a corpus of recorded-style LLM outputs.
+
+Runs every fixture in benchmarks/fixtures/llm_outputs through the old parser
+(strip markdown fences, json.loads) and through extract_json, then validates
+the result against the model the caller would build (LearningPath for path_*
+fixtures, QuizResponse for quiz_*). Reports success, repair and validation
+rates plus per-parse time.
+
+Usage:
+    python -m benchmarks.bench_json_repair --repeat 200
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import time
+
+from benchmarks._common import BACKEND_DIR, sample_user_input
+
+FIXTURE_DIR = os.path.join(BACKEND_DIR, "benchmarks", "fixtures", "llm_outputs")
+
+
+def legacy_parse(text: str) -> dict:
+    """The parser LLMService used before extract_json"""
+    text = text.strip()
+    if text.startswith("```json"):
+        text = text[7:]
+    if text.startswith("```"):
+        text = text[3:]
+    if text.endswith("```"):
+        text = text[:-3]
+    return json.loads(text.strip())
+
+
+def _validate(name: str, data: dict) -> bool:
+    from app.models.learning_path import LearningPath, UserInput
+    from app.models.quiz import QuizResponse
+
+    try:
+        if name.startswith("quiz_"):
+            QuizResponse(week_number=1, **data)
+        else:
+            LearningPath(user_input=UserInput(**sample_user_input()), **data)
+        return True
+    except Exception:
+        return False
+
+
+def _run_parser(parse, fixtures: dict, repeat: int) -> dict:
+    from app.utils.json_repair import ExtractedJSON
+
+    results = {}
+    parsed = valid = repaired = 0
+    for name, text in fixtures.items():
+        try:
+            result = parse(text)
+        except ValueError:
+            results[name] = "failed"
+            continue
+        data = result.data if isinstance(result, ExtractedJSON) else result
+        ok = _validate(name, data)
+        parsed += 1
+        valid += ok
+        if isinstance(result, ExtractedJSON) and result.repaired:
+            repaired += 1
+            results[name] = "repaired" if ok else "repaired, invalid"
+        else:
+            results[name] = "ok" if ok else "invalid"
+
+    # Timing pass without validation
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in fixtures.values():
+            try:
+                parse(text)
+            except ValueError:
+                pass
+    elapsed = time.perf_counter() - start
+
+    total = len(fixtures)
+    return {
+        "parsed": f"{parsed}/{total}",
+        "valid": f"{valid}/{total}",
+        "repaired": repaired,
+        "success_rate": round(valid / total, 3),
+        "mean_parse_us": round(elapsed / (repeat * total) * 1e6, 1),
+        "fixtures": results,
+    }
+
+
+def _truncating_backend(partial: str, full: str):
+    """Backend that returns the truncated fixture first, then the rest of the full response"""
+    from app.services.llm_backends import Completion, LLMBackend
+
+    class _TruncatingBackend(LLMBackend):
+        async def complete(self, messages, max_tokens, model=None):
+            if len(messages) == 1:
+                return Completion(partial, finish_reason="length")
+            return Completion(full[len(messages[1]["content"]):], finish_reason="stop")
+
+    return _TruncatingBackend()
+
+
+async def _run_continuations(fixtures: dict) -> dict:
+    from app.services.llm_service import LLMService
+
+    results = {}
+    for name, text in fixtures.items():
+        if "truncated" not in name:
+            continue
+        full = fixtures[name.split("_truncated")[0] + "_clean.txt"]
+        llm = LLMService()
+        llm.backend = _truncating_backend(text, full)
+        data = await llm.generate_completion("prompt")
+        results[name] = {"valid": _validate(name, data), **llm.stats()}
+    return results
+
+
+def run(repeat: int) -> dict:
+    from app.utils.json_repair import extract_json
+
+    fixtures = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.txt"))):
+        with open(path) as f:
+            fixtures[os.path.basename(path)] = f.read()
+    return {
+        "fixtures": len(fixtures),
+        "legacy": _run_parser(legacy_parse, fixtures, repeat),
+        "extract_json": _run_parser(extract_json, fixtures, repeat),
+        "with_continuation": asyncio.run(_run_continuations(fixtures)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(run(args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
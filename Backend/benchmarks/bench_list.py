@@ -0,0 +1,73 @@
+"""
+List endpoint benchmark: payload size and latency as the collection grows.
+
+Loads N stored paths into the Mongo stand-in (whose _id ordering behaves
+like the _id index), then times GET /learning-paths/ for the first page and
+for a page deep in the collection, in the summary view and in the full view
+(the previous behaviour: whole documents, every week's resources).
+
+Usage:
+    python -m benchmarks.bench_list --sizes 1000 10000 100000 --limit 20
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from bson.objectid import ObjectId
+
+from benchmarks._common import app_client, sample_path_data, sample_user_input, summarize
+from benchmarks.standins import attach_standins
+
+
+async def _time_page(client, params: dict, repeats: int) -> dict:
+    latencies = []
+    size = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        response = await client.get("/v1/learning-paths/", params=params)
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+        size = len(response.content)
+    return {"bytes": size, "latency": summarize(latencies)}
+
+
+async def run(sizes, limit: int, weeks: int, repeats: int) -> dict:
+    results = []
+    # Documents share their heavy fields so millions fit in memory
+    template = {"user_input": sample_user_input(weeks), **sample_path_data(weeks)}
+    async with app_client() as (client, service):
+        for size in sizes:
+            collection, _ = await attach_standins(service, mongo_rtt=0)
+            ids = []
+            for i in range(size):
+                doc = dict(template, _id=ObjectId(), fingerprint=str(i))
+                collection._insert(doc)
+                ids.append(doc["_id"])
+            deep_cursor = str(ids[size // 2])
+
+            row = {"paths": size}
+            for view in ("summary", "full"):
+                row[view] = {
+                    "first_page": await _time_page(client, {"limit": limit, "view": view}, repeats),
+                    "deep_page": await _time_page(
+                        client, {"limit": limit, "view": view, "cursor": deep_cursor}, repeats
+                    ),
+                }
+            results.append(row)
+    return {"limit": limit, "weeks_per_path": weeks, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--weeks", type=int, default=12)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.sizes, args.limit, args.weeks, args.repeats)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Memory benchmark for the no-MongoDB fallback store under sustained inserts.
+
+Stores N generated paths through VectorService with MongoDB unavailable and
+samples traced Python memory (tracemalloc) along the way. "unbounded" is the
+previous fallback, a dict of path dicts; "bounded" is BoundedStore with the
+given caps; "bounded_spill" also writes every path to a SQLite file.
+
+Usage:
+    python -m benchmarks.bench_memory_store --paths 20000 --max-entries 1000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+import uuid
+from contextlib import nullcontext
+
+from benchmarks._common import sample_path_data, sample_user_input
+
+
+class _UnboundedStore:
+    """The previous fallback: every path dict kept forever"""
+
+    def __init__(self):
+        self._paths = {}
+        self._fingerprints = {}
+
+    def find_id_by_fingerprint(self, fingerprint):
+        return self._fingerprints.get(fingerprint)
+
+    def put(self, path_id, document):
+        self._paths[path_id] = document
+        self._fingerprints[document["fingerprint"]] = path_id
+
+    def transaction(self):
+        return nullcontext()
+
+    def stats(self):
+        return {"entries": len(self._paths)}
+
+    def close(self):
+        pass
+
+
+async def _run_mode(mode: str, paths: int, weeks: int, samples: int, spill_dir: str) -> dict:
+    from app.config import get_settings
+    from app.services.vector_service import VectorService
+
+    settings = get_settings()
+    settings.memory_store_spill_path = os.path.join(spill_dir, f"{uuid.uuid4().hex}.sqlite3") if mode == "bounded_spill" else ""
+    # Embeddings would add the semantic index's own (bounded) footprint; measure the store alone
+    settings.semantic_cache_enabled = False
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    store = VectorService()
+    await store.connect()
+    if mode == "unbounded":
+        store._in_memory_store = _UnboundedStore()
+
+    timeline = []
+    step = max(1, paths // samples)
+    started = time.perf_counter()
+    for i in range(paths):
+        # Distinct goals so every insert is a new path
+        await store.store_learning_path(
+            {"user_input": sample_user_input(weeks, goal=f"Goal {i}"), **sample_path_data(weeks)}
+        )
+        if (i + 1) % step == 0:
+            timeline.append({"paths": i + 1, "traced_mib": round((tracemalloc.get_traced_memory()[0] - baseline) / 2**20, 2)})
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    result = {
+        "inserts_per_s": round(paths / elapsed, 1),
+        "peak_mib": round(peak / 2**20, 2),
+        "final_mib": timeline[-1]["traced_mib"] if timeline else 0.0,
+        "store": store._in_memory_store.stats(),
+        "timeline": timeline,
+    }
+    store.close()
+    return result
+
+
+async def run(paths: int, weeks: int, max_entries: int, max_bytes: int, samples: int) -> dict:
+    from app.config import get_settings
+
+    settings = get_settings()
+    original = (
+        settings.memory_store_max_entries, settings.memory_store_max_bytes,
+        settings.memory_store_spill_path, settings.semantic_cache_enabled,
+    )
+    settings.memory_store_max_entries = max_entries
+    settings.memory_store_max_bytes = max_bytes
+    results = {"paths": paths, "weeks": weeks, "max_entries": max_entries, "max_bytes": max_bytes}
+    try:
+        with tempfile.TemporaryDirectory() as spill_dir:
+            for mode in ("unbounded", "bounded", "bounded_spill"):
+                results[mode] = await _run_mode(mode, paths, weeks, samples, spill_dir)
+    finally:
+        (settings.memory_store_max_entries, settings.memory_store_max_bytes,
+         settings.memory_store_spill_path, settings.semantic_cache_enabled) = original
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--paths", type=int, default=20000)
+    parser.add_argument("--weeks", type=int, default=4)
+    parser.add_argument("--max-entries", type=int, default=1000)
+    parser.add_argument("--max-bytes", type=int, default=64 * 1024 * 1024)
+    parser.add_argument("--samples", type=int, default=5, help="memory samples per mode")
+    args = parser.parse_args()
+    result = asyncio.run(run(args.paths, args.weeks, args.max_entries, args.max_bytes, args.samples))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
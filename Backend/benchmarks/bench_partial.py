@@ -0,0 +1,110 @@
+"""
+Partial regeneration benchmark: editing a stored path versus generating it again.
+
+For each path length, against the fake LLM (first-token latency plus a fixed
+output rate, so latency follows the tokens written) and the Mongo stand-in:
+
+    full          POST /generate for a new input of the same length, the only
+                  way to change a path before week edits existed
+    patch_week    PATCH /{id}/weeks/{n} on a middle week
+    shorten_1     POST /{id}/resize removing one week
+    extend_1      POST /{id}/resize adding it back
+
+Reported per operation: LLM calls, prompt + completion tokens, latency and
+the BSON bytes sent to MongoDB.
+
+Usage:
+    python -m benchmarks.bench_partial --weeks 8 24 52
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import bson
+
+from benchmarks._common import app_client, sample_user_input
+from benchmarks.standins import attach_standins
+
+
+def _count_writes(collection) -> dict:
+    """Wrap the collection's write methods to total the BSON they send"""
+    written = {"bytes": 0}
+    for name in ("insert_one", "update_one", "replace_one"):
+        method = getattr(collection, name)
+
+        async def counted(*args, _method=method, **kwargs):
+            for arg in args:
+                if isinstance(arg, dict):
+                    written["bytes"] += len(bson.encode(arg))
+                elif isinstance(arg, list):
+                    written["bytes"] += sum(len(bson.encode(part)) for part in arg)
+            return await _method(*args, **kwargs)
+
+        setattr(collection, name, counted)
+    return written
+
+
+async def _measure(client, service, written: dict, method: str, url: str, body: dict) -> dict:
+    llm = service.llm
+    calls, tokens, sent = llm.backend.calls, llm.prompt_tokens + llm.completion_tokens, written["bytes"]
+    started = time.perf_counter()
+    response = await client.request(method, url, json=body, timeout=None)
+    elapsed = time.perf_counter() - started
+    assert response.status_code == 200, response.text
+    return {
+        "llm_calls": llm.backend.calls - calls,
+        "tokens": llm.prompt_tokens + llm.completion_tokens - tokens,
+        "seconds": round(elapsed, 3),
+        "mongo_bytes": written["bytes"] - sent,
+    }
+
+
+async def run(weeks_list, llm_latency: float, tokens_per_second: float) -> dict:
+    from app.config import get_settings
+
+    get_settings().semantic_cache_enabled = False  # each "full" input must really generate
+    results = []
+    async with app_client() as (client, service):
+        service.llm.backend.latency = llm_latency
+        service.llm.backend.tokens_per_second = tokens_per_second
+        collection, _ = await attach_standins(service)
+        written = _count_writes(collection)
+        for weeks in weeks_list:
+            row = {"weeks": weeks}
+            row["full"] = await _measure(
+                client, service, written, "POST", "/v1/learning-paths/generate",
+                sample_user_input(weeks, goal=f"Benchmark goal {weeks}")
+            )
+            response = await client.post(
+                "/v1/learning-paths/generate", json=sample_user_input(weeks, goal=f"Edited goal {weeks}")
+            )
+            path_id = response.json()["learning_path"]["id"]
+            row["patch_week"] = await _measure(
+                client, service, written, "PATCH", f"/v1/learning-paths/{path_id}/weeks/{(weeks + 1) // 2}",
+                {"instructions": "More hands-on practice"}
+            )
+            row["shorten_1"] = await _measure(
+                client, service, written, "POST", f"/v1/learning-paths/{path_id}/resize",
+                {"duration_weeks": weeks - 1}
+            )
+            row["extend_1"] = await _measure(
+                client, service, written, "POST", f"/v1/learning-paths/{path_id}/resize",
+                {"duration_weeks": weeks}
+            )
+            results.append(row)
+    return {"llm_latency_s": llm_latency, "tokens_per_second": tokens_per_second, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--weeks", type=int, nargs="+", default=[8, 24, 52])
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--tokens-per-second", type=float, default=1000)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.weeks, args.llm_latency, args.tokens_per_second)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Quiz latency benchmark, with and without background pre-generation.
+
+Generates a path, then opens the quiz for each of its first K weeks the way
+QuizModal does (POST /quiz/generate with the week's subtopics) and reports
+p50/p99. With pre-generation enabled, quizzes are generated right after the
+path and opening one is a cache read.
+
+Usage:
+    python -m benchmarks.bench_quiz --weeks 4 --paths 10 --llm-latency 1.0
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+from benchmarks._common import (
+    app_client, sample_user_input, summarize,
+)
+
+
+async def _run_mode(pregenerate: int, weeks: int, paths: int, llm_latency: float, settle: float) -> dict:
+    from app.config import get_settings
+    from app.services.llm_backends import FakeBackend
+
+    get_settings().quiz_pregenerate_weeks = pregenerate
+    latencies = []
+    async with app_client() as (client, service):
+        # The fake derives subtopics from the goal, so each path gets its own quizzes
+        service.llm.backend = FakeBackend(latency=llm_latency)
+        for _ in range(paths):
+            # Random goals so neither the exact nor the semantic cache serves a previous path
+            payload = sample_user_input(weeks, goal=f"Learn {uuid.uuid4().hex}")
+            response = await client.post("/v1/learning-paths/generate", json=payload)
+            learning_path = response.json()["learning_path"]
+            # Learner reads the roadmap before opening the first quiz
+            await asyncio.sleep(settle)
+            for week in learning_path["weekly_breakdown"]:
+                start = time.perf_counter()
+                quiz = await client.post("/v1/quiz/generate", json={
+                    "week_number": week["week_number"],
+                    "topics": week["subtopics"],
+                    "path_id": learning_path["id"],
+                })
+                latencies.append(time.perf_counter() - start)
+                assert quiz.status_code == 200, quiz.text
+    return summarize(latencies)
+
+
+async def run(weeks: int, paths: int, llm_latency: float, settle: float) -> dict:
+    from app.config import get_settings
+
+    original = get_settings().quiz_pregenerate_weeks
+    try:
+        without = await _run_mode(0, weeks, paths, llm_latency, settle)
+        with_pregeneration = await _run_mode(weeks, weeks, paths, llm_latency, settle)
+    finally:
+        get_settings().quiz_pregenerate_weeks = original
+    return {
+        "weeks": weeks,
+        "paths": paths,
+        "llm_latency_s": llm_latency,
+        "without_pregeneration": without,
+        "with_pregeneration": with_pregeneration,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--weeks", type=int, default=4)
+    parser.add_argument("--paths", type=int, default=10)
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--settle", type=float, default=None,
+                        help="pause between path creation and first quiz (default: 2x LLM latency)")
+    args = parser.parse_args()
+    settle = args.settle if args.settle is not None else 2 * args.llm_latency
+    print(json.dumps(asyncio.run(run(args.weeks, args.paths, args.llm_latency, settle)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
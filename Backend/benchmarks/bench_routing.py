@@ -0,0 +1,179 @@
+"""
+Model routing benchmark: generate tail latency and cost with routing, retries and hedging.
+
+The fake backend is given two model profiles: a large model (slower, dearer)
+and a fast one. Every call's latency is first-token time plus output at the
+model's token rate, with a little noise; --straggler-rate of calls take
+--straggler-factor times longer (a slow replica or queue) and --error-rate
+fail with a 503. --learners closed-loop clients each generate a --weeks path
+(fanned out: outline plus detail calls) and then a quiz, until --requests
+paths are done, under three configurations:
+
+    baseline   everything on the large model, no timeout, retry or hedge
+               (LLMService before routing)
+    routed     quizzes on the fast model; 2 retries with jittered backoff
+    hedged     routed, plus a duplicate for any call past its rolling p95
+               (at most --hedge-ratio extra calls)
+
+Reported per configuration: generate and quiz latency percentiles, failed
+generations, LLM calls, hedges and cost (tokens billed x each model's price,
+relative to baseline; a hedge cancelled mid-call is billed in full).
+
+Usage:
+    python -m benchmarks.bench_routing --requests 300 --learners 12
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from benchmarks._common import app_client, sample_user_input, summarize
+from benchmarks.standins import attach_standins
+
+LARGE_MODEL = "llama-3.3-70b"
+FAST_MODEL = "llama3.1-8b"
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"Error code: {status_code}")
+        self.status_code = status_code
+
+
+def tiered_backend(profiles: dict, straggler_rate: float, straggler_factor: float, error_rate: float, seed: int):
+    """FakeBackend whose latency depends on the model each call is routed to"""
+    from app.services.llm_backends import CHARS_PER_TOKEN, Completion, FakeBackend
+
+    class _TieredBackend(FakeBackend):
+        def __init__(self):
+            super().__init__(latency=0, tokens_per_second=0, seed=seed)
+            self._jitter = random.Random(seed)
+            self.calls_by_model = {}
+            # Tokens billed per model, counting hedges cancelled mid-call in full
+            self.billed = {}
+
+        async def complete(self, messages, max_tokens, model=None):
+            first_token, tokens_per_second = profiles[model]
+            self.calls_by_model[model] = self.calls_by_model.get(model, 0) + 1
+            text, finish_reason = self._respond(messages, max_tokens)
+            seconds = (first_token + len(text) / CHARS_PER_TOKEN / tokens_per_second) * self._jitter.lognormvariate(0, 0.1)
+            if self._jitter.random() < straggler_rate:
+                seconds *= straggler_factor
+            failed = self._jitter.random() < error_rate
+            prompt_tokens = sum(len(message["content"]) for message in messages) // CHARS_PER_TOKEN
+            completion_tokens = len(text) // CHARS_PER_TOKEN
+            if not failed:
+                self.billed[model] = self.billed.get(model, 0) + prompt_tokens + completion_tokens
+            await asyncio.sleep(seconds / 3 if failed else seconds)
+            if failed:
+                raise ProviderError(503)
+            return Completion(
+                text,
+                finish_reason=finish_reason,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens
+            )
+
+    return _TieredBackend()
+
+
+CONFIGURATIONS = {
+    "baseline": {"llm_fast_model": "", "llm_max_retries": 0, "llm_timeout": 600.0, "llm_hedge_enabled": False},
+    "routed": {"llm_fast_model": FAST_MODEL, "llm_max_retries": 2, "llm_timeout": 30.0, "llm_hedge_enabled": False},
+    "hedged": {"llm_fast_model": FAST_MODEL, "llm_max_retries": 2, "llm_timeout": 30.0, "llm_hedge_enabled": True},
+}
+
+
+async def _run_configuration(client, service, name: str, requests: int, learners: int, weeks: int,
+                             prices: dict) -> dict:
+    from app.services.llm_router import ModelRouter
+
+    service.llm.router = ModelRouter(service.llm._in_flight)
+    backend = service.llm.backend
+    backend.billed = {}
+    generate, quiz = [], []
+    failed = 0
+    remaining = iter(range(requests))
+
+    async def learner():
+        nonlocal failed
+        for i in remaining:
+            user_input = sample_user_input(weeks, goal=f"{name} goal {i}")
+            started = time.perf_counter()
+            response = await client.post("/v1/learning-paths/generate", json=user_input, timeout=None)
+            if response.status_code != 200:
+                failed += 1
+                continue
+            generate.append(time.perf_counter() - started)
+            week = response.json()["learning_path"]["weekly_breakdown"][0]
+            started = time.perf_counter()
+            response = await client.post(
+                "/v1/quiz/generate", json={"week_number": 1, "topics": week["subtopics"]}, timeout=None
+            )
+            if response.status_code == 200:
+                quiz.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(learner() for _ in range(learners)))
+    routing = service.llm.router.stats()
+    cost = sum(tokens * prices[model] / 1e6 for model, tokens in backend.billed.items())
+    return {
+        "generate": summarize(generate),
+        "quiz": summarize(quiz),
+        "failed_generations": failed,
+        "llm_calls": routing["calls"] + routing["hedges"],
+        "retries": routing["retries"],
+        "hedges": routing["hedges"],
+        "cost": round(cost, 4),
+        "calls_by_model": {model: stats["calls"] for model, stats in routing["models"].items()},
+    }
+
+
+async def run(requests: int, learners: int, weeks: int, straggler_rate: float, straggler_factor: float,
+              error_rate: float, hedge_ratio: float, seed: int) -> dict:
+    from app.config import get_settings
+
+    settings = get_settings()
+    settings.semantic_cache_enabled = False
+    settings.cerebras_model = LARGE_MODEL
+    settings.llm_hedge_max_ratio = hedge_ratio
+    profiles = {LARGE_MODEL: (0.25, 2000), FAST_MODEL: (0.1, 4000)}  # first-token s, tokens/s
+    prices = {LARGE_MODEL: 0.6, FAST_MODEL: 0.1}  # per million tokens, relative
+    results = {
+        "requests": requests, "learners": learners, "weeks": weeks,
+        "straggler_rate": straggler_rate, "straggler_factor": straggler_factor, "error_rate": error_rate,
+    }
+    async with app_client() as (client, service):
+        await attach_standins(service)
+        service.llm._in_flight = asyncio.Semaphore(256)  # measure the model, not the worker's cap
+        service.llm.backend = tiered_backend(profiles, straggler_rate, straggler_factor, error_rate, seed)
+        for name, overrides in CONFIGURATIONS.items():
+            for key, value in overrides.items():
+                setattr(settings, key, value)
+            results[name] = await _run_configuration(client, service, name, requests, learners, weeks, prices)
+        baseline_cost = results["baseline"]["cost"]
+        for name in CONFIGURATIONS:
+            results[name]["relative_cost"] = round(results[name]["cost"] / baseline_cost, 3) if baseline_cost else None
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--learners", type=int, default=12)
+    parser.add_argument("--weeks", type=int, default=12)
+    parser.add_argument("--straggler-rate", type=float, default=0.03)
+    parser.add_argument("--straggler-factor", type=float, default=6.0)
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--hedge-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(
+        args.requests, args.learners, args.weeks, args.straggler_rate, args.straggler_factor,
+        args.error_rate, args.hedge_ratio, args.seed,
+    )), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Semantic cache benchmark.
+
+Builds the in-memory SemanticIndex at several sizes and reports lookup
+latency (embedding + nearest-neighbour search), the hit rate of inputs that
+should hit and the false hit rate of inputs that must not. The index is
+filled with random unit vectors as distractors plus a set of real stored
+inputs. Queries cycle through:
+
+    reworded    a stored input re-cased, re-punctuated, skills reordered
+                (should hit)
+    near_miss   a stored input with its goal swapped for one a keyword away
+                ("game" for "web developer", Vue for React), a goal that is
+                never stored (must miss)
+    other_style a stored input with another learning style (must miss,
+                unless a stored input already has that style)
+
+Each size is run with two partition keys: "schedule" (hours and weeks, the
+original key) and "full" (VectorService's key: schedule, learning style and
+goal words).
+
+Usage:
+    python -m benchmarks.bench_semantic_cache --sizes 10000 100000 1000000
+"""
+
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+
+from benchmarks._common import summarize
+
+SKILLS = ["Python", "SQL", "JavaScript", "HTML", "CSS", "Java", "Excel", "Statistics", "Git", "Linux"]
+# Stored goals, each with near misses that are never stored
+GOALS = {
+    "Get a job as a web developer": ["Get a job as a game developer", "Get a job as a web designer"],
+    "Become a frontend developer with React": ["Become a frontend developer with Vue"],
+    "Learn machine learning": ["Learn deep learning", "Learn machine learning operations"],
+    "Pass the AWS Solutions Architect Associate exam": ["Pass the AWS Solutions Architect Professional exam"],
+    "Become a data scientist": ["Become a data engineer"],
+    "Become a backend developer": ["Become a blockchain developer"],
+    "Get a job as a DevOps engineer": ["Get a job as a QA engineer"],
+    "Build mobile apps with React Native": ["Build mobile apps with Flutter"],
+    "Become a data analyst": ["Become a business analyst"],
+    "Prepare for a software engineering interview": ["Prepare for a data science interview"],
+}
+HOURS = [5, 10, 15, 20]
+WEEKS = [4, 8, 12, 16, 24]
+STYLES = ["hands-on", "visual", "reading", "mixed"]
+QUERY_KINDS = ["reworded", "near_miss", "other_style"]
+
+
+def _stored_inputs(rng: random.Random, count: int) -> list:
+    inputs = []
+    for _ in range(count):
+        inputs.append({
+            "current_skills": ", ".join(rng.sample(SKILLS, rng.randint(1, 3))),
+            "target_goal": rng.choice(list(GOALS)),
+            "hours_per_week": rng.choice(HOURS),
+            "duration_weeks": rng.choice(WEEKS),
+            "preferred_learning_style": rng.choice(STYLES),
+        })
+    return inputs
+
+
+def _reworded(rng: random.Random, user_input: dict) -> dict:
+    skills = [s.strip() for s in user_input["current_skills"].split(",")]
+    rng.shuffle(skills)
+    return dict(
+        user_input,
+        current_skills=",".join(s.lower() for s in skills),
+        target_goal=user_input["target_goal"].lower() + rng.choice(["", ".", "!"]),
+    )
+
+
+def _query(rng: random.Random, kind: str, user_input: dict) -> dict:
+    if kind == "reworded":
+        return _reworded(rng, user_input)
+    if kind == "near_miss":
+        return dict(user_input, target_goal=rng.choice(GOALS[user_input["target_goal"]]))
+    other_styles = [style for style in STYLES if style != user_input["preferred_learning_style"]]
+    return dict(user_input, preferred_learning_style=rng.choice(other_styles))
+
+
+def _differs(query: dict, matched: dict) -> bool:
+    """A hit on this stored input serves the wrong path: another goal, style or schedule
+    (near-miss goals are never stored, so every near_miss hit is one)"""
+    from app.utils.fingerprint import canonicalize_user_input
+
+    query, matched = canonicalize_user_input(query), canonicalize_user_input(matched)
+    return any(query[field] != matched[field] for field in query if field != "current_skills")
+
+
+def _schedule_key(user_input: dict) -> tuple:
+    return (user_input["hours_per_week"], user_input["duration_weeks"])
+
+
+def _run_size(size: int, partition, inputs: list, queries: list, threshold: float, dim: int, seed: int) -> dict:
+    from app.services.semantic_index import SemanticIndex
+    from app.utils.embedding import embed_user_input
+
+    np_rng = np.random.default_rng(seed)
+    index = SemanticIndex(dim)
+    keys = [partition(user_input) for user_input in inputs]
+    for i, user_input in enumerate(inputs):
+        index.add(f"stored-{i}", keys[i], embed_user_input(user_input, dim))
+
+    build_start = time.perf_counter()
+    stored = len(inputs)
+    for start in range(0, max(0, size - stored), 50_000):
+        count = min(50_000, size - stored - start)
+        vectors = np_rng.standard_normal((count, dim)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        for j in range(count):
+            # Distractors spread over the partitions real inputs use
+            index.add(f"noise-{start + j}", keys[(start + j) % stored], vectors[j])
+    build_seconds = time.perf_counter() - build_start
+
+    latencies = []
+    hits = {kind: 0 for kind in QUERY_KINDS}
+    for kind, query in queries:
+        start = time.perf_counter()
+        vector = embed_user_input(query, dim)
+        path_id, score = index.search(partition(query), vector)
+        latencies.append(time.perf_counter() - start)
+        # Distractors are random vectors: any hit worth counting is on a stored input
+        if path_id is None or not path_id.startswith("stored-") or score < threshold:
+            continue
+        if kind == "reworded" or _differs(query, inputs[int(path_id.split("-")[1])]):
+            hits[kind] += 1
+
+    per_kind = len(queries) / len(QUERY_KINDS)
+    return {
+        "indexed": len(index),
+        "build_s": round(build_seconds, 2),
+        "index_mb": round(size * dim * 4 / 2**20, 1),
+        "reworded_hit_rate": round(hits["reworded"] / per_kind, 4),
+        "near_miss_false_hit_rate": round(hits["near_miss"] / per_kind, 4),
+        "other_style_false_hit_rate": round(hits["other_style"] / per_kind, 4),
+        "lookup": summarize(latencies),
+    }
+
+
+def run(sizes, stored: int, queries: int, threshold: float, dim: int, seed: int) -> dict:
+    from app.services.vector_service import VectorService
+
+    rng = random.Random(seed)
+    inputs = _stored_inputs(rng, stored)
+    query_list = []
+    for q in range(queries):
+        kind = QUERY_KINDS[q % len(QUERY_KINDS)]
+        query_list.append((kind, _query(rng, kind, rng.choice(inputs))))
+
+    partitions = {"schedule": _schedule_key, "full": VectorService._semantic_key}
+    results = []
+    for size in sizes:
+        row = {"size": size}
+        for name, partition in partitions.items():
+            row[name] = _run_size(size, partition, inputs, query_list, threshold, dim, seed)
+        results.append(row)
+    return {"dim": dim, "threshold": threshold, "stored_real_inputs": stored, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--stored", type=int, default=2_000)
+    parser.add_argument("--queries", type=int, default=3_000)
+    parser.add_argument("--threshold", type=float, default=0.92)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    print(json.dumps(run(args.sizes, args.stored, args.queries, args.threshold, args.dim, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
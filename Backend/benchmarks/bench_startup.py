@@ -0,0 +1,77 @@
+"""
+Cold-start benchmark.
+
+Boots the app in a fresh interpreter with Redis and MongoDB pointed at
+unroutable addresses and reports how long import + lifespan startup take,
+plus the time until the first /health response.
+
+Usage:
+    python -m benchmarks.bench_startup --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks._common import BACKEND_DIR
+
+_CHILD = r"""
+import asyncio, json, time
+t0 = time.perf_counter()
+import httpx
+from app.main import app
+imported = time.perf_counter()
+
+async def boot():
+    async with app.router.lifespan_context(app):
+        started = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get("/health")
+            assert response.status_code == 200
+        ready = time.perf_counter()
+    return started, ready
+
+started, ready = asyncio.run(boot())
+print(json.dumps({
+    "import_s": imported - t0,
+    "startup_s": started - t0,
+    "first_health_s": ready - t0,
+}))
+"""
+
+
+def _boot_once() -> dict:
+    env = dict(os.environ)
+    env.update({
+        "CEREBRAS_API_KEY": "benchmark",
+        # Unroutable addresses: connecting would hang until the driver timeouts
+        "MONGODB_ATLAS_URI": "mongodb://10.255.255.1:27017",
+        "REDIS_URL": "redis://10.255.255.1:6379",
+    })
+    output = subprocess.run(
+        [sys.executable, "-c", _CHILD],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [_boot_once() for _ in range(args.runs)]
+    result = {
+        key: round(statistics.median(run[key] for run in runs), 3)
+        for key in ("import_s", "startup_s", "first_health_s")
+    }
+    result["runs"] = args.runs
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Storage throughput benchmark for GET /learning-paths/{id}.
+
+Runs the app in-process against a MongoDB stand-in with a fixed round-trip
+time and reports requests/second at a given concurrency. "blocking" mimics
+the previous synchronous pymongo calls; "async" is the motor-backed service.
+
+Usage:
+    python -m benchmarks.bench_storage_rps --concurrency 32 --rtt 0.002
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from benchmarks._common import app_client, sample_path_data, sample_user_input, summarize
+from benchmarks.standins import BlockingCollection, FakeCollection
+
+
+async def _run_mode(client, service, collection, paths: int, concurrency: int, duration: float) -> dict:
+    service.vector_store.collection = collection
+    ids = [
+        await service.vector_store.store_learning_path(
+            {"user_input": sample_user_input(), **sample_path_data(4)}
+        )
+        for _ in range(paths)
+    ]
+
+    latencies = []
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.get(f"/v1/learning-paths/{random.choice(ids)}")
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {"rps": round(len(latencies) / elapsed, 1), "latency": summarize(latencies)}
+
+
+async def run(concurrency: int, rtt: float, duration: float, paths: int) -> dict:
+    results = {"concurrency": concurrency, "rtt_s": rtt}
+    async with app_client() as (client, service):
+        await service.vector_store.connect()
+        results["blocking"] = await _run_mode(
+            client, service, BlockingCollection(rtt), paths, concurrency, duration
+        )
+        results["async"] = await _run_mode(
+            client, service, FakeCollection(rtt), paths, concurrency, duration
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rtt", type=float, default=0.002, help="simulated Mongo round trip (s)")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--paths", type=int, default=100)
+    args = parser.parse_args()
+    result = asyncio.run(run(args.concurrency, args.rtt, args.duration, args.paths))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
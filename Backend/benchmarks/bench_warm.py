@@ -0,0 +1,203 @@
+"""
+Cache warming benchmark: cold-start latency of popular goals before and after warming.
+
+A history of --history stored paths is generated first, over --goals goals
+with Zipf-distributed popularity; each goal has a usual skill set, style and
+schedule, with some spread. Redis and the app's in-process cache are then
+flushed (a deploy or a Redis restart) and --requests requests for the --top
+most popular goals, drawn from the same distribution, are sent by
+--learners closed-loop clients, in three scenarios:
+
+    cold      straight after the flush: exact inputs stored in MongoDB are a
+              lookup away, the rest call the LLM
+    warmed    after the warming job (a separate PathGeneratorService on the
+              same MongoDB and Redis, as scripts.warm_cache runs) mined the
+              --top goals at --per-goal schedules and warmed them
+    cache_hit the same requests once more: every path is in Redis
+
+Reported: latency percentiles of all requests and of each input's first
+request (its cold start), LLM calls during the requests, and the warming
+job's hit rate of its candidates before and after, tokens and time.
+
+Usage:
+    python -m benchmarks.bench_warm --goals 40 --history 150 --top 10 --requests 200
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from benchmarks._common import app_client, summarize
+from benchmarks.standins import attach_standins
+
+SKILLS = ["Python", "SQL", "JavaScript", "HTML, CSS", "Java", "Excel", "Linux", "Git"]
+SCHEDULES = [(10, 12), (5, 8), (15, 16), (8, 4), (20, 24)]
+SCHEDULE_WEIGHTS = [40, 25, 20, 10, 5]
+
+
+def _profiles(goals: int, rng: random.Random) -> list:
+    """Per goal: its usual skills and schedule"""
+    return [
+        {
+            "goal": f"Goal number {rank}",
+            "skills": rng.choice(SKILLS),
+            "schedule": rng.choices(SCHEDULES, SCHEDULE_WEIGHTS)[0],
+        }
+        for rank in range(1, goals + 1)
+    ]
+
+
+def _draw(profiles: list, rng: random.Random) -> dict:
+    """One learner's input: a Zipf-popular goal, usually with its usual skills and schedule"""
+    profile = rng.choices(profiles, [1 / rank for rank in range(1, len(profiles) + 1)])[0]
+    skills = profile["skills"] if rng.random() < 0.9 else rng.choice(SKILLS)
+    hours, weeks = profile["schedule"] if rng.random() < 0.7 else rng.choices(SCHEDULES, SCHEDULE_WEIGHTS)[0]
+    return {
+        "current_skills": skills,
+        "target_goal": profile["goal"],
+        "hours_per_week": hours,
+        "duration_weeks": weeks,
+        "preferred_learning_style": "hands-on" if rng.random() < 0.95 else "visual",
+    }
+
+
+async def _send(client, service, requests: list, learners: int, covered: set) -> dict:
+    """Latency of every request, and of each input's first request (its cold
+    start), also for just the inputs among the warming job's candidates"""
+    from app.utils.fingerprint import fingerprint_user_input
+
+    latencies, first, first_covered = [], [], []
+    seen = set()
+    calls = service.llm.backend.calls
+    pending = iter(requests)
+
+    async def learner():
+        for user_input in pending:
+            fingerprint = fingerprint_user_input(user_input)
+            is_first = fingerprint not in seen
+            seen.add(fingerprint)
+            started = time.perf_counter()
+            response = await client.post("/v1/learning-paths/generate", json=user_input, timeout=None)
+            assert response.status_code == 200 and response.json()["success"], response.text
+            latencies.append(time.perf_counter() - started)
+            if is_first:
+                first.append(latencies[-1])
+                if fingerprint in covered:
+                    first_covered.append(latencies[-1])
+
+    await asyncio.gather(*(learner() for _ in range(learners)))
+    return {
+        "all": summarize(latencies),
+        "first_request": summarize(first),
+        "first_request_candidates": summarize(first_covered),
+        "candidate_share": round(
+            sum(fingerprint_user_input(user_input) in covered for user_input in requests) / len(requests), 3
+        ),
+        "llm_calls": service.llm.backend.calls - calls,
+    }
+
+
+def _clear_local(service):
+    """Empty the app's in-process cache, as in a freshly started worker"""
+    from app.config import get_settings
+    from app.services.cache_service import LRUCache
+
+    settings = get_settings()
+    service.cache.local = LRUCache(settings.l1_cache_max_entries, settings.l1_cache_ttl)
+
+
+async def _scenario(name: str, args) -> dict:
+    from app.models.learning_path import UserInput
+    from app.services.cache_warmer import CacheWarmer, mine_popular_inputs
+    from app.services.path_generator import PathGeneratorService
+    from app.utils.fingerprint import fingerprint_user_input
+
+    rng = random.Random(args.seed)
+    profiles = _profiles(args.goals, rng)
+    history = [_draw(profiles, rng) for _ in range(args.history)]
+    requests = [_draw(profiles[:args.top], rng) for _ in range(args.requests)]
+
+    result = {}
+    async with app_client() as (client, service):
+        collection, fake_redis = await attach_standins(service)
+        backend = service.llm.backend
+        backend.latency = 0
+        for user_input in history:
+            await service.generate_learning_path(UserInput(**user_input))
+        fake_redis._data.clear()
+        _clear_local(service)
+        backend.latency = args.llm_latency
+        backend.tokens_per_second = args.tokens_per_second
+        # What the warming job would pick (mining only reads MongoDB)
+        candidates = await mine_popular_inputs(service, args.top, args.per_goal)
+        covered = {fingerprint_user_input(user_input) for user_input in candidates}
+
+        if name == "warmed":
+            # The warming job runs in its own process, sharing only MongoDB and Redis
+            job = PathGeneratorService()
+            job.vector_store._connected = True
+            job.vector_store.collection = collection
+            job.cache._connected = True
+            job.cache.redis_client = fake_redis
+            job.cache.enabled = True
+            job.llm.backend.latency = args.llm_latency
+            job.llm.backend.tokens_per_second = args.tokens_per_second
+            started = time.perf_counter()
+            candidates = await mine_popular_inputs(job, args.top, args.per_goal)
+            warmer = CacheWarmer(job, concurrency=args.concurrency, token_budget=args.token_budget)
+            before = await warmer.hit_rate(candidates)
+            warm = await warmer.warm(candidates)
+            result["warming"] = {
+                "before": before,
+                "after": await warmer.hit_rate(candidates),
+                "generated": warm["generated"],
+                "preloaded": warm["preloaded"],
+                "over_budget": warm["over_budget"],
+                "tokens_used": warm["tokens_used"],
+                "seconds": round(time.perf_counter() - started, 2),
+            }
+            await job.close()
+
+        result["requests"] = await _send(client, service, requests, args.learners, covered)
+        if name == "warmed":
+            # The same requests again on a fresh worker: Redis hits
+            _clear_local(service)
+            result["cache_hit"] = await _send(client, service, requests, args.learners, covered)
+    return result
+
+
+async def run(args) -> dict:
+    from app.config import get_settings
+
+    get_settings().semantic_cache_enabled = False  # exact inputs only, so tiers are unambiguous
+    results = {key: getattr(args, key) for key in ("goals", "history", "top", "per_goal", "requests", "learners")}
+    cold = await _scenario("cold", args)
+    warmed = await _scenario("warmed", args)
+    results["cold"] = cold["requests"]
+    results["warmed"] = warmed["requests"]
+    results["cache_hit"] = warmed["cache_hit"]
+    results["warming"] = warmed["warming"]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--goals", type=int, default=40)
+    parser.add_argument("--history", type=int, default=150)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--per-goal", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--learners", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--token-budget", type=int, default=0)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--tokens-per-second", type=float, default=4000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
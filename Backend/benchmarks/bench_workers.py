@@ -0,0 +1,242 @@
+"""
+Worker scaling benchmark: throughput from 1 to N uvicorn workers on shared state.
+
+For each --workers count, starts `uvicorn app.main:app --workers N` on the
+fake LLM backend without MongoDB, with SHARED_STATE=--shared-state and a
+fresh MEMORY_STORE_SPILL_PATH that every worker shares (and --redis-url for
+SHARED_STATE=redis). SHARED_STATE=none runs the default configuration
+instead: no spill file, so every worker keeps its own paths. --paths paths
+are generated first, then --client-processes load processes, each with
+--clients closed-loop connections, send a read mix for --duration seconds:
+GET a stored path by id, or POST /generate for a stored input (served from
+the L1 cache or the shared store).
+
+Afterwards a consistency check runs through whichever workers the kernel
+hands the connections to:
+
+    not_found     GETs for a path just created (on some worker) that 404
+    stale_reads   POST /generate answers still showing a week after it was
+                  regenerated on another worker, once 3 poll intervals passed
+
+With SHARED_STATE=none both are non-zero as soon as there are 2 workers.
+Run --shared-state none --workers 2 to see it.
+Reported per worker count: requests/s, speedup over 1 worker, latency
+percentiles, errors and the consistency counts. Throughput only scales with
+free cores: keep --workers at or below the core count minus what the load
+processes need (os.cpu_count() is reported).
+
+Usage (from the Backend directory):
+    python -m benchmarks.bench_workers --workers 1 2 4 --duration 10
+    python -m benchmarks.bench_workers --shared-state redis --redis-url redis://localhost:6379
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks._common import BACKEND_DIR, sample_user_input, summarize
+
+
+def _start_server(workers: int, port: int, shared_state: str, redis_url: str, spill_path: str) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        CEREBRAS_API_KEY="benchmark",
+        MONGODB_ATLAS_URI="placeholder",
+        REDIS_URL=redis_url,
+        LLM_BACKEND="fake",
+        FAKE_LLM_LATENCY="0.05",
+        MEMORY_STORE_SPILL_PATH=spill_path,
+        SHARED_STATE=shared_state,
+        DEBUG="false",
+    )
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+        ],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def _stop_server(server: subprocess.Popen):
+    os.killpg(server.pid, signal.SIGTERM)
+    try:
+        server.wait(timeout=20)
+    except subprocess.TimeoutExpired:
+        os.killpg(server.pid, signal.SIGKILL)
+        server.wait()
+
+
+async def _wait_ready(client, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def _goal(index: int) -> str:
+    return f"Scaling goal {index}"
+
+
+async def _seed(client, paths: int) -> list:
+    ids = []
+    for i in range(paths):
+        response = await client.post("/v1/learning-paths/generate", json=sample_user_input(4, _goal(i)))
+        ids.append(response.json()["learning_path"]["id"])
+    return ids
+
+
+async def _load(base_url: str, ids: list, clients: int, duration: float, seed: int) -> dict:
+    import httpx
+
+    rng = random.Random(seed)
+    latencies, errors = [], {}
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+
+        async def connection():
+            while time.perf_counter() < deadline:
+                index = rng.randrange(len(ids))
+                started = time.perf_counter()
+                if rng.random() < 0.5:
+                    response = await client.get(f"/v1/learning-paths/{ids[index]}")
+                else:
+                    response = await client.post("/v1/learning-paths/generate", json=sample_user_input(4, _goal(index)))
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+        await asyncio.gather(*(connection() for _ in range(clients)))
+    return {"latencies": latencies, "errors": errors}
+
+
+def _load_process(base_url: str, ids: list, clients: int, duration: float, seed: int) -> dict:
+    return asyncio.run(_load(base_url, ids, clients, duration, seed))
+
+
+async def _consistency(base_url: str, checks: int, poll_interval: float) -> dict:
+    """Create, then read back and edit, through fresh connections (so different workers)"""
+    import httpx
+
+    not_found = stale = 0
+    for i in range(checks):
+        user_input = sample_user_input(4, f"Consistency goal {i}")
+        async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+            path = (await client.post("/v1/learning-paths/generate", json=user_input)).json()["learning_path"]
+        for _ in range(10):
+            async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+                not_found += (await client.get(f"/v1/learning-paths/{path['id']}")).status_code == 404
+        # Serve it once from every worker's L1, then edit it on one of them
+        for _ in range(10):
+            async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+                await client.post("/v1/learning-paths/generate", json=user_input)
+        for _ in range(20):
+            # Without shared state only the worker that created it can edit it
+            async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+                response = await client.patch(
+                    f"/v1/learning-paths/{path['id']}/weeks/1", json={"topic": f"Edited topic {i}"}
+                )
+            if response.status_code == 200:
+                break
+        else:
+            continue
+        edited = response.json()["learning_path"]["weekly_breakdown"][0]["topic"]
+        await asyncio.sleep(3 * poll_interval)
+        for _ in range(10):
+            async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+                served = (await client.post("/v1/learning-paths/generate", json=user_input)).json()
+            stale += served["learning_path"]["weekly_breakdown"][0]["topic"] != edited
+    return {"checks": checks, "not_found": not_found, "stale_reads": stale}
+
+
+async def _run_workers(workers: int, args, port: int) -> dict:
+    import httpx
+
+    base_url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as directory:
+        spill_path = os.path.join(directory, "store.sqlite3") if args.shared_state != "none" else ""
+        server = _start_server(workers, port, args.shared_state, args.redis_url, spill_path)
+        try:
+            async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+                await _wait_ready(client)
+                ids = await _seed(client, args.paths)
+            # Every worker has connected and subscribed by now
+            await asyncio.sleep(1)
+
+            loop = asyncio.get_running_loop()
+            with ProcessPoolExecutor(args.client_processes) as pool:
+                results = await asyncio.gather(*(
+                    loop.run_in_executor(pool, _load_process, base_url, ids, args.clients, args.duration, seed)
+                    for seed in range(args.client_processes)
+                ))
+            latencies = [latency for result in results for latency in result["latencies"]]
+            errors = {}
+            for result in results:
+                for status, count in result["errors"].items():
+                    errors[status] = errors.get(status, 0) + count
+
+            consistency = await _consistency(base_url, args.checks, args.poll_interval)
+        finally:
+            _stop_server(server)
+    return {
+        "workers": workers,
+        "requests_per_s": round(len(latencies) / args.duration, 1),
+        **{key: value for key, value in summarize(latencies).items() if key != "count"},
+        "errors": errors,
+        **consistency,
+    }
+
+
+async def run(args) -> dict:
+    results = {
+        "cpu_count": os.cpu_count(),
+        "shared_state": args.shared_state,
+        "clients": args.clients * args.client_processes,
+        "duration_s": args.duration,
+        "runs": [],
+    }
+    for offset, workers in enumerate(args.workers):
+        print(f"🔍 {workers} worker(s)...", file=sys.stderr)
+        results["runs"].append(await _run_workers(workers, args, args.port + offset))
+    baseline = results["runs"][0]["requests_per_s"]
+    for row in results["runs"]:
+        row["speedup"] = round(row["requests_per_s"] / baseline, 2) if baseline else None
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--shared-state", choices=["none", "sqlite", "redis"], default="sqlite")
+    parser.add_argument("--redis-url", default="redis://127.0.0.1:1",
+                        help="needed for --shared-state redis (the default is unreachable)")
+    parser.add_argument("--poll-interval", type=float, default=0.1, help="SHARED_STATE_POLL_INTERVAL")
+    parser.add_argument("--paths", type=int, default=50)
+    parser.add_argument("--clients", type=int, default=16, help="connections per load process")
+    parser.add_argument("--client-processes", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--checks", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8750)
+    args = parser.parse_args()
+    os.environ["SHARED_STATE_POLL_INTERVAL"] = str(args.poll_interval)
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+"""
+Local stand-ins for MongoDB (motor) and Redis used by the benchmarks.
+
+FakeCollection implements the subset of the motor collection API the
+services use, with a configurable per-operation round-trip time.
+BlockingCollection wraps it with time.sleep() instead of asyncio.sleep()
+to reproduce a synchronous driver called from async handlers. FakeRedis
+does the same for the redis.asyncio commands the cache uses.
+"""
+
+import asyncio
+import bisect
+import time
+from types import SimpleNamespace
+
+from bson.objectid import ObjectId
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+
+def _lookup(doc: dict, dotted: str):
+    value = doc
+    for part in dotted.split("."):
+        if isinstance(value, list) and part.isdigit():
+            value = value[int(part)] if int(part) < len(value) else None
+        elif isinstance(value, dict):
+            value = value.get(part)
+        else:
+            return None
+    return value
+
+
+def _parent(doc: dict, dotted: str):
+    """(container, key) that a dotted update path writes to, creating objects on the way"""
+    target = doc
+    parts = dotted.split(".")
+    for part in parts[:-1]:
+        target = target[int(part)] if isinstance(target, list) else target.setdefault(part, {})
+    key = parts[-1]
+    return target, int(key) if isinstance(target, list) else key
+
+
+def _project(doc: dict, projection: dict = None) -> dict:
+    projection = projection or {}
+    if any(projection.values()):
+        # Inclusion projection on (possibly dotted) fields
+        result = {"_id": doc["_id"]}
+        for field, include in projection.items():
+            if not include:
+                continue
+            value = _lookup(doc, field)
+            if value is None:
+                continue
+            target = result
+            parts = field.split(".")
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = value
+        return result
+    doc = dict(doc)
+    for field in projection:
+        doc.pop(field, None)
+    return doc
+
+
+_OPERATORS = {
+    "$lt": lambda value, bound: value is not None and value < bound,
+    "$gt": lambda value, bound: value is not None and value > bound,
+    "$exists": lambda value, exists: (value is not None) == exists,
+    "$size": lambda value, size: isinstance(value, list) and len(value) == size,
+}
+
+
+def _matches(doc: dict, query: dict) -> bool:
+    for field, expected in (query or {}).items():
+        value = _lookup(doc, field)
+        if isinstance(expected, dict) and expected and all(op in _OPERATORS for op in expected):
+            if not all(_OPERATORS[op](value, bound) for op, bound in expected.items()):
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, collection: "FakeCollection", query: dict = None, projection: dict = None):
+        self._collection = collection
+        self._query = query or {}
+        self._projection = projection
+        self._limit = 0
+        self._descending = None
+
+    def limit(self, limit: int) -> "FakeCursor":
+        self._limit = limit
+        return self
+
+    def sort(self, field: str, direction: int = 1) -> "FakeCursor":
+        if field != "_id":
+            raise NotImplementedError("FakeCursor only sorts on _id")
+        self._descending = direction < 0
+        return self
+
+    def _candidates(self):
+        """Documents in scan order; _id range bounds are resolved like an index seek"""
+        order = self._collection._order
+        if self._descending is None:
+            return (self._collection._docs[_id] for _id in order)
+        bounds = self._query.get("_id") if isinstance(self._query.get("_id"), dict) else {}
+        start = bisect.bisect_left(order, bounds["$gt"]) + 1 if "$gt" in bounds else 0
+        stop = bisect.bisect_left(order, bounds["$lt"]) if "$lt" in bounds else len(order)
+        ids = (order[i] for i in range(stop - 1, start - 1, -1)) if self._descending else (
+            order[i] for i in range(start, stop)
+        )
+        return (self._collection._docs[_id] for _id in ids)
+
+    def _results(self) -> list:
+        results = []
+        for doc in self._candidates():
+            if _matches(doc, self._query):
+                results.append(_project(doc, self._projection))
+                if self._limit and len(results) >= self._limit:
+                    break
+        return results
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        # Batches of 101 documents (a round trip each), like a real cursor
+        await self._collection._io()
+        returned = 0
+        for doc in self._candidates():
+            if not _matches(doc, self._query):
+                continue
+            yield _project(doc, self._projection)
+            returned += 1
+            if self._limit and returned >= self._limit:
+                break
+            if returned % 101 == 0:
+                await self._collection._io()
+
+    async def to_list(self, length=None) -> list:
+        await self._collection._io()
+        results = self._results()
+        return results[:length] if length else results
+
+
+class FakeCollection:
+    """In-memory async collection with simulated network latency"""
+
+    def __init__(self, rtt: float = 0.001):
+        self.rtt = rtt
+        self._docs = {}
+        self._order = []  # _ids in ascending order, the stand-in for the _id index
+        self._unique = {}  # unique index field -> values present
+
+    async def _io(self):
+        await asyncio.sleep(self.rtt)
+
+    async def create_index(self, keys, unique: bool = False, **kwargs):
+        await self._io()
+        if unique:
+            self._unique[keys] = {doc[keys] for doc in self._docs.values() if doc.get(keys) is not None}
+        return keys if isinstance(keys, str) else "_".join(f"{field}_{direction}" for field, direction in keys)
+
+    async def insert_one(self, doc: dict):
+        await self._io()
+        if self._is_duplicate(doc):
+            raise DuplicateKeyError("duplicate key")
+        doc.setdefault("_id", ObjectId())
+        self._insert(dict(doc))
+        return SimpleNamespace(inserted_id=doc["_id"])
+
+    def _is_duplicate(self, doc: dict) -> bool:
+        return doc.get("_id") in self._docs or any(
+            doc.get(field) is not None and doc[field] in values for field, values in self._unique.items()
+        )
+
+    async def insert_many(self, docs: list, ordered: bool = True):
+        await self._io()
+        errors = []
+        for index, doc in enumerate(docs):
+            if self._is_duplicate(doc):
+                errors.append({"index": index, "code": 11000, "errmsg": "duplicate key"})
+                if ordered:
+                    break
+                continue
+            doc.setdefault("_id", ObjectId())
+            self._insert(dict(doc))
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(docs) - len(errors)})
+        return SimpleNamespace(inserted_ids=[doc["_id"] for doc in docs])
+
+    def _insert(self, doc: dict):
+        """Add a document without I/O or unique checks (bulk loading in benchmarks)"""
+        self._docs[doc["_id"]] = doc
+        bisect.insort(self._order, doc["_id"])
+        for field, values in self._unique.items():
+            if doc.get(field) is not None:
+                values.add(doc[field])
+
+    def _remove(self, _id):
+        doc = self._docs.pop(_id)
+        self._order.pop(bisect.bisect_left(self._order, _id))
+        for field, values in self._unique.items():
+            values.discard(doc.get(field))
+
+    async def replace_one(self, query: dict, doc: dict):
+        await self._io()
+        existing = self._docs.get(query["_id"])
+        if existing is not None:
+            self._remove(query["_id"])
+            self._insert(dict(doc, _id=query["_id"]))
+        return SimpleNamespace(matched_count=1 if existing is not None else 0)
+
+    async def update_one(self, query: dict, update: dict):
+        """$set, $unset and $push (with $each/$position/$slice) on dotted paths"""
+        await self._io()
+        doc = self._docs.get(query["_id"])
+        if doc is None or not _matches(doc, {field: value for field, value in query.items() if field != "_id"}):
+            return SimpleNamespace(matched_count=0)
+        sets = update.get("$set", {})
+        for field, values in self._unique.items():
+            if sets.get(field) is not None and sets[field] != doc.get(field) and sets[field] in values:
+                raise DuplicateKeyError("duplicate key")
+
+        for field, values in self._unique.items():
+            values.discard(doc.get(field))
+        for field, value in sets.items():
+            target, key = _parent(doc, field)
+            target[key] = value
+        for field in update.get("$unset", {}):
+            target, key = _parent(doc, field)
+            target.pop(key, None)
+        for field, push in update.get("$push", {}).items():
+            target, key = _parent(doc, field)
+            items = target.setdefault(key, [])
+            if not (isinstance(push, dict) and "$each" in push):
+                push = {"$each": [push]}
+            position = push.get("$position", len(items))
+            items[position:position] = push["$each"]
+            if "$slice" in push:
+                del items[push["$slice"]:]
+        for field, values in self._unique.items():
+            if doc.get(field) is not None:
+                values.add(doc[field])
+        return SimpleNamespace(matched_count=1)
+
+    async def find_one(self, query: dict, projection: dict = None):
+        await self._io()
+        if set(query) == {"_id"}:
+            doc = self._docs.get(query["_id"])
+            return _project(doc, projection) if doc else None
+        for doc in self._docs.values():
+            if _matches(doc, query):
+                return _project(doc, projection)
+        return None
+
+    def find(self, query: dict = None, projection: dict = None) -> FakeCursor:
+        return FakeCursor(self, query, projection)
+
+    async def delete_one(self, query: dict):
+        await self._io()
+        doc = await self.find_one(query) if set(query) != {"_id"} else self._docs.get(query["_id"])
+        if doc:
+            self._remove(doc["_id"])
+        return SimpleNamespace(deleted_count=1 if doc else 0)
+
+
+class BlockingCollection(FakeCollection):
+    """FakeCollection whose I/O blocks the event loop like a sync driver"""
+
+    async def _io(self):
+        time.sleep(self.rtt)
+
+
+class _FakeLock:
+    def __init__(self, redis: "FakeRedis", name: str, timeout: float):
+        self._redis = redis
+        self.name = name
+        self.timeout = timeout
+
+    async def acquire(self, blocking: bool = True) -> bool:
+        return await self._redis.set(self.name, "1", ex=self.timeout, nx=True)
+
+    async def release(self):
+        await self._redis.delete(self.name)
+
+
+class FakeRedis:
+    """In-memory stand-in for redis.asyncio.Redis (decode_responses=True)"""
+
+    def __init__(self, rtt: float = 0.0005):
+        self.rtt = rtt
+        self._data = {}  # key -> (value, expires_at or None)
+
+    async def _io(self):
+        await asyncio.sleep(self.rtt)
+
+    def _live(self, key: str):
+        item = self._data.get(key)
+        if item and item[1] is not None and item[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        return item
+
+    async def ping(self) -> bool:
+        await self._io()
+        return True
+
+    async def get(self, key: str):
+        await self._io()
+        item = self._live(key)
+        return item[0] if item else None
+
+    async def set(self, key: str, value, ex: float = None, nx: bool = False):
+        await self._io()
+        if nx and self._live(key):
+            return False
+        expires_at = time.monotonic() + ex if ex else None
+        self._data[key] = (value if isinstance(value, (str, bytes)) else str(value), expires_at)
+        return True
+
+    async def execute_command(self, command: str, *args, **options):
+        if command != "GET":
+            raise NotImplementedError(f"FakeRedis.execute_command doesn't support {command}")
+        return await self.get(*args)
+
+    def memory_usage(self) -> int:
+        """Bytes held in keys and values (what Redis would store, without its overhead)"""
+        return sum(
+            len(key) + (sum(map(len, value)) if isinstance(value, set) else len(value))
+            for key, (value, _) in self._data.items()
+        )
+
+    async def setex(self, key: str, seconds: float, value):
+        return await self.set(key, value, ex=seconds)
+
+    async def delete(self, *keys) -> int:
+        await self._io()
+        return sum(self._data.pop(key, None) is not None for key in keys)
+
+    async def sadd(self, key: str, *members) -> int:
+        await self._io()
+        item = self._live(key)
+        members_set, expires_at = item if item else (set(), None)
+        added = len(set(members) - members_set)
+        self._data[key] = (members_set | set(members), expires_at)
+        return added
+
+    async def smembers(self, key: str) -> set:
+        await self._io()
+        item = self._live(key)
+        return set(item[0]) if item else set()
+
+    async def ttl(self, key: str) -> int:
+        await self._io()
+        item = self._live(key)
+        if not item:
+            return -2
+        return -1 if item[1] is None else int(item[1] - time.monotonic())
+
+    async def expire(self, key: str, seconds: float) -> bool:
+        await self._io()
+        item = self._live(key)
+        if not item:
+            return False
+        self._data[key] = (item[0], time.monotonic() + seconds)
+        return True
+
+    async def exists(self, *keys) -> int:
+        await self._io()
+        return sum(self._live(key) is not None for key in keys)
+
+    def lock(self, name: str, timeout: float = None) -> _FakeLock:
+        return _FakeLock(self, name, timeout)
+
+    async def aclose(self, **kwargs):
+        pass
+
+
+async def attach_standins(service, mongo_rtt: float = 0.001, redis_rtt: float = 0.0005):
+    """Point a PathGeneratorService at fresh Mongo and Redis stand-ins"""
+    await service.connect()
+    collection = FakeCollection(mongo_rtt)
+    await collection.create_index("fingerprint", unique=True, sparse=True)
+    service.vector_store.collection = collection
+    service.cache.redis_client = FakeRedis(redis_rtt)
+    service.cache.enabled = True
+    return collection, service.cache.redis_client
@@ -0,0 +1,77 @@
+"""
+Fingerprint Backfill
+Adds the canonical input fingerprint (and semantic-cache embedding) to
+learning paths stored before those fields existed.
+
+Documents whose fingerprint is already taken by an older path are marked
+with "duplicate_of" instead, since the fingerprint index is unique.
+
+Usage (from the Backend directory):
+    python -m scripts.backfill_fingerprints [--dry-run]
+"""
+
+import argparse
+import asyncio
+import sys
+
+async def backfill(dry_run: bool) -> bool:
+    from pymongo.errors import DuplicateKeyError
+    from app.config import get_settings
+    from app.services.vector_service import VectorService
+    from app.utils.embedding import embed_user_input
+    from app.utils.fingerprint import fingerprint_user_input
+    
+    settings = get_settings()
+    store = VectorService()
+    await store.connect()
+    if store.collection is None:
+        print("❌ MongoDB is not available - nothing to backfill")
+        return False
+    
+    collection = store.collection
+    query = {"fingerprint": {"$exists": False}, "duplicate_of": {"$exists": False}}
+    total = await collection.count_documents(query)
+    print(f"🔍 {total} learning paths without a fingerprint")
+    
+    updated = duplicates = skipped = 0
+    cursor = collection.find(query, {"user_input": 1, "embedding": 1}).sort("_id", 1)
+    async for doc in cursor:
+        user_input = doc.get("user_input")
+        if not user_input:
+            skipped += 1
+            continue
+        
+        fingerprint = fingerprint_user_input(user_input)
+        update = {"fingerprint": fingerprint}
+        if settings.semantic_cache_enabled and "embedding" not in doc:
+            update["embedding"] = embed_user_input(user_input, settings.embedding_dim).tolist()
+        
+        if dry_run:
+            updated += 1
+            continue
+        
+        try:
+            await collection.update_one({"_id": doc["_id"]}, {"$set": update})
+            updated += 1
+        except DuplicateKeyError:
+            original = await collection.find_one({"fingerprint": fingerprint}, {"_id": 1})
+            update.pop("fingerprint")
+            update["duplicate_of"] = original["_id"]
+            await collection.update_one({"_id": doc["_id"]}, {"$set": update})
+            duplicates += 1
+        
+        if (updated + duplicates) % 1000 == 0:
+            print(f"   ... {updated + duplicates}/{total}")
+    
+    verb = "Would update" if dry_run else "Updated"
+    print(f"✅ {verb} {updated} paths, {duplicates} marked as duplicates, {skipped} skipped")
+    store.close()
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill input fingerprints on stored learning paths")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    args = parser.parse_args()
+    
+    if not asyncio.run(backfill(args.dry_run)):
+        sys.exit(1)
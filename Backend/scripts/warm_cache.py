@@ -0,0 +1,88 @@
+"""
+Cache Warming
+Preloads Redis (and MongoDB) with the learning paths for popular inputs, so
+their first request after a deploy or a Redis flush is a cache hit instead
+of an LLM call.
+
+Candidates come from MongoDB (the most common goals among stored paths, at
+their most common skills, hours and weeks) or from a seed file of inputs,
+most popular first: a JSON array or NDJSON of objects with current_skills,
+target_goal, hours_per_week, duration_weeks and optionally
+preferred_learning_style (scripts/popular_goals.ndjson is a starting
+catalog for a new deployment). Stored paths are copied into Redis; missing ones
+are generated CACHE_WARM_CONCURRENCY at a time within
+CACHE_WARM_TOKEN_BUDGET tokens. The hit rate of the candidates is reported
+before and after.
+
+Usage (from the Backend directory):
+    python -m scripts.warm_cache [--top 50] [--per-goal 3] [--token-budget 200000] [--dry-run]
+    python -m scripts.warm_cache --seed scripts/popular_goals.ndjson
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+async def warm(
+    top: int,
+    per_goal: int,
+    seed: str,
+    concurrency: int,
+    token_budget: int,
+    ttl: int,
+    dry_run: bool
+) -> bool:
+    from app.services.cache_warmer import CacheWarmer, load_seed, mine_popular_inputs
+    from app.services.path_generator import PathGeneratorService
+    
+    paths = PathGeneratorService()
+    await paths.connect()
+    try:
+        if seed:
+            try:
+                inputs = load_seed(seed)[:top]
+            except (OSError, ValueError) as e:
+                print(f"❌ Could not read seed file: {e}")
+                return False
+            print(f"🔍 {len(inputs)} inputs from {seed}")
+        else:
+            if paths.vector_store.collection is None:
+                print("⚠️  MongoDB is not available - mining the local fallback store")
+            inputs = await mine_popular_inputs(paths, top, per_goal)
+            print(f"🔍 {len(inputs)} inputs for the {top} most common goals")
+        if not inputs:
+            print("❌ Nothing to warm")
+            return False
+        if not paths.cache.enabled:
+            print("⚠️  Redis is not available - paths will only be stored in MongoDB")
+        
+        warmer = CacheWarmer(paths, concurrency, token_budget, ttl)
+        report = {"before": await warmer.hit_rate(inputs)}
+        if not dry_run:
+            report["warm"] = await warmer.warm(inputs)
+            report["after"] = await warmer.hit_rate(inputs)
+        print(json.dumps(report, indent=2))
+        
+        before = report["before"]["cache_hit_rate"]
+        after = report.get("after", report["before"])["cache_hit_rate"]
+        print(f"✅ Cache hit rate for these inputs: {before:.0%} -> {after:.0%}")
+        return True
+    finally:
+        await paths.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Preload the cache with paths for popular inputs")
+    parser.add_argument("--top", type=int, default=50, help="goals to mine (or seed inputs to take)")
+    parser.add_argument("--per-goal", type=int, default=3, help="hours/weeks combinations per mined goal")
+    parser.add_argument("--seed", help="JSON or NDJSON file of inputs, instead of mining MongoDB")
+    parser.add_argument("--concurrency", type=int, default=None, help="paths generated at a time")
+    parser.add_argument("--token-budget", type=int, default=None, help="LLM tokens to spend at most (0 = no limit)")
+    parser.add_argument("--ttl", type=int, default=None, help="seconds warmed paths stay in Redis")
+    parser.add_argument("--dry-run", action="store_true", help="report the hit rate without warming")
+    args = parser.parse_args()
+    
+    if not asyncio.run(warm(
+        args.top, args.per_goal, args.seed, args.concurrency, args.token_budget, args.ttl, args.dry_run
+    )):
+        sys.exit(1)
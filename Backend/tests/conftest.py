@@ -0,0 +1,66 @@
+"""
+Tests run the app in-process against the fake LLM backend and, where a test
+asks for them, the Mongo and Redis stand-ins from benchmarks/standins.py, so
+they need no services.
+
+Run from the Backend directory:
+    python -m pytest tests
+"""
+
+import os
+import sys
+from contextlib import asynccontextmanager
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Dummy credentials before app.config loads; nothing talks to Cerebras, Redis or MongoDB
+os.environ.setdefault("CEREBRAS_API_KEY", "test")
+os.environ.setdefault("MONGODB_ATLAS_URI", "placeholder")
+os.environ.setdefault("REDIS_URL", "redis://127.0.0.1:1")
+os.environ.setdefault("LLM_BACKEND", "fake")
+
+from app.config import get_settings  # noqa: E402
+
+
+@pytest.fixture
+def settings():
+    """The app's settings object; change it with monkeypatch.setattr so it's restored"""
+    return get_settings()
+
+
+@pytest.fixture
+def user_input():
+    """Factory for a valid learning path request body"""
+    def make(weeks: int = 4, goal: str = "Become a backend developer", **fields) -> dict:
+        return {
+            "current_skills": "Python, SQL",
+            "target_goal": goal,
+            "hours_per_week": 10,
+            "duration_weeks": weeks,
+            "preferred_learning_style": "hands-on",
+            **fields,
+        }
+    return make
+
+
+@pytest.fixture
+def app_client():
+    """Factory for the app running in-process: `async with app_client() as (client, service)`
+    yields an HTTP client and the path service. standins=True points the service
+    at the Mongo and Redis stand-ins instead of the in-memory fallbacks."""
+    @asynccontextmanager
+    async def start(standins: bool = False):
+        import httpx
+        from app.main import app
+        from benchmarks.standins import attach_standins
+
+        async with app.router.lifespan_context(app):
+            service = app.state.path_service
+            if standins:
+                await attach_standins(service)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                yield client, service
+    return start
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from app.services.admission import (
+    AdmissionController,
+    MemoryBuckets,
+    RedisBuckets,
+    estimate_path_tokens,
+)
+from app.services.cache_service import CacheService
+
+
+async def _stream_twice(app_client, settings, user_input) -> list:
+    async with app_client() as (client, service):
+        headers = {settings.admission_client_header: "learner"}
+        responses = []
+        for goal in ("Become a backend developer", "Become a data analyst"):
+            responses.append(await client.post(
+                "/v1/learning-paths/generate/stream",
+                json=user_input(goal=goal),
+                headers=headers
+            ))
+        return responses
+
+
+def test_stream_over_budget_is_rejected_before_streaming(monkeypatch, app_client, settings, user_input):
+    # Budget for one 4-week path per client, and no queueing for more
+    monkeypatch.setattr(settings, "admission_client_tpm", 2_000)
+    monkeypatch.setattr(settings, "admission_burst_seconds", 60)
+    monkeypatch.setattr(settings, "admission_max_wait", 0)
+    admitted, rejected = asyncio.run(_stream_twice(app_client, settings, user_input))
+
+    assert admitted.status_code == 200
+    assert "event: complete" in admitted.text
+    assert rejected.status_code == 429
+    assert rejected.headers["content-type"] == "application/json"
+    assert int(rejected.headers["Retry-After"]) >= 1
+
+
+async def _take_max_duration_path_twice(store) -> list:
+    # ADMISSION_TPM=60000 with a 10 s burst: 10000 tokens of room, 1000/s refill
+    buckets = [("global", 1_000, 10_000)]
+    cost = estimate_path_tokens(52)
+    return [await store.take(buckets, cost, [10]) for _ in range(2)]
+
+
+def _assert_admitted_into_debt(store):
+    (wait, refused), (next_wait, next_refused) = asyncio.run(_take_max_duration_path_twice(store))
+    assert (wait, refused) == (0.0, -1)
+    # The bucket is left in debt: the next request waits for all of it
+    assert next_refused == 0
+    assert next_wait > 10
+
+
+def test_idle_bucket_admits_a_cost_above_its_burst():
+    _assert_admitted_into_debt(MemoryBuckets())
+
+
+def test_idle_redis_bucket_admits_a_cost_above_its_burst():
+    fakeredis = pytest.importorskip("fakeredis")  # runs the Lua script (needs lupa)
+    _assert_admitted_into_debt(RedisBuckets(fakeredis.FakeAsyncRedis(decode_responses=True)))
+
+
+def test_max_duration_path_is_admitted_by_the_default_budget(monkeypatch, settings):
+    monkeypatch.setattr(settings, "admission_tpm", 60_000)
+    monkeypatch.setattr(settings, "admission_backend", "memory")
+    admission = AdmissionController(CacheService())
+    assert asyncio.run(admission.admit(estimate_path_tokens(52))) is not None
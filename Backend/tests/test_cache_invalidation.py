@@ -0,0 +1,35 @@
+import asyncio
+
+
+
+async def _generate(client, user_input: dict) -> dict:
+    response = await client.post("/v1/learning-paths/generate", json=user_input)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def _delete_path_cached_under_two_inputs(app_client, user_input):
+    exact = user_input()
+    # A different cache key ("/" doesn't separate skills) that the semantic lookup resolves to the same path
+    reworded = user_input(current_skills="Python / SQL")
+    async with app_client(standins=True) as (client, service):
+        fake_redis = service.cache.redis_client
+        path_id = (await _generate(client, exact))["learning_path"]["id"]
+        assert (await _generate(client, reworded))["learning_path"]["id"] == path_id
+        assert len(await fake_redis.smembers(f"learning_path_keys:{path_id}")) == 2
+
+        response = await client.delete(f"/v1/learning-paths/{path_id}")
+        assert response.status_code == 200, response.text
+        assert not await fake_redis.exists(f"learning_path_keys:{path_id}")
+
+        # A fresh worker: only Redis is left
+        service.cache.local.clear()
+        for body in (exact, reworded):
+            served = await _generate(client, body)
+            assert served["message"] != "Learning path retrieved from cache"
+            assert served["learning_path"]["id"] != path_id
+
+
+def test_delete_invalidates_every_input_cached_for_the_path(monkeypatch, app_client, settings, user_input):
+    monkeypatch.setattr(settings, "semantic_cache_enabled", True)
+    asyncio.run(_delete_path_cached_under_two_inputs(app_client, user_input))
@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from app.utils.codec import MAGIC, Codec
+
+VALUE = {"path_title": "Backend developer", "weekly_breakdown": [{"week_number": n, "topic": "SQL"} for n in range(40)]}
+
+
+@pytest.mark.parametrize("compression", ["none", "zlib"])
+def test_values_round_trip_with_their_header(compression):
+    codec = Codec(serializer="json", compression=compression, min_bytes=100)
+    encoded = codec.encode(VALUE)
+    assert encoded[:3] == MAGIC + b"j" + (b"z" if compression == "zlib" else b"n")
+    assert codec.decode(encoded) == VALUE
+
+
+def test_small_values_are_not_compressed():
+    codec = Codec(serializer="json", compression="zlib", min_bytes=1024)
+    encoded = codec.encode({"topic": "SQL"})
+    assert encoded[:3] == MAGIC + b"jn"
+    assert codec.decode(encoded) == {"topic": "SQL"}
+
+
+def test_values_written_with_other_settings_decode():
+    written = Codec(serializer="json", compression="zlib", min_bytes=0).encode(VALUE)
+    assert Codec(serializer="json", compression="none").decode(written) == VALUE
+
+
+@pytest.mark.parametrize("legacy", [json.dumps(VALUE), json.dumps(VALUE).encode()])
+def test_plain_json_from_before_codecs_decodes(legacy):
+    assert Codec().decode(legacy) == VALUE
+
+
+def test_missing_optional_library_falls_back(monkeypatch):
+    import builtins
+    real_import = builtins.__import__
+    
+    def without_msgpack(name, *args, **kwargs):
+        if name == "msgpack":
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+    
+    monkeypatch.setattr(builtins, "__import__", without_msgpack)
+    codec = Codec(serializer="msgpack", compression="zlib")
+    assert codec.serializer == "json"
+    assert codec.decode(codec.encode(VALUE)) == VALUE
@@ -0,0 +1,13 @@
+import asyncio
+
+
+async def _delete_statuses(app_client) -> list:
+    async with app_client(standins=True) as (client, service):
+        statuses = []
+        for path_id in ("0123456789abcdef01234567", "not-an-id"):
+            statuses.append((await client.delete(f"/v1/learning-paths/{path_id}")).status_code)
+        return statuses
+
+
+def test_delete_missing_or_malformed_id_is_not_found(app_client):
+    assert asyncio.run(_delete_statuses(app_client)) == [404, 404]
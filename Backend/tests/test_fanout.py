@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from app.models.learning_path import UserInput
+from app.services.path_generator import OUTLINE_ATTEMPTS, PathGeneratorService
+
+
+def _outline(weeks: int) -> dict:
+    return {
+        "path_title": "Backend developer",
+        "final_project": "An API",
+        "outline": [{"week_number": n, "topic": f"Topic {n}"} for n in range(1, weeks + 1)],
+    }
+
+
+def _week(number: int) -> dict:
+    return {
+        "week_number": number,
+        "topic": f"Topic {number}",
+        "subtopics": ["a"],
+        "resources": [],
+        "practice_exercise": "Build it",
+        "estimated_hours": 10,
+        "key_takeaways": ["b"],
+    }
+
+
+class ScriptedLLM:
+    """Answers outline calls from a list and detail calls with the requested weeks"""
+
+    def __init__(self, outlines: list, fail_first_batch: bool = False):
+        self.outlines = outlines
+        self.outline_calls = 0
+        self.fail_first_batch = fail_first_batch
+        self.detail_calls = 0
+        self.cancelled = 0
+
+    async def generate_completion(self, prompt: str, max_tokens: int = 4000, kind: str = "path",
+                                  expected_tokens=None) -> dict:
+        if kind == "outline":
+            self.outline_calls += 1
+            return self.outlines.pop(0)
+        self.detail_calls += 1
+        start = (self.detail_calls - 1) * 4 + 1
+        if self.fail_first_batch and start == 1:
+            await asyncio.sleep(0.01)
+            raise ValueError("LLM API error")
+        try:
+            await asyncio.sleep(0.01 if not self.fail_first_batch else 5)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return {"weeks": [_week(n) for n in range(start, start + 4)]}
+
+
+@pytest.fixture
+def twelve_weeks(user_input) -> UserInput:
+    return UserInput(**user_input(weeks=12))
+
+
+@pytest.fixture
+def fanout_service(monkeypatch, settings):
+    """Factory for a service that fans 12 weeks out into three 4-week batches"""
+    monkeypatch.setattr(settings, "fanout_min_weeks", 8)
+    monkeypatch.setattr(settings, "fanout_weeks_per_call", 4)
+    monkeypatch.setattr(settings, "fanout_max_concurrency", 4)
+    
+    def make(llm: ScriptedLLM) -> PathGeneratorService:
+        service = PathGeneratorService()
+        service.llm = llm
+        return service
+    return make
+
+
+def test_short_outline_is_retried(fanout_service, twelve_weeks):
+    llm = ScriptedLLM([_outline(9), _outline(12)])
+    path_data = asyncio.run(fanout_service(llm)._generate_fanout(twelve_weeks))
+    assert llm.outline_calls == 2
+    assert [week["week_number"] for week in path_data["weekly_breakdown"]] == list(range(1, 13))
+
+
+def test_outline_that_stays_short_fails_the_path(fanout_service, twelve_weeks):
+    llm = ScriptedLLM([_outline(9)] * OUTLINE_ATTEMPTS)
+    with pytest.raises(ValueError, match="expected weeks 1 to 12"):
+        asyncio.run(fanout_service(llm)._generate_fanout(twelve_weeks))
+    assert llm.detail_calls == 0
+
+
+async def _fail_and_settle(service: PathGeneratorService, user_input: UserInput):
+    try:
+        await service._generate_fanout(user_input)
+    finally:
+        # Let the cancellations land
+        await asyncio.sleep(0.05)
+
+
+def test_failed_batch_cancels_the_others(fanout_service, twelve_weeks):
+    llm = ScriptedLLM([_outline(12)], fail_first_batch=True)
+    with pytest.raises(ValueError, match="LLM API error"):
+        asyncio.run(_fail_and_settle(fanout_service(llm), twelve_weeks))
+    assert llm.detail_calls == 3
+    assert llm.cancelled == 2
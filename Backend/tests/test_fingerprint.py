@@ -0,0 +1,38 @@
+from app.models.learning_path import UserInput
+from app.utils.fingerprint import canonicalize_user_input, fingerprint_quiz, fingerprint_user_input
+
+
+def test_equivalent_inputs_share_a_fingerprint(user_input):
+    original = user_input()
+    reworded = user_input(
+        current_skills="  sql;python, SQL ",
+        target_goal="Become a  BACKEND developer!",
+        preferred_learning_style="Hands-On",
+    )
+    assert fingerprint_user_input(reworded) == fingerprint_user_input(original)
+    assert fingerprint_user_input(UserInput(**original)) == fingerprint_user_input(original)
+
+
+def test_missing_style_means_the_default(user_input):
+    assert canonicalize_user_input(user_input(preferred_learning_style=None))["preferred_learning_style"] == "mixed"
+    assert fingerprint_user_input(user_input(preferred_learning_style="")) == \
+        fingerprint_user_input(user_input(preferred_learning_style="mixed"))
+
+
+def test_inputs_that_change_the_path_differ(user_input):
+    fingerprints = {
+        fingerprint_user_input(body)
+        for body in (
+            user_input(),
+            user_input(weeks=8),
+            user_input(hours_per_week=5),
+            user_input(goal="Become a data analyst"),
+            user_input(current_skills="Python"),
+        )
+    }
+    assert len(fingerprints) == 5
+
+
+def test_quiz_fingerprint_ignores_topic_order_case_and_duplicates():
+    assert fingerprint_quiz(3, ["SQL joins", "indexes", "sql joins "]) == fingerprint_quiz(3, ["Indexes", "SQL Joins"])
+    assert fingerprint_quiz(3, ["indexes"]) != fingerprint_quiz(4, ["indexes"])
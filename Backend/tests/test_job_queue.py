@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+
+from app.models.learning_path import LearningPathResponse, UserInput
+from app.services import job_queue
+from app.services.job_queue import JobQueue, RedisJobQueue
+
+
+async def _finished(client, job_id: str) -> dict:
+    for _ in range(200):
+        job = (await client.get(f"/v1/jobs/{job_id}")).json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        await asyncio.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+async def _two_jobs_from_one_client(app_client, settings, user_input) -> list:
+    async with app_client() as (client, service):
+        headers = {settings.admission_client_header: "learner"}
+        jobs = []
+        for goal in ("Become a backend developer", "Become a data analyst"):
+            response = await client.post("/v1/learning-paths/jobs", json=user_input(goal=goal), headers=headers)
+            assert response.status_code == 202, response.text
+            jobs.append(response.json())
+        return [(job["client"], await _finished(client, job["id"])) for job in jobs]
+
+
+def test_jobs_are_charged_to_the_client_that_queued_them(monkeypatch, app_client, settings, user_input):
+    # Budget for one 4-week path per client; jobs would otherwise wait for it
+    monkeypatch.setattr(settings, "admission_client_tpm", 2_000)
+    monkeypatch.setattr(settings, "admission_burst_seconds", 60)
+    monkeypatch.setattr(settings, "admission_max_wait", 0)
+    monkeypatch.setattr(settings, "job_workers", 1)
+    (first_client, first), (second_client, second) = asyncio.run(_two_jobs_from_one_client(app_client, settings, user_input))
+
+    assert first_client == second_client == "learner"
+    assert first["status"] == "succeeded"
+    assert second["status"] == "failed"
+    assert "Rate limit exceeded for this client" in second["error"]
+
+
+class _PathService:
+    async def generate_learning_path(self, user_input: UserInput) -> LearningPathResponse:
+        return LearningPathResponse(success=True, message="Learning path generated successfully")
+
+
+class _FlakyQueue(JobQueue):
+    """Loses its connection on the first dequeue, like BLMOVE during a Redis blip"""
+    
+    failures = 1
+    
+    async def _dequeue(self):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("Connection reset by peer")
+        return await super()._dequeue()
+
+
+async def _job_after_a_dequeue_error(user_input: UserInput):
+    queue = _FlakyQueue(_PathService(), workers=1, max_depth=10)
+    await queue.start()
+    try:
+        job = await queue.submit(user_input)
+        for _ in range(100):
+            await asyncio.sleep(0.02)
+            if job.status.value in ("succeeded", "failed"):
+                break
+        return job, queue
+    finally:
+        await queue.close()
+
+
+def test_worker_survives_a_dequeue_error(monkeypatch, user_input):
+    monkeypatch.setattr(job_queue, "WORKER_ERROR_BACKOFF", 0.01)
+    job, queue = asyncio.run(_job_after_a_dequeue_error(UserInput(**user_input())))
+    assert queue.failures == 0
+    assert job.status.value == "succeeded"
+
+
+async def _submit_past_capacity(app_client, user_input) -> list:
+    async with app_client() as (client, service):
+        return [await client.post("/v1/learning-paths/jobs", json=user_input(weeks=weeks)) for weeks in (4, 5, 6)]
+
+
+def test_full_queue_answers_429_with_retry_after(monkeypatch, app_client, settings, user_input):
+    # No workers: queued jobs stay queued
+    monkeypatch.setattr(settings, "job_workers", 0)
+    monkeypatch.setattr(settings, "job_queue_max_depth", 2)
+    first, second, third = asyncio.run(_submit_past_capacity(app_client, user_input))
+
+    assert first.status_code == second.status_code == 202
+    assert third.status_code == 429
+    assert int(third.headers["Retry-After"]) >= 1
+
+
+class _Cache:
+    """The part of CacheService RedisJobQueue uses"""
+    
+    enabled = True
+    
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+    
+    async def connect(self):
+        pass
+
+
+class _RedisPathService(_PathService):
+    def __init__(self, redis_client):
+        self.cache = _Cache(redis_client)
+
+
+@pytest.fixture
+def redis_queue():
+    fakeredis = pytest.importorskip("fakeredis")  # runs the Lua scripts (needs lupa)
+    redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    return RedisJobQueue(_RedisPathService(redis_client), workers=1, max_depth=10), redis_client
+
+
+async def _sweep_twice(queue: RedisJobQueue, redis_client) -> list:
+    # "abandoned" lost its worker; "running" still holds its lease
+    await redis_client.lpush(RedisJobQueue.PROCESSING_KEY, "abandoned", "running")
+    await redis_client.set("job:running:lease", "1")
+    await queue._ready()
+    await queue._requeue_abandoned()
+    after_first = await redis_client.lrange(RedisJobQueue.QUEUE_KEY, 0, -1)
+    await queue._requeue_abandoned()
+    return [
+        after_first,
+        await redis_client.lrange(RedisJobQueue.QUEUE_KEY, 0, -1),
+        await redis_client.lrange(RedisJobQueue.PROCESSING_KEY, 0, -1),
+    ]
+
+
+def test_reaper_requeues_jobs_whose_lease_lapsed(redis_queue):
+    queue, redis_client = redis_queue
+    after_first, queued, processing = asyncio.run(_sweep_twice(queue, redis_client))
+
+    # One sweep may land between BLMOVE and the worker taking its lease
+    assert after_first == []
+    assert queued == ["abandoned"]
+    assert processing == ["running"]
+    assert queue.requeued == 1
@@ -0,0 +1,42 @@
+import pytest
+
+from app.utils.json_repair import JSONExtractionError, extract_json, find_truncation
+
+
+def test_well_formed_object_is_parsed_as_is():
+    result = extract_json('{"path_title": "x", "weeks": [1, 2]}')
+    assert result.data == {"path_title": "x", "weeks": [1, 2]}
+    assert not (result.extracted or result.repaired or result.truncated)
+
+
+def test_prose_and_code_fences_are_dropped():
+    result = extract_json('Here is your path:\n```json\n{"path_title": "x"}\n```\nEnjoy!')
+    assert result.data == {"path_title": "x"}
+    assert result.extracted
+    assert not result.repaired
+
+
+def test_trailing_commas_are_removed_outside_strings():
+    result = extract_json('{"topics": ["a, ]", "b",], "title": "c",}')
+    assert result.data == {"topics": ["a, ]", "b"], "title": "c"}
+    assert result.repaired
+    assert not result.truncated
+
+
+def test_truncated_output_drops_the_partial_week():
+    text = '{"path_title": "x", "weekly_breakdown": [{"week_number": 1, "topic": "a"}, {"week_number": 2, "topi'
+    result = extract_json(text)
+    assert result.data == {"path_title": "x", "weekly_breakdown": [{"week_number": 1, "topic": "a"}]}
+    assert result.truncated and result.repaired
+
+
+def test_truncation_is_detected_only_for_unclosed_objects():
+    assert find_truncation('{"weekly_breakdown": [{"week_number": 1}, {"week')
+    assert not find_truncation('{"weekly_breakdown": []} and some prose')
+    assert not find_truncation("no JSON at all")
+
+
+@pytest.mark.parametrize("text", ["", "I can't help with that.", '{"path_title": "x" "weeks": []}'])
+def test_unrecoverable_output_raises(text):
+    with pytest.raises(JSONExtractionError):
+        extract_json(text)
@@ -0,0 +1,30 @@
+import asyncio
+
+from app.services.llm_backends import FakeBackend, FakeLLMError
+from app.services.llm_router import ModelRouter, is_retryable
+
+
+async def _five_calls_through_one_slot() -> ModelRouter:
+    router = ModelRouter(asyncio.Semaphore(1))
+    backend = FakeBackend(latency=0.4, tokens_per_second=0, error_rate=0, truncation_rate=0)
+    messages = [{"role": "user", "content": "quiz"}]
+    await asyncio.gather(*(router.complete(backend, messages, 500, "quiz", 500) for _ in range(5)))
+    return router
+
+
+def test_queue_wait_does_not_count_against_the_timeout(monkeypatch, settings):
+    # The last call waits 1.6s for the slot, longer than the timeout
+    monkeypatch.setattr(settings, "llm_timeout", 1)
+    monkeypatch.setattr(settings, "llm_max_retries", 0)
+    router = asyncio.run(_five_calls_through_one_slot())
+    for stats in router.models.values():
+        assert stats.timeouts == 0
+        assert stats.error_rate() == 0.0
+
+
+def test_only_transport_rate_limit_and_server_errors_are_retried():
+    assert is_retryable(TimeoutError())
+    assert is_retryable(ConnectionResetError())
+    assert is_retryable(FakeLLMError("injected"))
+    assert not is_retryable(ValueError("bad JSON"))
+    assert not is_retryable(KeyError("choices"))
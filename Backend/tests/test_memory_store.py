@@ -0,0 +1,91 @@
+import asyncio
+import sqlite3
+
+from app.services.memory_store import BoundedStore
+
+
+async def _put_while_another_worker_writes(path: str) -> tuple:
+    store = BoundedStore(max_entries=10, max_bytes=1_000_000, spill_path=path, shared=True)
+    other_worker = sqlite3.connect(path, isolation_level=None)
+    other_worker.execute("BEGIN IMMEDIATE")
+    ticks = 0
+    
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+    
+    ticker = asyncio.create_task(tick())
+    put = asyncio.create_task(store.run(store.put, "a", {"topic": "sql"}))
+    await asyncio.sleep(0.2)
+    other_worker.execute("COMMIT")
+    await put
+    ticker.cancel()
+    stored = await store.run(store.get, "a")
+    store.close()
+    other_worker.close()
+    return ticks, stored
+
+
+def test_shared_store_waits_for_the_write_lock_off_the_event_loop(tmp_path):
+    ticks, stored = asyncio.run(_put_while_another_worker_writes(str(tmp_path / "paths.db")))
+    assert ticks >= 10
+    assert stored == {"topic": "sql"}
+
+
+def _path(topic: str, size: int = 0) -> dict:
+    return {"topic": topic, "notes": "x" * size}
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    evicted = []
+    store = BoundedStore(max_entries=2, max_bytes=1_000_000, on_evict=evicted.append)
+    store.put("a", _path("a"))
+    store.put("b", _path("b"))
+    store.get("a")
+    store.put("c", _path("c"))
+    assert evicted == ["b"]
+    assert store.get("b") is None
+    assert [path_id for path_id, _ in store.items()] == ["a", "c"]
+    assert store.stats()["evictions"] == 1
+
+
+def test_byte_budget_is_enforced():
+    store = BoundedStore(max_entries=100, max_bytes=2_500)
+    for path_id in "abcd":
+        store.put(path_id, _path(path_id, size=1_000))
+    assert len(store) == 2
+    assert store.stats()["bytes"] <= 2_500
+    assert store.get("a") is None and store.get("d") is not None
+
+
+def test_expired_entries_are_not_served(monkeypatch):
+    from app.services import memory_store
+    now = [1_000.0]
+    monkeypatch.setattr(memory_store.time, "time", lambda: now[0])
+    store = BoundedStore(max_entries=10, max_bytes=1_000_000, ttl=60)
+    store.put("a", dict(_path("a"), fingerprint="fp"))
+    now[0] += 61
+    assert store.get("a") is None
+    assert store.find_id_by_fingerprint("fp") is None
+    assert store.stats()["expirations"] == 1
+
+
+def test_evicted_entries_are_reloaded_from_the_spill_file(tmp_path):
+    path = str(tmp_path / "paths.db")
+    store = BoundedStore(max_entries=1, max_bytes=1_000_000, spill_path=path)
+    store.put("a", dict(_path("a"), fingerprint="fp-a"))
+    store.put("b", _path("b"))
+    assert len(store) == 1
+    assert store.find_id_by_fingerprint("fp-a") == "a"
+    assert store.get("a") == dict(_path("a"), fingerprint="fp-a")
+    assert store.stats()["disk_reads"] == 1
+    store.close()
+    
+    # A restart warms memory with the newest documents and can still reach the rest
+    reopened = BoundedStore(max_entries=1, max_bytes=1_000_000, spill_path=path)
+    assert [path_id for path_id, _ in reopened.items()] == ["b"]
+    assert reopened.get("a") == dict(_path("a"), fingerprint="fp-a")
+    assert [path_id for path_id, _ in reopened.page(10)] == ["b", "a"]
+    reopened.close()
@@ -0,0 +1,67 @@
+import asyncio
+
+from app.utils.fingerprint import fingerprint_quiz
+
+
+def _llm_calls(service) -> int:
+    return sum(model["calls"] for model in service.llm.stats()["routing"]["models"].values())
+
+
+async def _quiz(client, week_number: int, topics: list, path_id=None) -> dict:
+    response = await client.post(
+        "/v1/quiz/generate", json={"week_number": week_number, "topics": topics, "path_id": path_id}
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def _equivalent_quiz_requests(app_client) -> tuple:
+    async with app_client(standins=True) as (client, service):
+        first = await _quiz(client, 3, ["SQL joins", "Indexes"])
+        again = await _quiz(client, 3, ["indexes", " sql joins", "SQL Joins"])
+        concurrent = await asyncio.gather(*(_quiz(client, 4, ["Transactions"]) for _ in range(3)))
+        return first, again, concurrent, _llm_calls(service)
+
+
+def test_equivalent_quiz_requests_share_one_generation(app_client):
+    first, again, concurrent, calls = asyncio.run(_equivalent_quiz_requests(app_client))
+    assert again == first
+    assert all(quiz == concurrent[0] for quiz in concurrent)
+    assert calls == 2
+
+
+async def _quiz_after_cache_loss(app_client, body: dict) -> tuple:
+    async with app_client(standins=True) as (client, service):
+        path = (await client.post("/v1/learning-paths/generate", json=body)).json()["learning_path"]
+        week = path["weekly_breakdown"][0]
+        first = await _quiz(client, 1, week["subtopics"], path["id"])
+        calls = _llm_calls(service)
+
+        # Both cache tiers lose it, as after a restart with Redis flushed
+        service.cache.local_quizzes.clear()
+        await service.cache.redis_client.delete(f"quiz:{fingerprint_quiz(1, week['subtopics'])}")
+        again = await _quiz(client, 1, week["subtopics"], path["id"])
+        return first, again, _llm_calls(service) - calls
+
+
+def test_quiz_stored_with_its_path_outlives_the_cache(app_client, user_input):
+    first, again, new_calls = asyncio.run(_quiz_after_cache_loss(app_client, user_input()))
+    assert again == first
+    assert new_calls == 0
+
+
+async def _quiz_for_a_new_path(app_client, body: dict) -> tuple:
+    async with app_client(standins=True) as (client, service):
+        path = (await client.post("/v1/learning-paths/generate", json=body)).json()["learning_path"]
+        await service.quiz_worker.join()
+        calls = _llm_calls(service)
+        week = path["weekly_breakdown"][1]
+        await _quiz(client, week["week_number"], week["subtopics"], path["id"])
+        return service.quiz_worker.stats(), _llm_calls(service) - calls
+
+
+def test_new_path_pregenerates_its_first_quizzes(monkeypatch, app_client, settings, user_input):
+    monkeypatch.setattr(settings, "quiz_pregenerate_weeks", 2)
+    pregeneration, new_calls = asyncio.run(_quiz_for_a_new_path(app_client, user_input()))
+    assert pregeneration["completed"] == 2
+    assert new_calls == 0
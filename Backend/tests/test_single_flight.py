@@ -0,0 +1,54 @@
+import asyncio
+
+from app.services.admission import AdmissionRejected, charge_to, current_client
+from app.services.single_flight import SingleFlight
+
+
+async def _generate() -> str:
+    # Stands in for _generate_uncached: admission sees the caller that started the run
+    await asyncio.sleep(0.05)
+    if current_client.get() == "over-budget":
+        raise AdmissionRejected(5, "client")
+    return f"path for {current_client.get()}"
+
+
+async def _call_as(flight: SingleFlight, client: str, delay: float):
+    charge_to(client)
+    await asyncio.sleep(delay)
+    return await flight.do("learning_path:x", _generate, retry_on=(AdmissionRejected,))
+
+
+async def _leader_rejected_follower_within_budget() -> tuple:
+    flight = SingleFlight()
+    results = await asyncio.gather(
+        _call_as(flight, "over-budget", 0),
+        _call_as(flight, "within-budget", 0.01),
+        return_exceptions=True
+    )
+    return results, flight
+
+
+def test_follower_does_not_inherit_the_leaders_rejection():
+    (leader, follower), flight = asyncio.run(_leader_rejected_follower_within_budget())
+    assert isinstance(leader, AdmissionRejected)
+    assert follower == "path for within-budget"
+    assert flight.stats()["retried"] == 1
+
+
+async def _failing_flight():
+    async def fail():
+        await asyncio.sleep(0.05)
+        raise ValueError("LLM error")
+    flight = SingleFlight()
+    return await asyncio.gather(
+        flight.do("k", fail, retry_on=(AdmissionRejected,)),
+        flight.do("k", fail, retry_on=(AdmissionRejected,)),
+        return_exceptions=True
+    ), flight
+
+
+def test_other_errors_are_still_shared():
+    results, flight = asyncio.run(_failing_flight())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.stats()["leaders"] == 1
+    assert flight.stats()["in_flight"] == 0
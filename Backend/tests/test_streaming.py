@@ -0,0 +1,108 @@
+import asyncio
+import json
+
+from app.utils.streaming import WeeklyBreakdownParser
+
+
+def _feed(*deltas: str) -> tuple:
+    """Weeks the parser emits for the deltas, and how many it skipped"""
+    parser = WeeklyBreakdownParser()
+    weeks = [week for delta in deltas for week in parser.feed(delta)]
+    return weeks, parser.skipped
+
+
+def test_parser_emits_weeks_split_across_deltas():
+    text = '{"path_title": "x", "weekly_breakdown": [{"week_number": 1, "topic": "a {b}"}, {"week_number": 2, "topic": "c"}]}'
+    weeks, _ = _feed(*(text[i:i + 7] for i in range(0, len(text), 7)))
+    assert weeks == [{"week_number": 1, "topic": "a {b}"}, {"week_number": 2, "topic": "c"}]
+
+
+def test_parser_repairs_trailing_comma():
+    weeks, skipped = _feed('{"path_title":"x","weekly_breakdown":[{"week_number":1,"topic":"a",},')
+    assert weeks == [{"week_number": 1, "topic": "a"}]
+    assert skipped == 0
+
+
+def test_parser_skips_week_beyond_repair():
+    weeks, skipped = _feed(
+        '{"weekly_breakdown": [{"week_number": 1, "topic": a}, ',
+        '{"week_number": 2, "topic": "b"}]}'
+    )
+    assert weeks == [{"week_number": 2, "topic": "b"}]
+    assert skipped == 1
+
+
+async def _stream(app_client, body: dict) -> list:
+    """(event, data) pairs of one streamed generation"""
+    async with app_client(standins=True) as (client, service):
+        response = await client.post("/v1/learning-paths/generate/stream", json=body)
+        assert response.status_code == 200, response.text
+    events = []
+    for block in response.text.split("\n\n"):
+        if block:
+            event, data = block.split("\n", 1)
+            events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def _check_complete(events: list, weeks: int):
+    names = [event for event, _ in events]
+    assert names == ["week"] * weeks + ["complete"], names[-3:]
+    assert [data["week_number"] for _, data in events[:-1]] == list(range(1, weeks + 1))
+    assert len(events[-1][1]["learning_path"]["weekly_breakdown"]) == weeks
+
+
+def test_stream_long_path_fans_out(app_client, user_input):
+    _check_complete(asyncio.run(_stream(app_client, user_input(52))), 52)
+
+
+def test_stream_continues_truncated_output(monkeypatch, app_client, settings, user_input):
+    # One completion for the whole path, longer than its 4000 max_tokens
+    monkeypatch.setattr(settings, "fanout_min_weeks", 0)
+    _check_complete(asyncio.run(_stream(app_client, user_input(20))), 20)
+
+
+async def _stream_usage(app_client, body: dict) -> tuple:
+    async with app_client(standins=True) as (client, service):
+        response = await client.post("/v1/learning-paths/generate/stream", json=body)
+        assert "event: complete" in response.text
+        return service.llm.stats(), service.admission.stats()
+
+
+def test_streamed_generation_is_accounted(monkeypatch, app_client, settings, user_input):
+    monkeypatch.setattr(settings, "fanout_min_weeks", 0)
+    monkeypatch.setattr(settings, "admission_tpm", 600_000)
+    llm, admission = asyncio.run(_stream_usage(app_client, user_input(4)))
+
+    assert llm["prompt_tokens"] > 0
+    assert llm["completion_tokens"] > 0
+    model = llm["routing"]["models"][settings.cerebras_model]
+    assert model["calls"] == 1
+    assert model["p50_ms"] is not None
+    # The reservation was settled against what the stream actually used
+    assert admission["refunded_tokens"] != 0
+
+
+def _events(text: str) -> list:
+    return [block.split("\n", 1)[0][len("event: "):] for block in text.split("\n\n") if block]
+
+
+async def _concurrent_streams(app_client, body: dict, streams: int) -> tuple:
+    async with app_client(standins=True) as (client, service):
+        responses = await asyncio.gather(*(
+            client.post("/v1/learning-paths/generate/stream", json=body)
+            for _ in range(streams)
+        ))
+        return [_events(response.text) for response in responses], service.llm.stats(), service.admission.stats()
+
+
+def test_identical_streams_share_one_generation(monkeypatch, app_client, settings, user_input):
+    monkeypatch.setattr(settings, "fanout_min_weeks", 0)
+    monkeypatch.setattr(settings, "admission_tpm", 600_000)
+    events, llm, admission = asyncio.run(_concurrent_streams(app_client, user_input(4), 3))
+
+    for names in events:
+        assert names == ["week"] * 4 + ["complete"]
+    assert llm["routing"]["models"][settings.cerebras_model]["calls"] == 1
+    # Only the stream that generated kept its budget
+    assert admission["reserved_tokens"] - admission["refunded_tokens"] < 2 * admission["reserved_tokens"] / 3
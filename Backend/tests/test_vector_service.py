@@ -0,0 +1,21 @@
+import asyncio
+
+from app.services.vector_service import VectorService
+
+
+async def _served_documents(body: dict) -> tuple:
+    service = VectorService()
+    path_id = await service.store_learning_path({"path_title": "Backend developer", "user_input": body})
+    await service.store_quiz(path_id, "quiz:1", {"questions": []})
+    by_id = await service.get_learning_path(path_id)
+    by_fingerprint = await service.find_by_fingerprint(service._in_memory_store.get(path_id)["fingerprint"])
+    listed = await service.get_all_learning_paths()
+    service.close()
+    return by_id, by_fingerprint, listed
+
+
+def test_fallback_store_serves_paths_without_internal_fields(user_input):
+    by_id, by_fingerprint, listed = asyncio.run(_served_documents(user_input()))
+    for path in (by_id, by_fingerprint, *listed):
+        assert path["path_title"] == "Backend developer"
+        assert not {"embedding", "quizzes", "fingerprint"} & set(path)